@@ -7,7 +7,7 @@ import multiprocessing
 from datetime import timedelta
 from werkzeug.exceptions import HTTPException
 from flask import Blueprint
-from database import get_db_connection, map_row_to_dict
+from database import get_campaign_with_questions
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -67,36 +67,10 @@ def health_check():
 def get_campaign(campaignId):
     """Get campaign details and associated questions."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Get campaign details
-        cursor.execute("SELECT * FROM campaigns WHERE id = ?", (campaignId,))
-        campaign = cursor.fetchone()
-
-        if not campaign:
-            conn.close()
+        campaign_data = get_campaign_with_questions(campaignId)
+        if not campaign_data:
             return jsonify({"error": "Campaign not found"}), 200
 
-        # Get campaign columns
-        cursor.execute("PRAGMA table_info(campaigns)")
-        columns = [row[1] for row in cursor.fetchall()]
-        campaign_data = map_row_to_dict(campaign, columns)
-
-        # Get questions for this campaign
-        cursor.execute("SELECT * FROM questions WHERE campaign_id = ?", (campaignId,))
-        questions = cursor.fetchall()
-
-        if questions:
-            cursor.execute("PRAGMA table_info(questions)")
-            question_columns = [row[1] for row in cursor.fetchall()]
-            campaign_data["questions"] = [
-                map_row_to_dict(q, question_columns) for q in questions
-            ]
-        else:
-            campaign_data["questions"] = []
-
-        conn.close()
         return jsonify(campaign_data)
     except Exception as e:
         logger.error(f"Error fetching campaign: {str(e)}")
@@ -107,28 +81,11 @@ def get_campaign(campaignId):
 def get_campaign_questions(campaignId):
     """Get all questions for a specific campaign."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Verify campaign exists
-        cursor.execute("SELECT id FROM campaigns WHERE id = ?", (campaignId,))
-        if not cursor.fetchone():
-            conn.close()
+        campaign_data = get_campaign_with_questions(campaignId)
+        if not campaign_data:
             return jsonify({"error": "Campaign not found"}), 200
 
-        # Get questions
-        cursor.execute("SELECT * FROM questions WHERE campaign_id = ?", (campaignId,))
-        questions = cursor.fetchall()
-
-        if questions:
-            cursor.execute("PRAGMA table_info(questions)")
-            columns = [row[1] for row in cursor.fetchall()]
-            questions_data = [map_row_to_dict(q, columns) for q in questions]
-        else:
-            questions_data = []
-
-        conn.close()
-        return jsonify(questions_data)
+        return jsonify(campaign_data["questions"])
     except Exception as e:
         logger.error(f"Error fetching campaign questions: {str(e)}")
         return jsonify({"error": f"Error fetching campaign questions: {str(e)}"}), 500
@@ -138,36 +95,10 @@ def get_campaign_questions(campaignId):
 def start_campaign_interview(campaignId):
     """Start an interview for a specific campaign."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Verify campaign exists
-        cursor.execute("SELECT * FROM campaigns WHERE id = ?", (campaignId,))
-        campaign = cursor.fetchone()
-
-        if not campaign:
-            conn.close()
+        campaign_data = get_campaign_with_questions(campaignId)
+        if not campaign_data:
             return jsonify({"error": "Campaign not found"}), 200
 
-        # Get campaign columns
-        cursor.execute("PRAGMA table_info(campaigns)")
-        columns = [row[1] for row in cursor.fetchall()]
-        campaign_data = map_row_to_dict(campaign, columns)
-
-        # Get questions
-        cursor.execute("SELECT * FROM questions WHERE campaign_id = ?", (campaignId,))
-        questions = cursor.fetchall()
-
-        if questions:
-            cursor.execute("PRAGMA table_info(questions)")
-            question_columns = [row[1] for row in cursor.fetchall()]
-            campaign_data["questions"] = [
-                map_row_to_dict(q, question_columns) for q in questions
-            ]
-        else:
-            campaign_data["questions"] = []
-
-        conn.close()
         return jsonify(campaign_data)
     except Exception as e:
         logger.error(f"Error starting campaign interview: {str(e)}")
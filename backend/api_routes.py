@@ -1,8 +1,17 @@
 from database import (
     get_db_connection,
+    get_connection_pool,
     build_filter_query,
+    build_page,
+    bulk_insert,
+    bulk_upsert,
+    keyset_query,
+    parse_page_args,
+    PAGINATION_PARAMS,
     ensure_string_id,
     map_row_to_dict,
+    map_rows,
+    mapped_row_factory,
 )
 from flask import (
     Blueprint,
@@ -13,16 +22,35 @@ from flask import (
     url_for,
     render_template,
     current_app as app,
+    Response,
+    stream_with_context,
 )
 from flask_cors import CORS, cross_origin
 from functools import wraps
-import boto3
 import uuid
 from config import Config
-from scoring_agent import (
-    optimize_with_ai,
-    generate_submission_scoring,
-    analyze_strengths_weaknesses,
+from scoring_agent import optimize_with_ai
+from llm_cache import response_cache
+from scoring_jobs import enqueue_job, get_job, JOB_QUEUED
+import submission_scoring  # registers the score_submission job handler
+import transcription_service  # registers the transcribe_answer job handler
+from report_renderer import invalidate_report
+from campaign_rescoring import create_rescoring_run, get_rescoring_run
+from campaign_export import get_export_campaign, iter_csv, iter_zip
+from media_uploads import (
+    abort_upload_session,
+    complete_upload_session,
+    create_upload_session,
+    get_s3_client,
+    get_upload_session,
+    presign_upload_parts,
+)
+from botocore.exceptions import ClientError
+from submission_search import (
+    SEARCH_SOURCES,
+    decode_offset,
+    encode_offset,
+    search_submissions,
 )
 import tempfile
 import os
@@ -42,7 +70,6 @@ import re
 import bcrypt
 from livekit.token_server import LiveKitTokenServer
 from datetime import datetime, timedelta
-import sqlite3
 import random
 import string
 import logging
@@ -61,13 +88,7 @@ api_bp = Blueprint("api", __name__)
 S3_BUCKET = Config.S3_BUCKET_NAME
 
 # Initialize S3 client with credentials
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=Config.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=Config.AWS_SECRET_ACCESS_KEY,
-    aws_session_token=Config.AWS_SESSION_TOKEN,
-    region_name=Config.S3_REGION,
-)
+s3_client = get_s3_client()
 
 
 # Decorator to check admin status via session
@@ -82,7 +103,14 @@ def admin_required(f):
     return decorated_function
 
 
-def build_filter_query(args):
+def build_submission_filter_query(args):
+    """
+    Build a WHERE clause for the submissions list, which joins users (u) and
+    campaigns (c) to submissions (s).
+
+    Returns:
+        Tuple of (where_clause, list of values for its placeholders)
+    """
     filter_clauses = []
     filter_values = []
 
@@ -117,14 +145,21 @@ def build_filter_query(args):
 @api_bp.route("/users", methods=["GET", "POST"])
 def handle_users():
     if request.method == "GET":
+        try:
+            page = parse_page_args(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
         try:
             conn = get_db_connection()
             cursor = conn.cursor()
 
-            filter_query, filter_values = build_filter_query(request.args)
-            cursor.execute(f"SELECT * FROM users {filter_query}", filter_values)
-
-            users = cursor.fetchall()
+            filters = {
+                key: value
+                for key, value in request.args.items()
+                if key not in PAGINATION_PARAMS
+            }
+            filter_query, filter_values = build_filter_query(filters)
             columns = [
                 "id",
                 "email",
@@ -134,7 +169,28 @@ def handle_users():
                 "phone_number",
                 "country_code",
             ]
-            result = [map_row_to_dict(user, columns) for user in users]
+
+            if page is None:
+                cursor.execute(
+                    f"SELECT * FROM users {filter_query}", list(filter_values.values())
+                )
+                users = cursor.fetchall()
+                result = map_rows(users, columns)
+            else:
+                query, params = keyset_query(
+                    f"SELECT {', '.join(columns)}, created_at FROM users",
+                    filter_query,
+                    filter_values.values(),
+                    page,
+                )
+                cursor.execute(query, params)
+                users, next_cursor = build_page(
+                    cursor.fetchall(), page, lambda row: (row[-1], row[0])
+                )
+                result = {
+                    "items": map_rows(users, columns),
+                    "next_cursor": next_cursor,
+                }
 
             conn.close()
             return jsonify(result)
@@ -237,6 +293,11 @@ def handle_campaigns():
         # Get user_id from either session or query params
         user_id = session.get("user_id") or request.args.get("user_id")
 
+        try:
+            page = parse_page_args(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
         conn = get_db_connection()
         cursor = conn.cursor()
 
@@ -267,23 +328,40 @@ def handle_campaigns():
 
             if user_id:
                 # Only fetch campaigns created by or assigned to the specified user
-                cursor.execute(
-                    f"""
+                query = f"""
                     SELECT DISTINCT {select_columns}
                     FROM campaigns c
                     LEFT JOIN campaign_assignments ca ON c.id = ca.campaign_id
-                    WHERE c.created_by = ? OR ca.user_id = ?
-                    """,
-                    (user_id, user_id),
-                )
+                """
+                where_clause = "WHERE c.created_by = ? OR ca.user_id = ?"
+                params = [user_id, user_id]
             else:
                 # If no user_id, fetch all campaigns
-                cursor.execute(f"SELECT {select_columns} FROM campaigns c")
+                query = f"SELECT {select_columns} FROM campaigns c"
+                where_clause = ""
+                params = []
 
-            campaigns = cursor.fetchall()
+            if page is None:
+                cursor.execute(f"{query} {where_clause}", params)
+                campaigns = cursor.fetchall()
 
-            # Map rows to dictionaries with string IDs
-            result = [map_row_to_dict(campaign, columns) for campaign in campaigns]
+                # Map rows to dictionaries with string IDs
+                result = map_rows(campaigns, columns)
+            else:
+                query, params = keyset_query(
+                    query, where_clause, params, page, alias="c"
+                )
+                cursor.execute(query, params)
+                created_at_index = columns.index("created_at")
+                campaigns, next_cursor = build_page(
+                    cursor.fetchall(),
+                    page,
+                    lambda row: (row[created_at_index], row[0]),
+                )
+                result = {
+                    "items": map_rows(campaigns, columns),
+                    "next_cursor": next_cursor,
+                }
 
             conn.close()
             return jsonify(result)
@@ -313,19 +391,22 @@ def handle_campaigns():
             )
 
             # Insert questions
-            for question in data["questions"]:
-                question_id = str(uuid.uuid4())
-                cursor.execute(
-                    "INSERT INTO questions (id, campaign_id, title, body, scoring_prompt, max_points) VALUES (?, ?, ?, ?, ?, ?)",
+            bulk_insert(
+                cursor,
+                "questions",
+                ["id", "campaign_id", "title", "body", "scoring_prompt", "max_points"],
+                [
                     (
-                        question_id,
+                        str(uuid.uuid4()),
                         campaign_id,
                         question["title"],
                         question["body"],
                         question["scoring_prompt"],
                         question["max_points"],
-                    ),
-                )
+                    )
+                    for question in data["questions"]
+                ],
+            )
 
             conn.commit()
             return (
@@ -491,7 +572,7 @@ def get_questions():
 
     # Map rows to dictionaries
     columns = ["id", "campaign_id", "title", "body", "scoring_prompt", "max_points"]
-    result = [map_row_to_dict(question, columns) for question in questions]
+    result = map_rows(questions, columns)
 
     conn.close()
     return jsonify(result)
@@ -523,10 +604,18 @@ def get_question(id):
 @api_bp.route("/submissions", methods=["GET", "POST"])
 def handle_submissions():
     if request.method == "GET":
+        try:
+            page = parse_page_args(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
         try:
             conn = get_db_connection()
             cursor = conn.cursor()
 
+            # Map rows to dictionaries using column names
+            cursor.row_factory = mapped_row_factory
+
             # Build the base query with joins
             query = """
                 SELECT s.*, u.name AS candidate_name, u.email AS user_email
@@ -535,25 +624,34 @@ def handle_submissions():
             """
 
             # Get filter parameters and build WHERE clause
-            filters = request.args.to_dict()
-            where_clause, params = build_filter_query(filters)
-            if where_clause:
-                query += " " + where_clause
+            filters = {
+                key: value
+                for key, value in request.args.to_dict().items()
+                if key not in PAGINATION_PARAMS
+            }
+            where_clause, params = build_submission_filter_query(filters)
 
+            if page is None:
+                if where_clause:
+                    query += " " + where_clause
                 # Execute query with parameters
-            cursor.execute(query, list(params) if params else [])
-            rows = cursor.fetchall()
+                cursor.execute(query, params)
+            else:
+                query, page_params = keyset_query(
+                    query, where_clause, params, page, alias="s"
+                )
+                cursor.execute(query, page_params)
+            submissions = cursor.fetchall()
 
-            # Map rows to dictionaries using column names
-            columns = [desc[0] for desc in cursor.description]
-            submissions = []
-            for row in rows:
-                submission = {}
-                for i, col in enumerate(columns):
-                    submission[col] = row[i]
-                submissions.append(submission)
+            next_cursor = None
+            if page is not None:
+                submissions, next_cursor = build_page(
+                    submissions, page, lambda row: (row["created_at"], row["id"])
+                )
 
             conn.close()
+            if page is not None:
+                return jsonify({"items": submissions, "next_cursor": next_cursor})
             return jsonify(submissions)
         except Exception as e:
             print("Error in get_submissions:", str(e))
@@ -625,6 +723,11 @@ def get_submission_answers():
         user_id = session.get("user_id")
         is_admin = session.get("is_admin", False)
 
+        try:
+            page = parse_page_args(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
         conn = get_db_connection()
         cursor = conn.cursor()
 
@@ -640,9 +743,12 @@ def get_submission_answers():
             )
             submission = cursor.fetchone()
 
-        # Build base query with proper table aliases
+        # Build base query with proper table aliases. Columns are listed explicitly
+        # so they line up with the names they are mapped to below.
         base_query = """
-            SELECT sa.*, q.title as question_title, q.max_points, q.body
+            SELECT sa.id, sa.submission_id, sa.question_id, sa.video_path,
+                   sa.transcript, sa.score, sa.score_rationale,
+                   q.title as question_title, q.max_points, q.body, sa.created_at
             FROM submission_answers sa
             JOIN questions q ON sa.question_id = q.id
         """
@@ -655,13 +761,6 @@ def get_submission_answers():
             where_clauses.append("sa.submission_id = ?")
             filter_values.append(args["submission_id"])
 
-        if where_clauses:
-            base_query += " WHERE " + " AND ".join(where_clauses)
-
-        # Execute the query
-        cursor.execute(base_query, filter_values)
-        submission_answers = cursor.fetchall()
-
         columns = [
             "id",
             "submission_id",
@@ -675,8 +774,31 @@ def get_submission_answers():
             "body",
         ]
 
-        # Map rows to dictionaries with string IDs
-        result = [map_row_to_dict(answer, columns) for answer in submission_answers]
+        if page is None:
+            if where_clauses:
+                base_query += " WHERE " + " AND ".join(where_clauses)
+
+            # Execute the query
+            cursor.execute(base_query, filter_values)
+            submission_answers = cursor.fetchall()
+
+            # Map rows to dictionaries with string IDs
+            result = map_rows(submission_answers, columns)
+        else:
+            where_clause = (
+                "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+            )
+            query, params = keyset_query(
+                base_query, where_clause, filter_values, page, alias="sa"
+            )
+            cursor.execute(query, params)
+            submission_answers, next_cursor = build_page(
+                cursor.fetchall(), page, lambda row: (row[-1], row[0])
+            )
+            result = {
+                "items": map_rows(submission_answers, columns),
+                "next_cursor": next_cursor,
+            }
 
         conn.close()
         return jsonify(result)
@@ -687,6 +809,59 @@ def get_submission_answers():
         return jsonify({"error": f"Failed to get submission answers: {str(e)}"}), 500
 
 
+@api_bp.route("/search", methods=["GET"])
+@admin_required
+def search():
+    """
+    Full-text search over candidate resumes and interview answer transcripts.
+
+    Query parameters: q (required), campaign_id, source ("resume" or "answer"),
+    limit and cursor. Results are ranked best match first and always paginated.
+    """
+    query = request.args.get("q", "")
+    source = request.args.get("source")
+    if source and source not in SEARCH_SOURCES:
+        return (
+            jsonify({"error": f"source must be one of {', '.join(SEARCH_SOURCES)}"}),
+            400,
+        )
+
+    try:
+        limit = int(request.args.get("limit", Config.PAGE_SIZE_DEFAULT))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if limit < 1:
+        return jsonify({"error": "limit must be positive"}), 400
+    try:
+        cursor = request.args.get("cursor")
+        offset = decode_offset(cursor) if cursor else 0
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        hits, next_offset = search_submissions(
+            query,
+            campaign_id=request.args.get("campaign_id"),
+            sources=(source,) if source else SEARCH_SOURCES,
+            limit=limit,
+            offset=offset,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error searching submissions: {e}")
+        return jsonify({"error": f"Failed to search submissions: {str(e)}"}), 500
+
+    return jsonify(
+        {
+            "items": hits,
+            "next_cursor": (
+                encode_offset(next_offset) if next_offset is not None else None
+            ),
+        }
+    )
+
+
 @api_bp.route("/public_campaigns", methods=["GET"])
 def get_public_campaigns():
     conn = get_db_connection()
@@ -704,7 +879,7 @@ def get_public_campaigns():
     ]
 
     # Use the helper function to map rows to dictionaries with string IDs
-    result = [map_row_to_dict(campaign, columns) for campaign in campaigns]
+    result = map_rows(campaigns, columns)
 
     conn.close()
     return jsonify(result)
@@ -970,16 +1145,13 @@ def update_campaign_with_questions(id):
 
     # Process each question from the form data
     total_max_points = 0
+    updated_questions = []
+    new_questions = []
     for question in data["questions"]:
         if question["id"]:  # Existing question - update it
             question_id = question["id"]  # Keep as string, don't convert to int
             updated_question_ids.append(question_id)
-            cursor.execute(
-                """
-                UPDATE questions
-                SET title = ?, body = ?, scoring_prompt = ?, max_points = ?
-                WHERE id = ? AND campaign_id = ?
-            """,
+            updated_questions.append(
                 (
                     question["title"],
                     question["body"],
@@ -987,37 +1159,47 @@ def update_campaign_with_questions(id):
                     question["max_points"],
                     question_id,
                     id,
-                ),
+                )
             )
-            total_max_points += question["max_points"]
-        else:  # New question - insert it
-            # Generate a new UUID for the question
-            question_id = str(uuid.uuid4())
-            cursor.execute(
-                """
-                INSERT INTO questions (id, campaign_id, title, body, scoring_prompt, max_points)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """,
+        else:  # New question - insert it with a new UUID
+            new_questions.append(
                 (
-                    question_id,
+                    str(uuid.uuid4()),
                     id,
                     question["title"],
                     question["body"],
                     question["scoring_prompt"],
                     question["max_points"],
-                ),
+                )
             )
-            total_max_points += question["max_points"]
+        total_max_points += question["max_points"]
+
+    cursor.executemany(
+        """
+        UPDATE questions
+        SET title = ?, body = ?, scoring_prompt = ?, max_points = ?
+        WHERE id = ? AND campaign_id = ?
+    """,
+        updated_questions,
+    )
+    bulk_insert(
+        cursor,
+        "questions",
+        ["id", "campaign_id", "title", "body", "scoring_prompt", "max_points"],
+        new_questions,
+    )
 
     # Find questions that were deleted (in existing_question_ids but not in updated_question_ids)
-    for question_id in existing_question_ids:
-        if question_id not in updated_question_ids:
-            # Delete all submission answers for this question
-            cursor.execute(
-                "DELETE FROM submission_answers WHERE question_id = ?", (question_id,)
-            )
-            # Delete the question
-            cursor.execute("DELETE FROM questions WHERE id = ?", (question_id,))
+    deleted_question_ids = [
+        (question_id,)
+        for question_id in existing_question_ids
+        if question_id not in updated_question_ids
+    ]
+    # Delete all submission answers for these questions, then the questions
+    cursor.executemany(
+        "DELETE FROM submission_answers WHERE question_id = ?", deleted_question_ids
+    )
+    cursor.executemany("DELETE FROM questions WHERE id = ?", deleted_question_ids)
 
     # Update the campaign's max_points
     cursor.execute(
@@ -1074,40 +1256,14 @@ def update_submission(id):
             question = cursor.fetchone()
 
             if question:
-                question_id = question[0]
-                # First check if an answer already exists
-                cursor.execute(
-                    """
-                    SELECT id FROM submission_answers 
-                    WHERE submission_id = ? AND question_id = ?
-                    """,
-                    (id, question_id),
+                # Insert the answer, or update the transcript of an existing one
+                bulk_upsert(
+                    cursor,
+                    "submission_answers",
+                    ["id", "submission_id", "question_id", "transcript"],
+                    [(str(uuid.uuid4()), id, question[0], transcript)],
+                    conflict_columns=["submission_id", "question_id"],
                 )
-                existing_answer = cursor.fetchone()
-
-                if existing_answer:
-                    # Update existing answer
-                    cursor.execute(
-                        """
-                        UPDATE submission_answers 
-                        SET transcript = ?
-                        WHERE submission_id = ? AND question_id = ?
-                        """,
-                        (transcript, id, question_id),
-                    )
-                else:
-                    # Insert new answer with a new UUID
-                    import uuid
-
-                    new_id = str(uuid.uuid4())
-                    cursor.execute(
-                        """
-                        INSERT INTO submission_answers 
-                        (id, submission_id, question_id, transcript)
-                        VALUES (?, ?, ?, ?)
-                        """,
-                        (new_id, id, question_id, transcript),
-                    )
 
             # Remove transcript from data so we don't try to update it in submissions table
             del data["transcript"]
@@ -1120,6 +1276,7 @@ def update_submission(id):
             cursor.execute(sql, values)
 
         conn.commit()
+        invalidate_report(id)
         return jsonify({"message": "Submission updated successfully"}), 200
     except Exception as e:
         conn.rollback()
@@ -1198,6 +1355,7 @@ def update_submission_answer(id):
         )
 
         conn.commit()
+        invalidate_report(submission_id)
         return jsonify({"message": "Submission answer updated successfully"}), 200
     except Exception as e:
         conn.rollback()
@@ -1309,6 +1467,7 @@ def delete_submission(id):
 
     conn.commit()
     conn.close()
+    invalidate_report(id)
     return jsonify({"message": "Submission and its answers deleted successfully"}), 200
 
 
@@ -1317,9 +1476,13 @@ def delete_submission(id):
 def delete_submission_answer(id):
     conn = get_db_connection()
     cursor = conn.cursor()
+    cursor.execute("SELECT submission_id FROM submission_answers WHERE id = ?", (id,))
+    answer = cursor.fetchone()
     cursor.execute("DELETE FROM submission_answers WHERE id = ?", (id,))
     conn.commit()
     conn.close()
+    if answer:
+        invalidate_report(answer[0])
     return jsonify({"message": "Submission answer deleted successfully"}), 200
 
 
@@ -1336,6 +1499,28 @@ def optimize_prompt():
         return jsonify({"success": False, "message": str(e)}), 400
 
 
+@api_bp.route("/llm_cache/stats", methods=["GET"])
+@admin_required
+def get_llm_cache_stats():
+    """Get hit/miss counters and size of the LLM response cache."""
+    try:
+        return jsonify(response_cache.stats()), 200
+    except Exception as e:
+        logger.error(f"Error fetching LLM cache stats: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@api_bp.route("/db_pool/stats", methods=["GET"])
+@admin_required
+def get_db_pool_stats():
+    """Get occupancy and checkout counters of this worker's database connection pool."""
+    try:
+        return jsonify(get_connection_pool().stats()), 200
+    except Exception as e:
+        logger.error(f"Error fetching database pool stats: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
 @api_bp.route("/profile", methods=["GET"])
 def get_current_user_profile():
     # Get the current user's identity from session
@@ -1438,7 +1623,7 @@ def login():
             )
 
         conn = get_db_connection()
-        conn.row_factory = sqlite3.Row
+        conn.row_factory = mapped_row_factory
         cursor = conn.cursor()
 
         cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
@@ -1818,6 +2003,104 @@ def upload_resume():
             os.remove(temp_path)
 
 
+@api_bp.route("/media_uploads", methods=["POST"])
+def create_media_upload():
+    """
+    Start a direct-to-S3 multipart upload of an answer's recording.
+
+    Body: submission_id, question_id, filename, content_type and size (bytes).
+    Returns presigned URLs to PUT each part to, then POST .../complete.
+    """
+    data = request.get_json(silent=True) or {}
+    submission_id = data.get("submission_id")
+    question_id = data.get("question_id")
+    if not submission_id or not question_id:
+        return jsonify({"error": "submission_id and question_id are required"}), 400
+
+    try:
+        upload = create_upload_session(
+            str(submission_id),
+            str(question_id),
+            data.get("filename"),
+            data.get("content_type"),
+            data.get("size"),
+        )
+        if upload is None:
+            return jsonify({"error": "Submission or question not found"}), 404
+        return jsonify(upload), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except ClientError as e:
+        logger.error(f"Error starting media upload: {str(e)}")
+        return jsonify({"error": "Failed to start upload"}), 502
+    except Exception as e:
+        logger.error(f"Error starting media upload: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@api_bp.route("/media_uploads/<string:session_id>", methods=["GET"])
+def get_media_upload(session_id):
+    """Get the status of a media upload session."""
+    upload = get_upload_session(session_id)
+    if not upload:
+        return jsonify({"error": "Upload session not found"}), 404
+    return jsonify(upload), 200
+
+
+@api_bp.route("/media_uploads/<string:session_id>/parts", methods=["POST"])
+def presign_media_upload_parts(session_id):
+    """Presign fresh part URLs (body: optional part_numbers) to resume an upload."""
+    data = request.get_json(silent=True) or {}
+    try:
+        upload = presign_upload_parts(session_id, data.get("part_numbers"))
+        if upload is None:
+            return jsonify({"error": "Upload session not found"}), 404
+        return jsonify(upload), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error presigning parts of media upload {session_id}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@api_bp.route("/media_uploads/<string:session_id>/complete", methods=["POST"])
+def complete_media_upload(session_id):
+    """
+    Finish a media upload and record it on the submission answer.
+
+    Body: optional parts, a list of {part_number, etag} from the part uploads.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        upload = complete_upload_session(session_id, data.get("parts"))
+        if upload is None:
+            return jsonify({"error": "Upload session not found"}), 404
+        return jsonify(upload), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except ClientError as e:
+        logger.error(f"Error completing media upload {session_id}: {str(e)}")
+        return jsonify({"error": "Failed to complete upload"}), 502
+    except Exception as e:
+        logger.error(f"Error completing media upload {session_id}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@api_bp.route("/media_uploads/<string:session_id>/abort", methods=["POST"])
+def abort_media_upload(session_id):
+    """Abort a media upload and discard its uploaded parts."""
+    try:
+        upload = abort_upload_session(session_id)
+        if upload is None:
+            return jsonify({"error": "Upload session not found"}), 404
+        return jsonify(upload), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error aborting media upload {session_id}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
 @api_bp.route("/submissions/<string:id>/complete", methods=["POST"])
 # @admin_required
 def complete_submission(id):
@@ -1857,10 +2140,9 @@ def complete_submission(id):
 
         # Update submission as complete
         cursor.execute(
-            "UPDATE submissions SET is_complete = TRUE WHERE id = ? RETURNING *",
+            "UPDATE submissions SET is_complete = TRUE WHERE id = ?",
             (submission_id,),
         )
-        updated_submission = cursor.fetchone()
 
         # Store transcript if provided
         transcript_data = request.json.get("transcript", [])
@@ -1881,7 +2163,7 @@ def complete_submission(id):
             jsonify(
                 {
                     "message": "Submission completed successfully",
-                    "id": str(updated_submission[0]),
+                    "id": str(submission_id),
                     "is_complete": True,
                 }
             ),
@@ -1895,287 +2177,261 @@ def complete_submission(id):
         return jsonify({"error": str(e)}), 500
 
 
-@api_bp.route("/submit_interview", methods=["POST"])
-def submit_interview():
-    try:
-        data = request.get_json()
-        logger.info(f"Received interview submission request: {data}")
+def validate_interview_submission(data):
+    """
+    Validate a submit_interview request body.
 
-        # Validate required fields
-        if not data.get("transcript"):
-            return jsonify({"error": "Transcript is required"}), 400
+    Returns:
+        An error response tuple, or None if the submission can be scored
+    """
+    # Validate required fields
+    if not data.get("transcript"):
+        return jsonify({"error": "Transcript is required"}), 400
 
-        if not data.get("submission_id"):
-            return jsonify({"error": "Submission ID is required"}), 400
+    if not data.get("submission_id"):
+        return jsonify({"error": "Submission ID is required"}), 400
 
-        # Check if transcript is empty
-        if not data["transcript"] or len(data["transcript"]) == 0:
-            return (
-                jsonify({"error": "Cannot submit interview: transcript is empty"}),
-                400,
-            )
+    # Check if transcript is empty
+    if not data["transcript"] or len(data["transcript"]) == 0:
+        return (
+            jsonify({"error": "Cannot submit interview: transcript is empty"}),
+            400,
+        )
 
-        # Get submission
-        conn = get_db_connection()
+    conn = get_db_connection()
+    try:
         cursor = conn.cursor()
-
         cursor.execute(
-            """
-            SELECT 
-                s.id, s.campaign_id, s.user_id, s.created_at, s.updated_at, 
-                s.is_complete, s.total_points, s.resume_text,
-                c.title, c.campaign_context, c.job_description 
-            FROM submissions s
-            JOIN campaigns c ON s.campaign_id = c.id
-            WHERE s.id = ?
-            """,
-            (data["submission_id"],),
+            "SELECT id FROM submissions WHERE id = ?", (data["submission_id"],)
         )
+        submission_exists = cursor.fetchone() is not None
+    finally:
+        conn.close()
 
-        submission_row = cursor.fetchone()
-        if not submission_row:
-            conn.close()
-            return jsonify({"error": "Submission not found"}), 200
+    if not submission_exists:
+        return jsonify({"error": "Submission not found"}), 200
 
-        # Map the row to a dictionary
-        submission = map_row_to_dict(
-            submission_row,
-            [
-                "id",
-                "campaign_id",
-                "user_id",
-                "created_at",
-                "updated_at",
-                "is_complete",
-                "total_points",
-                "resume_text",
-                "title",
-                "campaign_context",
-                "job_description",
-            ],
-        )
+    return None
 
-        # Get campaign details
-        campaign = {
-            "title": submission["title"],
-            "campaign_context": submission["campaign_context"],
-            "job_description": submission["job_description"],
-        }
 
-        # Get questions for this campaign
-        cursor.execute(
-            """
-            SELECT id, body, scoring_prompt, max_points 
-            FROM questions
-            WHERE campaign_id = ?
-            """,
-            (submission["campaign_id"],),
-        )
+@api_bp.route("/submit_interview", methods=["POST"])
+def submit_interview():
+    try:
+        data = request.get_json()
+        logger.info(f"Received interview submission request: {data}")
 
-        questions_rows = cursor.fetchall()
-        questions = [
-            map_row_to_dict(row, ["id", "body", "scoring_prompt", "max_points"])
-            for row in questions_rows
-        ]
+        error_response = validate_interview_submission(data)
+        if error_response:
+            return error_response
 
-        # Generate interview scores
-        interview_scores = generate_submission_scoring(
-            campaign, questions, data["transcript"]
+        # Scoring runs on the background worker pool so the request returns immediately
+        job_id = enqueue_job(
+            "score_submission",
+            {
+                "submission_id": data["submission_id"],
+                "transcript": data["transcript"],
+            },
+            submission_id=data["submission_id"],
         )
 
-        print(f"🚀 ~ submission.get('resume_text'): {submission.get('resume_text')}")
-
-        # Analyze resume if available
-        if submission.get("resume_text"):
-            try:
-                logger.info(
-                    f"Starting resume analysis for submission {data['submission_id']}"
-                )
-                resume_analysis = analyze_strengths_weaknesses(
-                    campaign, submission["resume_text"]
-                )
-                logger.info(f"Resume analysis completed: {resume_analysis}")
-
-                # Validate resume analysis structure
-                if not isinstance(resume_analysis, dict):
-                    raise ValueError("Resume analysis result is not a dictionary")
-
-                required_fields = [
-                    "strengths",
-                    "weaknesses",
-                    "overall_fit",
-                    "fit_score",
-                ]
-                for field in required_fields:
-                    if field not in resume_analysis:
-                        raise ValueError(
-                            f"Missing required field in resume analysis: {field}"
-                        )
-
-                # Store resume analysis
-                cursor.execute(
-                    """
-                    INSERT INTO resume_analysis (
-                        id, submission_id, strengths, weaknesses, 
-                        overall_fit, percent_match, percent_match_reason
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        str(uuid.uuid4()),
-                        data["submission_id"],
-                        json.dumps(resume_analysis.get("strengths", [])),
-                        json.dumps(resume_analysis.get("weaknesses", [])),
-                        resume_analysis.get("overall_fit", ""),
-                        resume_analysis.get("fit_score", 0),
-                        resume_analysis.get("fit_reason", ""),
+        return (
+            jsonify(
+                {
+                    "success": True,
+                    "message": "Interview submitted for scoring",
+                    "submission_id": data["submission_id"],
+                    "job_id": job_id,
+                    "status": JOB_QUEUED,
+                    "status_url": url_for(
+                        "api.get_scoring_job", job_id=job_id, _external=False
                     ),
-                )
-                logger.info(
-                    f"Successfully stored resume analysis for submission {data['submission_id']}"
-                )
-            except Exception as e:
-                logger.error(f"Failed to process resume analysis: {str(e)}")
-                logger.error(
-                    f"Resume text length: {len(submission['resume_text']) if submission['resume_text'] else 0}"
-                )
-                # Continue with interview scoring even if resume analysis fails
-                resume_analysis = None
-        else:
-            logger.info(
-                f"No resume text available for submission {data['submission_id']}"
-            )
-            resume_analysis = None
-
-        # Calculate total score
-        total_score = sum(score["score"] for score in interview_scores)
-        max_possible_score = sum(q["max_points"] for q in questions)
-
-        # Extract strengths and weaknesses from interview answers
-        interview_strengths = []
-        interview_weaknesses = []
-        for score in interview_scores:
-            rationale = score.get("rationale", "")
-            if "strength" in rationale.lower():
-                interview_strengths.append(rationale)
-            if "weakness" in rationale.lower():
-                interview_weaknesses.append(rationale)
-
-        # Combine interview strengths/weaknesses with resume analysis
-        combined_strengths = []
-        combined_weaknesses = []
-        if resume_analysis:
-            combined_strengths = (
-                resume_analysis.get("strengths", []) + interview_strengths
-            )
-            combined_weaknesses = (
-                resume_analysis.get("weaknesses", []) + interview_weaknesses
-            )
-        else:
-            combined_strengths = interview_strengths
-            combined_weaknesses = interview_weaknesses
+                }
+            ),
+            202,
+        )
 
-        # Calculate overall match score as average of interview score (normalized to 100) and resume fit score
-        interview_score_normalized = (total_score / max_possible_score) * 100
-        resume_fit_score = resume_analysis.get("fit_score", 0) if resume_analysis else 0
-        overall_match_score = (interview_score_normalized + resume_fit_score) / 2
+    except Exception as e:
+        logger.error(f"Error in submit_interview: {str(e)}")
+        return (
+            jsonify(
+                {"error": str(e), "message": "Failed to queue interview scoring"}
+            ),
+            500,
+        )
 
-        # Update each answer in submission_answers
-        for score in interview_scores:
-            # Check if answer already exists
-            cursor.execute(
-                """
-                SELECT id FROM submission_answers 
-                WHERE submission_id = ? AND question_id = ?
-                """,
-                (data["submission_id"], score["question_id"]),
-            )
-            existing_answer = cursor.fetchone()
 
-            if existing_answer:
-                # Update existing answer
-                cursor.execute(
-                    """
-                    UPDATE submission_answers 
-                    SET transcript = ?, score = ?, score_rationale = ?
-                    WHERE submission_id = ? AND question_id = ?
-                    """,
-                    (
-                        score["response"],
-                        score["score"],
-                        score["rationale"],
-                        data["submission_id"],
-                        score["question_id"],
-                    ),
-                )
-            else:
-                # Insert new answer
-                answer_id = str(uuid.uuid4())
-                cursor.execute(
-                    """
-                    INSERT INTO submission_answers 
-                    (id, submission_id, question_id, transcript, score, score_rationale)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        answer_id,
-                        data["submission_id"],
-                        score["question_id"],
-                        score["response"],
-                        score["score"],
-                        score["rationale"],
-                    ),
-                )
+@api_bp.route("/campaigns/<string:campaign_id>/export", methods=["GET"])
+@admin_required
+def export_campaign(campaign_id):
+    """
+    Download a campaign's submissions as CSV, or as a ZIP with the CSV and a PDF
+    report per completed submission (?format=zip).
 
-        # Mark submission as complete and update total score
-        cursor.execute(
-            """
-            UPDATE submissions 
-            SET is_complete = 1, total_points = ?
-            WHERE id = ?
-            """,
-            (total_score, data["submission_id"]),
-        )
+    The file is streamed while it is built, so it starts downloading at once and
+    the server never holds the whole export in memory.
+    """
+    export_format = request.args.get("format", "csv").lower()
+    if export_format not in ("csv", "zip"):
+        return jsonify({"error": "format must be csv or zip"}), 400
 
-        conn.commit()
-        conn.close()
+    try:
+        campaign = get_export_campaign(campaign_id)
+    except Exception as e:
+        logger.error(f"Error exporting campaign {campaign_id}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+    if campaign is None:
+        return jsonify({"error": "Campaign not found"}), 404
 
-        # Format resume analysis similar to interview scores
-        formatted_resume_analysis = None
-        if resume_analysis and isinstance(resume_analysis, dict):
-            formatted_resume_analysis = {
-                "strengths": combined_strengths,
-                "weaknesses": combined_weaknesses,
-                "overall_fit": resume_analysis.get("overall_fit", ""),
-                "percent_match": overall_match_score,
-                "percent_match_reason": resume_analysis.get("fit_reason", ""),
-            }
+    title, questions = campaign
+    filename = f"{secure_filename(title or '') or 'campaign'}_{campaign_id}.{export_format}"
+    if export_format == "zip":
+        body, mimetype = iter_zip(campaign_id, questions), "application/zip"
+    else:
+        body, mimetype = iter_csv(campaign_id, questions), "text/csv"
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@api_bp.route("/campaigns/<string:campaign_id>/rescore", methods=["POST"])
+@admin_required
+def rescore_campaign(campaign_id):
+    """Rescore every completed submission of a campaign in the background."""
+    try:
+        run_id = create_rescoring_run(campaign_id)
+        if run_id is None:
+            return jsonify({"error": "Campaign not found"}), 404
 
+        job_id = enqueue_job("rescore_campaign", {"run_id": run_id}, max_attempts=1)
         return (
             jsonify(
                 {
-                    "success": True,
-                    "message": "Interview scored successfully",
-                    "submission_id": data["submission_id"],
-                    "total_score": total_score,
-                    "max_possible_score": max_possible_score,
-                    "interview_scores": interview_scores,
-                    "resume_analysis": formatted_resume_analysis,
+                    "message": "Campaign rescoring started",
+                    "run_id": run_id,
+                    "job_id": job_id,
                 }
             ),
-            200,
+            202,
         )
+    except Exception as e:
+        logger.error(f"Error starting rescoring for campaign {campaign_id}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 
+@api_bp.route("/rescoring_runs/<string:run_id>", methods=["GET"])
+@admin_required
+def get_campaign_rescoring_run(run_id):
+    """Get the progress of a campaign rescoring run."""
+    try:
+        run = get_rescoring_run(run_id)
+        if not run:
+            return jsonify({"error": "Rescoring run not found"}), 404
+        return jsonify(run), 200
     except Exception as e:
-        if "conn" in locals():
-            conn.rollback()
-            conn.close()
-        logger.error(f"Error in submit_interview: {str(e)}")
+        logger.error(f"Error fetching rescoring run {run_id}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@api_bp.route("/rescoring_runs/<string:run_id>/resume", methods=["POST"])
+@admin_required
+def resume_campaign_rescoring_run(run_id):
+    """Resume an interrupted rescoring run, optionally retrying failed submissions."""
+    try:
+        if not get_rescoring_run(run_id):
+            return jsonify({"error": "Rescoring run not found"}), 404
+
+        data = request.get_json(silent=True) or {}
+        job_id = enqueue_job(
+            "rescore_campaign",
+            {"run_id": run_id, "retry_failed": bool(data.get("retry_failed"))},
+            max_attempts=1,
+        )
         return (
             jsonify(
-                {"error": str(e), "message": "Failed to process interview scoring"}
+                {"message": "Rescoring resumed", "run_id": run_id, "job_id": job_id}
             ),
-            500,
+            202,
         )
+    except Exception as e:
+        logger.error(f"Error resuming rescoring run {run_id}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@api_bp.route("/submit_interview/stream", methods=["POST"])
+def submit_interview_stream():
+    """
+    Score an interview and stream results as Server-Sent Events.
+
+    Emits a "score" event per question and a "resume_analysis" event as each finishes,
+    then "complete" with the same payload /submit_interview produces, or "error".
+    """
+    try:
+        data = request.get_json()
+        logger.info(f"Received streaming interview submission request: {data}")
+
+        error_response = validate_interview_submission(data)
+        if error_response:
+            return error_response
+    except Exception as e:
+        logger.error(f"Error in submit_interview_stream: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+    submission_id = data["submission_id"]
+    transcript = data["transcript"]
+
+    def generate():
+        try:
+            for event, payload in submission_scoring.stream_submission_scoring(
+                submission_id, transcript
+            ):
+                yield format_sse(event, payload)
+        except Exception as e:
+            logger.error(f"Error streaming scores for {submission_id}: {str(e)}")
+            yield format_sse(
+                "error",
+                {
+                    "submission_id": submission_id,
+                    "error": str(e),
+                    "message": "Failed to process interview scoring",
+                },
+            )
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stop nginx from buffering the stream
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+def format_sse(event, data):
+    """Format a Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+# Jobs whose IDs are handed to candidates, who poll them without signing in as
+# an admin; other jobs (e.g. campaign rescoring runs) are admin-only
+CANDIDATE_JOB_TYPES = ("score_submission", "transcribe_answer")
+
+
+@api_bp.route("/scoring_jobs/<string:job_id>", methods=["GET"])
+def get_scoring_job(job_id):
+    """Get the status of a scoring job, including its result once completed."""
+    try:
+        job = get_job(job_id)
+        if not job or (
+            job["job_type"] not in CANDIDATE_JOB_TYPES and not session.get("is_admin")
+        ):
+            return jsonify({"error": "Scoring job not found"}), 404
+        return jsonify(job), 200
+    except Exception as e:
+        logger.error(f"Error fetching scoring job {job_id}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
 
 
 # Add LiveKit token endpoint
@@ -2270,38 +2526,43 @@ def test_create_campaign():
             )
 
             # Insert questions
-            questions_created = []
-            for question in data.get("questions", []):
-                # Generate a UUID string for questions
-                question_id = str(uuid.uuid4())
-
-                cursor.execute(
-                    """
-                    INSERT INTO questions (
-                        id, campaign_id, title, body, 
-                        scoring_prompt, max_points, order_index
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """,
+            questions_created = [
+                {
+                    # Generate a UUID string for questions
+                    "id": str(uuid.uuid4()),
+                    "campaign_id": campaign_id,
+                    "title": question.get("title", ""),
+                    "body": question.get("body", question.get("title", "")),
+                    "scoring_prompt": question.get("scoring_prompt", ""),
+                    "max_points": question.get("max_points", 0),
+                }
+                for question in data.get("questions", [])
+            ]
+            bulk_insert(
+                cursor,
+                "questions",
+                [
+                    "id",
+                    "campaign_id",
+                    "title",
+                    "body",
+                    "scoring_prompt",
+                    "max_points",
+                    "order_index",
+                ],
+                [
                     (
-                        question_id,
-                        campaign_id,
-                        question.get("title", ""),
-                        question.get("body", question.get("title", "")),
-                        question.get("scoring_prompt", ""),
-                        question.get("max_points", 0),
+                        q["id"],
+                        q["campaign_id"],
+                        q["title"],
+                        q["body"],
+                        q["scoring_prompt"],
+                        q["max_points"],
                         0,  # default order_index
-                    ),
-                )
-                questions_created.append(
-                    {
-                        "id": question_id,
-                        "campaign_id": campaign_id,
-                        "title": question.get("title", ""),
-                        "body": question.get("body", question.get("title", "")),
-                        "scoring_prompt": question.get("scoring_prompt", ""),
-                        "max_points": question.get("max_points", 0),
-                    }
-                )
+                    )
+                    for q in questions_created
+                ],
+            )
 
             # Generate access code for the campaign
             access_manager = AccessCodeManager(conn)
@@ -2437,7 +2698,7 @@ def handle_campaign_assignments(campaign_id):
             )
             assignments = cursor.fetchall()
             columns = ["id", "email", "name", "is_admin"]
-            result = [map_row_to_dict(row, columns) for row in assignments]
+            result = map_rows(assignments, columns)
             return jsonify(result)
 
         except Exception as e:
@@ -2461,15 +2722,15 @@ def handle_campaign_assignments(campaign_id):
                 "DELETE FROM campaign_assignments WHERE campaign_id = ?", (campaign_id,)
             )
 
-            # Insert new assignments
-            for user_id in user_ids:
-                cursor.execute(
-                    """
-                    INSERT INTO campaign_assignments (campaign_id, user_id)
-                    VALUES (?, ?)
-                    """,
-                    (campaign_id, user_id),
-                )
+            # Insert new assignments, skipping duplicate user IDs
+            bulk_upsert(
+                cursor,
+                "campaign_assignments",
+                ["id", "campaign_id", "user_id"],
+                [(str(uuid.uuid4()), campaign_id, user_id) for user_id in user_ids],
+                conflict_columns=["campaign_id", "user_id"],
+                update_columns=[],
+            )
 
             conn.commit()
             conn.close()
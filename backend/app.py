@@ -1,10 +1,16 @@
 from botocore.exceptions import ClientError
 from config import Config
 from database import (
+    bulk_insert,
     get_db_connection,
-    create_tables,
-    migrate_submissions_table_add_resume_columns,
+    init_app as init_database,
+    mapped_row_factory,
+    start_wal_checkpointer,
+    verify_connection_profile,
 )
+from media_uploads import get_s3_client, record_answer_media
+from report_renderer import invalidate_report, open_report
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from flask import (
     Flask,
     render_template,
@@ -18,11 +24,9 @@ from flask import (
 )
 from functools import wraps
 from werkzeug.security import generate_password_hash, check_password_hash
-import boto3
 import os
 import random
 import string
-import tempfile
 import uuid
 import sqlite3
 
@@ -49,12 +53,10 @@ def verify_password(password_hash: str, password: str) -> bool:
 
 
 # import whisper
-from fpdf import FPDF
 
 from api_routes import api_bp
 from scoring_agent import generate_submission_scoring
 import os
-import tempfile
 from create_campaign_from_doc import (
     extract_text_from_file,
     generate_campaign_context,
@@ -65,6 +67,8 @@ from flask_cors import CORS
 from datetime import timedelta
 import secrets
 from api_interview_routes import interview_bp
+from scoring_jobs import start_worker_pool
+from migrations import run_migrations
 
 
 app = Flask(__name__)
@@ -93,6 +97,7 @@ CORS(
 app.config.from_object(Config)
 app.register_blueprint(api_bp, url_prefix="/api")
 app.register_blueprint(interview_bp, url_prefix="/interview")
+init_database(app)
 
 # Configure the app for proper session handling
 app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", Config.SECRET_KEY)
@@ -122,44 +127,24 @@ def health_check():
 @app.before_first_request
 def create_tables_on_startup():
     try:
-        create_tables()
-        migrate_submissions_table_add_resume_columns()
-
-        # Execute the migration to update total_points to allow NULL
-        conn = get_db_connection()
-        try:
-            cursor = conn.cursor()
-            # Modify the total_points column to allow NULL values
-            cursor.execute(
-                """
-                ALTER TABLE submissions
-                MODIFY COLUMN total_points INT DEFAULT NULL
-            """
-            )
-            print("Successfully modified total_points column to allow NULL values")
-
-            # Update existing submissions with total_points=0 to NULL
-            cursor.execute(
-                """
-                UPDATE submissions 
-                SET total_points = NULL 
-                WHERE total_points = 0 AND is_complete = FALSE
-            """
-            )
-            print(f"Updated {cursor.rowcount} submissions with total_points=0 to NULL")
-
-            conn.commit()
-        except Exception as e:
-            print(f"Error during migration: {e}")
-            conn.rollback()
-        finally:
-            conn.close()
+        verify_connection_profile()
+        start_wal_checkpointer()
+        # A single version check unless a deployment brought new migrations
+        applied = run_migrations()
+        if applied:
+            print(f"Applied database migrations: {', '.join(applied)}")
     except Exception as e:
         app.logger.error(f"Error during startup database setup: {str(e)}")
         print(f"Error during startup database setup: {e}")
         # Don't crash the application - let it continue even with DB issues
         # The health check will still work, but database operations will fail
 
+    # Pick up scoring jobs queued before this worker started (or left by a dead worker)
+    try:
+        start_worker_pool()
+    except Exception as e:
+        app.logger.error(f"Error starting scoring worker pool: {str(e)}")
+
 
 @app.route("/register", methods=["POST"])
 def register():
@@ -264,7 +249,7 @@ def login():
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
-        cursor.row_factory = sqlite3.Row  # Enable dictionary-like access
+        cursor.row_factory = mapped_row_factory  # Enable dictionary-like access
         cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
         user = cursor.fetchone()
 
@@ -439,43 +424,38 @@ def admin_create_campaign():
 
         conn = get_db_connection()
         cursor = conn.cursor()
+        campaign_id = str(uuid.uuid4().int & (1 << 64) - 1)
         # Insert the new campaign
         cursor.execute(
             "INSERT INTO campaigns (id, title, max_user_submissions, max_points, is_public) VALUES (?, ?, ?, ?, ?)",
             (
-                str(uuid.uuid4().int & (1 << 64) - 1),
+                campaign_id,
                 title,
                 max_user_submissions,
                 0,
                 is_public,
             ),
         )
-        campaign_id = cursor.lastrowid
-
-        total_max_points = 0
 
         # Insert the questions for the campaign
-        for question in questions:
-            question_title = question.get("title")
-            question_body = question.get("body")
-            scoring_prompt = question.get("scoring_prompt")
-            max_points = int(question.get("max_points"))
-            total_max_points += max_points
-            sql_question = """
-                INSERT INTO questions (id, campaign_id, title, body, scoring_prompt, max_points)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """
-            cursor.execute(
-                sql_question,
-                (
-                    str(uuid.uuid4().int & (1 << 64) - 1),
-                    campaign_id,
-                    question_title,
-                    question_body,
-                    scoring_prompt,
-                    max_points,
-                ),
+        question_rows = [
+            (
+                str(uuid.uuid4().int & (1 << 64) - 1),
+                campaign_id,
+                question.get("title"),
+                question.get("body"),
+                question.get("scoring_prompt"),
+                int(question.get("max_points")),
             )
+            for question in questions
+        ]
+        bulk_insert(
+            cursor,
+            "questions",
+            ["id", "campaign_id", "title", "body", "scoring_prompt", "max_points"],
+            question_rows,
+        )
+        total_max_points = sum(row[-1] for row in question_rows)
 
         # Update the campaign with the total max points
         sql_update_campaign = "UPDATE campaigns SET max_points = ? WHERE id = ?"
@@ -700,23 +680,21 @@ def interview_room(campaign_id):
 
 
 # Configure your S3 bucket name (already created)
-S3_BUCKET = "gulpin-interviews"
+S3_BUCKET = Config.S3_BUCKET_NAME
 
 # Initialize S3 client with proper credentials
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=Config.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=Config.AWS_SECRET_ACCESS_KEY,
-    aws_session_token=Config.AWS_SESSION_TOKEN,
-    region_name=Config.S3_REGION,
-)
+s3_client = get_s3_client()
 
 
 @app.route("/submit_answer", methods=["POST"])
 def upload_interview():
     """
     Endpoint to receive interview audio/video from the client (e.g., MediaRecorder blob or LiveKit recording),
-    upload to S3, then transcribe its audio using Whisper.
+    upload to S3, then queue its transcription. The transcript is written to the
+    submission answer by the transcription workers.
+
+    Clients that can should upload straight to S3 through /api/media_uploads
+    instead, which keeps the media out of this process.
     """
     if "file" not in request.files:
         return jsonify({"error": "No file uploaded"}), 400
@@ -736,71 +714,31 @@ def upload_interview():
     unique_id = str(uuid.uuid4())
     s3_filename = f"interviews/{unique_id}{extension}"
 
-    # 1. Save file to a temporary location
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=extension) as tmp:
-            temp_file_path = tmp.name
-            file.save(temp_file_path)
-
-        # 2. Upload local temp file to S3
+        # 1. Stream the upload to S3 without a local copy
         try:
-            s3_client.upload_file(temp_file_path, S3_BUCKET, s3_filename)
+            s3_client.upload_fileobj(file.stream, S3_BUCKET, s3_filename)
             print(f"Uploaded to S3: {S3_BUCKET}/{s3_filename}")
         except ClientError as e:
             print(f"S3 upload failed: {e}")
             return jsonify({"error": "S3 upload failed"}), 500
 
-        # 3. Run Whisper transcription on the local temp file
-        #    (Alternatively, you can re-download from S3 or pass the temp_file_path directly.)
+        # 2. Record the answer and transcribe it in the background
         try:
-            model = whisper.load_model("small")  # pick your desired model size
-            result = model.transcribe(temp_file_path, fp16=False)  # CPU-based
-            transcript_text = result["text"].strip()
-            print("=== Whisper Transcript ===")
-            print(transcript_text)
-            print("=========================")
-        except Exception as e:
-            print(f"Whisper transcription error: {e}")
-            return jsonify({"error": "Transcription failed"}), 500
-
-        # 4. Insert the submission answer into the database
-        try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            sql = """
-            INSERT INTO submission_answers (id, submission_id, question_id, video_path, transcript)
-            VALUES (?, ?, ?, ?, ?)
-            """
-            cursor.execute(
-                sql,
-                (
-                    str(uuid.uuid4().int & (1 << 64) - 1),
-                    submission_id,
-                    question_id,
-                    s3_filename,
-                    transcript_text,
-                ),
-            )
-            conn.commit()
-            conn.close()
+            job_id = record_answer_media(submission_id, question_id, s3_filename)
         except Exception as e:
             print(f"Database insertion error: {e}")
             return jsonify({"error": "Database insertion failed"}), 500
 
-        # 5. Clean up local temp file
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
-
-        # 6. Return a success response
         return (
             jsonify(
                 {
-                    "message": "File uploaded and transcribed successfully!",
+                    "message": "File uploaded, transcription queued",
                     "s3_key": s3_filename,
-                    "transcript": transcript_text,
+                    "transcription_job_id": job_id,
                 }
             ),
-            200,
+            202,
         )
 
     except Exception as e:
@@ -813,7 +751,7 @@ def upload_interview():
 def watch_video(filename):
     try:
         s3_key = f"interviews/{filename}"
-        video_url = s3_client.generate_presigned_url(
+        video_url = get_s3_client(public=True).generate_presigned_url(
             "get_object",
             Params={"Bucket": S3_BUCKET, "Key": s3_key},
             ExpiresIn=3600,  # URL expiration time in seconds
@@ -868,10 +806,11 @@ def finalize_submission(submission_id):
 
     # Update scores and rationales in the database
     total_score = 0
+    answers_by_question = {a["question_id"]: a for a in answers}
     conn = get_db_connection()
     cursor = conn.cursor()
     for question, score_data in zip(questions, scores):
-        answer = next((a for a in answers if a["question_id"] == question["id"]), None)
+        answer = answers_by_question.get(question["id"])
         if answer:
             cursor.execute(
                 """
@@ -895,6 +834,7 @@ def finalize_submission(submission_id):
 
     conn.commit()
     conn.close()
+    invalidate_report(submission_id)
 
     # Print scores
     print(scores)
@@ -902,161 +842,27 @@ def finalize_submission(submission_id):
     return jsonify({"message": "Submission finalized and scores generated"}), 200
 
 
-@app.route("/admin/submission_report/<int:submission_id>")
+@app.route("/admin/submission_report/<submission_id>")
 @admin_required
 def admin_submission_report(submission_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Get submission details
-    cursor.execute(
-        """
-        SELECT submissions.*, users.email, users.name AS user_name, 
-               campaigns.title AS campaign_name, campaigns.campaign_context
-        FROM submissions
-        JOIN users ON submissions.user_id = users.id
-        JOIN campaigns ON submissions.campaign_id = campaigns.id
-        WHERE submissions.id = ?
-    """,
-        (submission_id,),
-    )
-    submission = cursor.fetchone()
+    try:
+        report = open_report(submission_id)
+    except FutureTimeoutError:
+        return (
+            jsonify({"message": "The report is being generated, try again shortly"}),
+            202,
+        )
+    except Exception as e:
+        print(f"Error generating submission report: {e}")
+        return jsonify({"error": "Failed to generate report"}), 500
 
-    if not submission:
+    if report is None:
         return jsonify({"error": "Submission not found"}), 404
 
-    campaign_id = submission["campaign_id"]
-
-    # Get questions for the campaign
-    cursor.execute("SELECT * FROM questions WHERE campaign_id = ?", (campaign_id,))
-    questions = cursor.fetchall()
-
-    # Get submission answers
-    cursor.execute(
-        """
-        SELECT submission_answers.*, questions.title AS question_title, questions.body AS question_body, 
-               questions.scoring_prompt, questions.max_points
-        FROM submission_answers
-        JOIN questions ON submission_answers.question_id = questions.id
-        WHERE submission_answers.submission_id = ?
-    """,
-        (submission_id,),
-    )
-    answers = cursor.fetchall()
-
-    conn.close()
-
-    # Generate PDF report with improved formatting
-    class PDF(FPDF):
-        def header(self):
-            # Set font for header
-            self.set_font("Arial", "B", 12)
-            # Title
-            self.cell(0, 10, f"Candidate Submission Report", 0, 1, "C")
-            # Line break
-            self.ln(4)
-
-        def footer(self):
-            # Position at 1.5 cm from bottom
-            self.set_y(-15)
-            # Set font for footer
-            self.set_font("Arial", "I", 8)
-            # Page number
-            self.cell(0, 10, f"Page {self.page_no()}", 0, 0, "C")
-
-    pdf = PDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_page()
-
-    # Add submission details section
-    pdf.set_font("Arial", "B", 11)
-    pdf.cell(0, 10, "Submission Details", 0, 1, "L")
-    pdf.set_font("Arial", "", 10)
-    pdf.cell(40, 8, "Candidate:", 0, 0)
-    pdf.cell(0, 8, f"{submission['user_name']} ({submission['email']})", 0, 1)
-    pdf.cell(40, 8, "Campaign:", 0, 0)
-    pdf.cell(0, 8, f"{submission['campaign_name']}", 0, 1)
-    pdf.cell(40, 8, "Date:", 0, 0)
-    pdf.cell(0, 8, f"{submission['created_at']}", 0, 1)
-    pdf.cell(40, 8, "Total Score:", 0, 0)
-    pdf.cell(0, 8, f"{submission['total_points']} points", 0, 1)
-
-    # Add campaign context
-    pdf.ln(5)
-    pdf.set_font("Arial", "B", 11)
-    pdf.cell(0, 10, "Campaign Context:", 0, 1, "L")
-    pdf.set_font("Arial", "", 10)
-    pdf.multi_cell(0, 8, f"{submission['campaign_context']}")
-
-    # Add questions and answers
-    total_points = 0
-    max_total_points = 0
-
-    for i, question in enumerate(questions):
-        answer = next((a for a in answers if a["question_id"] == question["id"]), None)
-        if answer:
-            total_points += answer["score"]
-            max_total_points += question["max_points"]
-
-            # Add question section
-            pdf.ln(10)
-            pdf.set_font("Arial", "B", 11)
-            pdf.cell(0, 10, f"Question {i+1}: {question['title']}", 0, 1, "L")
-
-            # Question body
-            pdf.set_font("Arial", "B", 10)
-            pdf.cell(0, 8, "Question:", 0, 1)
-            pdf.set_font("Arial", "", 10)
-            pdf.multi_cell(0, 8, f"{question['body']}")
-
-            # Scoring criteria
-            pdf.ln(5)
-            pdf.set_font("Arial", "B", 10)
-            pdf.cell(0, 8, "Scoring Criteria:", 0, 1)
-            pdf.set_font("Arial", "", 10)
-            pdf.multi_cell(0, 8, f"{question['scoring_prompt']}")
-
-            # Candidate's answer
-            pdf.ln(5)
-            pdf.set_font("Arial", "B", 10)
-            pdf.cell(0, 8, "Candidate's Response:", 0, 1)
-            pdf.set_font("Arial", "", 10)
-            pdf.multi_cell(0, 8, f"{answer['transcript']}")
-
-            # Score and rationale
-            pdf.ln(5)
-            pdf.set_font("Arial", "B", 10)
-            pdf.cell(40, 8, "Score:", 0, 0)
-            pdf.set_font("Arial", "", 10)
-            pdf.cell(0, 8, f"{answer['score']} / {question['max_points']} points", 0, 1)
-
-            pdf.set_font("Arial", "B", 10)
-            pdf.cell(0, 8, "Score Rationale:", 0, 1)
-            pdf.set_font("Arial", "", 10)
-            pdf.multi_cell(0, 8, f"{answer['score_rationale']}")
-
-            # Draw a separator line
-            pdf.ln(5)
-            pdf.line(10, pdf.get_y(), 200, pdf.get_y())
-
-    # Add summary at the end
-    pdf.ln(10)
-    pdf.set_font("Arial", "B", 11)
-    pdf.cell(0, 10, "Summary", 0, 1, "L")
-    pdf.set_font("Arial", "", 10)
-    pdf.cell(70, 8, "Total Score:", 0, 0)
-    pdf.cell(0, 8, f"{total_points} / {max_total_points} points", 0, 1)
-    pdf.cell(70, 8, "Percentage Score:", 0, 0)
-    percentage = (total_points / max_total_points * 100) if max_total_points > 0 else 0
-    pdf.cell(0, 8, f"{percentage:.1f}%", 0, 1)
-
-    # Save PDF to a temporary file
-    pdf_output = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-    pdf.output(pdf_output.name)
-
     # Return the PDF file
     return send_file(
-        pdf_output.name,
+        report,
+        mimetype="application/pdf",
         as_attachment=True,
         download_name=f"candidate_submission_report_{submission_id}.pdf",
     )
@@ -1244,11 +1050,11 @@ def admin_create_campaign_from_doc():
         total_points = sum(q["max_points"] for q in questions)
         conn = get_db_connection()
         cursor = conn.cursor()
-        campaign_id = uuid.uuid4().int >> 64
+        campaign_id = str(uuid.uuid4().int >> 64)
         cursor.execute(
             """
             INSERT INTO campaigns (id, title, max_user_submissions, max_points, is_public, campaign_context)
-            VALUES (%s, %s, %s, %s, %s, %s)
+            VALUES (?, ?, ?, ?, ?, ?)
         """,
             (
                 campaign_id,
@@ -1259,28 +1065,25 @@ def admin_create_campaign_from_doc():
                 campaign_context,
             ),
         )
+        bulk_insert(
+            cursor,
+            "questions",
+            ["id", "campaign_id", "title", "body", "scoring_prompt", "max_points"],
+            [
+                (
+                    str(uuid.uuid4().int >> 64),
+                    campaign_id,
+                    question["question"],
+                    question["question"],
+                    question["scoring_prompt"],
+                    question["max_points"],
+                )
+                for question in questions
+            ],
+        )
         conn.commit()
         conn.close()
 
-        for question in questions:
-            title = question["question"]
-            body = question["question"]
-            scoring_prompt = question["scoring_prompt"]
-            max_points = question["max_points"]
-
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO questions (id, campaign_id, title, body, scoring_prompt, max_points)
-                VALUES (UUID_SHORT(), %s, %s, %s, %s, %s)
-            """,
-                (campaign_id, title, body, scoring_prompt, max_points),
-            )
-
-            conn.commit()
-            conn.close()
-
         # Pass the generated content to the result template for review
         return redirect(url_for("admin_edit_campaign", campaign_id=campaign_id))
 
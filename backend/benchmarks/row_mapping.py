@@ -0,0 +1,159 @@
+"""
+Micro-benchmark for database row mapping.
+
+Compares the previous per-row map_row_to_dict implementation with the compiled
+row mappers on rows fetched from an in-memory SQLite table.
+
+Run from the backend directory: python -m benchmarks.row_mapping [--rows N]
+"""
+
+import argparse
+import datetime
+import sqlite3
+import time
+
+from database import map_row_to_dict, map_rows, mapped_row_factory
+
+COLUMNS = [
+    "id",
+    "email",
+    "name",
+    "password_hash",
+    "is_admin",
+    "phone_number",
+    "country_code",
+    "created_at",
+]
+
+
+def legacy_map_row_to_dict(row, columns, string_id_columns=None):
+    """map_row_to_dict as it was before the compiled mappers, for comparison."""
+    if string_id_columns is None:
+        string_id_columns = [
+            "id",
+            "user_id",
+            "campaign_id",
+            "submission_id",
+            "question_id",
+            "created_by",
+        ]
+    string_columns = string_id_columns + ["phone_number", "country_code"]
+    result = {}
+    if row is None:
+        return result
+    for i, column in enumerate(columns):
+        if i < len(row):
+            value = row[i]
+            if isinstance(value, (datetime.datetime, datetime.date)):
+                value = value.isoformat()
+            elif column in string_columns and value is not None:
+                value = str(value)
+            result[column] = value
+    return result
+
+
+def build_database(row_count):
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        """
+        CREATE TABLE users (
+            id TEXT PRIMARY KEY,
+            email TEXT,
+            name TEXT,
+            password_hash TEXT,
+            is_admin BOOLEAN,
+            phone_number TEXT,
+            country_code TEXT,
+            created_at TIMESTAMP
+        )
+        """
+    )
+    conn.executemany(
+        "INSERT INTO users VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            (
+                f"user-{i}",
+                f"user{i}@example.com",
+                f"User {i}",
+                "pbkdf2:sha256:hash",
+                i % 10 == 0,
+                # Stored as integers to exercise the string conversion
+                5550000 + i,
+                33,
+                "2024-01-01 00:00:00",
+            )
+            for i in range(row_count)
+        ),
+    )
+    return conn
+
+
+def timed(label, fn, repeat):
+    best = min(_run(fn) for _ in range(repeat))
+    print(f"{label:<34}{best * 1000:>10.1f} ms")
+    return best
+
+
+def _run(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    conn = build_database(args.rows)
+    rows = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM users").fetchall()
+
+    expected = [legacy_map_row_to_dict(row, COLUMNS) for row in rows]
+    assert [map_row_to_dict(row, COLUMNS) for row in rows] == expected
+    assert map_rows(rows, COLUMNS) == expected
+
+    print(
+        f"Mapping {len(rows)} rows of {len(COLUMNS)} columns "
+        f"(best of {args.repeat})"
+    )
+    baseline = timed(
+        "legacy map_row_to_dict",
+        lambda: [legacy_map_row_to_dict(row, COLUMNS) for row in rows],
+        args.repeat,
+    )
+    results = [
+        timed(
+            "map_row_to_dict (compiled)",
+            lambda: [map_row_to_dict(row, COLUMNS) for row in rows],
+            args.repeat,
+        ),
+        timed("map_rows", lambda: map_rows(rows, COLUMNS), args.repeat),
+    ]
+
+    def fetch_with_row_factory():
+        cursor = conn.cursor()
+        cursor.row_factory = mapped_row_factory
+        cursor.execute(f"SELECT {', '.join(COLUMNS)} FROM users")
+        return cursor.fetchall()
+
+    fetch_baseline = timed(
+        "fetchall + legacy mapping",
+        lambda: [
+            legacy_map_row_to_dict(row, COLUMNS)
+            for row in conn.execute(f"SELECT {', '.join(COLUMNS)} FROM users")
+        ],
+        args.repeat,
+    )
+    fetch_factory = timed(
+        "fetchall with mapped_row_factory", fetch_with_row_factory, args.repeat
+    )
+
+    print()
+    for label, seconds in zip(("map_row_to_dict", "map_rows"), results):
+        print(f"{label} speedup: {baseline / seconds:.1f}x")
+    print(f"mapped_row_factory speedup: {fetch_baseline / fetch_factory:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
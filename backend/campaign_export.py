@@ -0,0 +1,279 @@
+"""Streamed exports of a campaign's submissions, as CSV or as a ZIP with PDF reports."""
+
+import csv
+import io
+import json
+import logging
+import re
+import zipfile
+from collections import deque
+
+from config import Config
+from database import db_backend, get_db_connection, mapped_row_factory
+from report_renderer import load_report_content, open_report, renderer
+
+logger = logging.getLogger(__name__)
+
+SUBMISSION_COLUMNS = [
+    ("submission_id", "Submission ID"),
+    ("candidate_name", "Candidate"),
+    ("candidate_email", "Email"),
+    ("created_at", "Submitted At"),
+    ("is_complete", "Complete"),
+    ("total_points", "Total Points"),
+    ("percent_match", "Resume Match %"),
+    ("overall_fit", "Resume Overall Fit"),
+    ("strengths", "Resume Strengths"),
+    ("weaknesses", "Resume Weaknesses"),
+    ("percent_match_reason", "Resume Match Reason"),
+]
+
+# Spreadsheet apps run cells starting with these as formulas
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+# Bytes of a PDF copied into the ZIP between yields
+_COPY_CHUNK_SIZE = 64 * 1024
+
+
+def get_export_campaign(campaign_id):
+    """
+    Return the campaign title and its questions in order, for the export header.
+
+    Returns:
+        Tuple of (title, questions), or None if the campaign does not exist
+    """
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.row_factory = mapped_row_factory
+        cursor.execute("SELECT title FROM campaigns WHERE id = ?", (campaign_id,))
+        campaign = cursor.fetchone()
+        if not campaign:
+            return None
+        cursor.execute(
+            """
+            SELECT id, title FROM questions
+            WHERE campaign_id = ?
+            ORDER BY order_index, id
+            """,
+            (campaign_id,),
+        )
+        return campaign["title"], cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def _cell(value):
+    """Format a value for a CSV cell, neutralising spreadsheet formulas."""
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _list_cell(value):
+    """Resume strengths and weaknesses are stored as JSON lists."""
+    try:
+        items = json.loads(value) if value else []
+    except ValueError:
+        return value
+    return "; ".join(str(item) for item in items) if isinstance(items, list) else value
+
+
+def iter_submission_rows(campaign_id, questions):
+    """
+    Stream one row per submission: candidate, scores and resume analysis.
+
+    The rows are read through a streaming cursor and grouped on the fly, so only
+    one submission is held in memory at a time whatever the campaign's size.
+
+    Yields:
+        Lists of cell values, in the order of export_header
+    """
+    question_index = {question["id"]: i for i, question in enumerate(questions)}
+    conn = get_db_connection()
+    cursor = db_backend.streaming_cursor(conn)
+    try:
+        cursor.execute(
+            """
+            SELECT s.id, u.name, u.email, s.created_at, s.is_complete, s.total_points,
+                   ra.percent_match, ra.overall_fit, ra.strengths, ra.weaknesses,
+                   ra.percent_match_reason, sa.question_id, sa.score
+            FROM submissions s
+            LEFT JOIN users u ON u.id = s.user_id
+            LEFT JOIN resume_analysis ra ON ra.id = (
+                SELECT id FROM resume_analysis
+                WHERE submission_id = s.id
+                ORDER BY created_at DESC
+                LIMIT 1
+            )
+            LEFT JOIN submission_answers sa ON sa.submission_id = s.id
+            WHERE s.campaign_id = ?
+            ORDER BY s.created_at, s.id
+            """,
+            (campaign_id,),
+        )
+
+        current_id, current = None, None
+        while True:
+            rows = cursor.fetchmany(Config.EXPORT_FETCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                if row[0] != current_id:
+                    if current is not None:
+                        yield current
+                    current_id = row[0]
+                    current = [str(row[0])] + [_cell(value) for value in row[1:11]]
+                    current[8] = _cell(_list_cell(row[8]))
+                    current[9] = _cell(_list_cell(row[9]))
+                    current += [""] * len(questions)
+                index = question_index.get(row[11])
+                if index is not None:
+                    current[len(SUBMISSION_COLUMNS) + index] = _cell(row[12])
+        if current is not None:
+            yield current
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def export_header(questions):
+    return [label for _, label in SUBMISSION_COLUMNS] + [
+        f"Q{i + 1} Score: {question['title']}" for i, question in enumerate(questions)
+    ]
+
+
+def iter_csv(campaign_id, questions):
+    """
+    Stream a campaign's submissions as CSV text.
+
+    Yields:
+        Chunks of CSV text, about EXPORT_FETCH_SIZE rows each
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(export_header(questions))
+    for count, row in enumerate(iter_submission_rows(campaign_id, questions), 1):
+        writer.writerow(row)
+        if count % Config.EXPORT_FETCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+class _ZipStream(io.RawIOBase):
+    """Write-only stream collecting what zipfile writes until it is drained."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _report_name(row):
+    candidate = re.sub(r"[^A-Za-z0-9]+", "_", str(row[1] or "")).strip("_")
+    return f"reports/{candidate or 'candidate'}_{row[0]}.pdf"
+
+
+def _iter_report_files(campaign_id):
+    """
+    Yield (name in the ZIP, open PDF file) for each completed submission.
+
+    Reports are rendered ahead of the one being yielded, so the renderer's
+    workers stay busy while the ZIP is written. Cached reports are reused.
+    """
+    window = 2 * Config.REPORT_RENDER_WORKERS
+    pending = deque()
+    conn = get_db_connection()
+    cursor = db_backend.streaming_cursor(conn)
+    try:
+        cursor.execute(
+            """
+            SELECT s.id, u.name
+            FROM submissions s
+            LEFT JOIN users u ON u.id = s.user_id
+            WHERE s.campaign_id = ? AND s.is_complete = 1
+            ORDER BY s.created_at, s.id
+            """,
+            (campaign_id,),
+        )
+        while True:
+            rows = cursor.fetchmany(Config.EXPORT_FETCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                content = load_report_content(row[0])
+                if content is None:
+                    continue
+                pending.append((row, renderer.render(row[0], content)))
+                if len(pending) > window:
+                    yield _open_rendered(*pending.popleft())
+        while pending:
+            yield _open_rendered(*pending.popleft())
+    finally:
+        for _, future in pending:
+            future.cancel()
+        cursor.close()
+        conn.close()
+
+
+def _open_rendered(row, future):
+    name = _report_name(row)
+    try:
+        return name, open(future.result(), "rb")
+    except FileNotFoundError:
+        # Invalidated since it was rendered; render the current content
+        return name, open_report(row[0], timeout=None)
+    except Exception as e:
+        # One failed report should not cut the whole export short
+        logger.error(f"Error rendering report for submission {row[0]}: {e}")
+        return name, None
+
+
+def iter_zip(campaign_id, questions):
+    """
+    Stream a ZIP with the campaign's submissions CSV and one PDF report per
+    completed submission.
+
+    zipfile writes to an unseekable stream here, so each entry is sent as soon
+    as it is written and the archive is never held in memory.
+
+    Yields:
+        Chunks of the ZIP file
+    """
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        with archive.open("submissions.csv", mode="w") as entry:
+            for text in iter_csv(campaign_id, questions):
+                entry.write(text.encode("utf-8"))
+                yield stream.drain()
+
+        for name, report in _iter_report_files(campaign_id):
+            if report is None:
+                continue
+            with report:
+                # PDF page content is already compressed
+                info = zipfile.ZipInfo(name)
+                info.compress_type = zipfile.ZIP_STORED
+                with archive.open(info, mode="w") as entry:
+                    while True:
+                        data = report.read(_COPY_CHUNK_SIZE)
+                        if not data:
+                            break
+                        entry.write(data)
+                        yield stream.drain()
+    # The central directory, written when the archive is closed
+    yield stream.drain()
@@ -0,0 +1,454 @@
+"""Batch rescoring of every completed submission in a campaign."""
+
+import argparse
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+from database import get_db_connection, map_row_to_dict
+from prompt_budget import PromptBudget, record_prompt_metrics
+from report_renderer import invalidate_report
+from scoring_agent import score_candidate_responses
+from scoring_jobs import job_handler
+
+logger = logging.getLogger(__name__)
+
+RUN_COLUMNS = [
+    "id",
+    "campaign_id",
+    "status",
+    "total",
+    "completed",
+    "failed",
+    "created_at",
+    "updated_at",
+    "finished_at",
+]
+
+
+class RateLimiter:
+    """Spaces out calls so no more than requests_per_minute start in any minute."""
+
+    def __init__(self, requests_per_minute):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def create_rescoring_run(campaign_id):
+    """
+    Create a rescoring run covering every completed submission of a campaign.
+
+    Returns:
+        The ID of the new run, or None if the campaign does not exist
+    """
+    run_id = str(uuid.uuid4())
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM campaigns WHERE id = ?", (campaign_id,))
+        if not cursor.fetchone():
+            return None
+
+        cursor.execute(
+            "INSERT INTO rescoring_runs (id, campaign_id) VALUES (?, ?)",
+            (run_id, campaign_id),
+        )
+        cursor.execute(
+            """
+            INSERT INTO rescoring_run_items (run_id, submission_id)
+            SELECT ?, id FROM submissions
+            WHERE campaign_id = ? AND is_complete = 1
+            """,
+            (run_id, campaign_id),
+        )
+        cursor.execute(
+            "UPDATE rescoring_runs SET total = ? WHERE id = ?",
+            (cursor.rowcount, run_id),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    logger.info(f"Created rescoring run {run_id} for campaign {campaign_id}")
+    return run_id
+
+
+def get_rescoring_run(run_id):
+    """Return a rescoring run's progress, or None if it does not exist."""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT {', '.join(RUN_COLUMNS)} FROM rescoring_runs WHERE id = ?",
+            (run_id,),
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None
+        run = map_row_to_dict(row, RUN_COLUMNS)
+
+        cursor.execute(
+            """
+            SELECT submission_id, error FROM rescoring_run_items
+            WHERE run_id = ? AND status = 'failed'
+            """,
+            (run_id,),
+        )
+        run["failures"] = [
+            map_row_to_dict(r, ["submission_id", "error"]) for r in cursor.fetchall()
+        ]
+        return run
+    finally:
+        conn.close()
+
+
+def _load_campaign(cursor, campaign_id):
+    cursor.execute(
+        "SELECT title, campaign_context, job_description FROM campaigns WHERE id = ?",
+        (campaign_id,),
+    )
+    campaign = map_row_to_dict(
+        cursor.fetchone(), ["title", "campaign_context", "job_description"]
+    )
+    cursor.execute(
+        """
+        SELECT id, body, scoring_prompt, max_points
+        FROM questions
+        WHERE campaign_id = ?
+        ORDER BY order_index
+        """,
+        (campaign_id,),
+    )
+    questions = [
+        map_row_to_dict(row, ["id", "body", "scoring_prompt", "max_points"])
+        for row in cursor.fetchall()
+    ]
+    return campaign, questions
+
+
+def _claim_pending_items(run_id, limit):
+    """Mark up to limit pending items as running and return their submission IDs."""
+    claimed_at = time.time()
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT submission_id FROM rescoring_run_items
+            WHERE run_id = ? AND status = 'pending'
+            LIMIT ?
+            """,
+            (run_id, limit),
+        )
+        candidates = [row[0] for row in cursor.fetchall()]
+        if not candidates:
+            return []
+
+        placeholders = ", ".join("?" for _ in candidates)
+        cursor.execute(
+            f"""
+            UPDATE rescoring_run_items
+            SET status = 'running', claimed_at = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE run_id = ? AND submission_id IN ({placeholders})
+            AND status = 'pending'
+            """,
+            (claimed_at, run_id, *candidates),
+        )
+        # Only the items this call moved from pending carry its claimed_at
+        cursor.execute(
+            f"""
+            SELECT submission_id FROM rescoring_run_items
+            WHERE run_id = ? AND submission_id IN ({placeholders})
+            AND status = 'running' AND claimed_at = ?
+            """,
+            (run_id, *candidates, claimed_at),
+        )
+        submission_ids = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+        return submission_ids
+    finally:
+        conn.close()
+
+
+def _rescore_submission(campaign, questions, submission_id, rate_limiter):
+    """Rescore one submission from its stored answers. Returns (answer_scores, total)."""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT question_id, transcript FROM submission_answers
+            WHERE submission_id = ?
+            """,
+            (submission_id,),
+        )
+        transcripts = {row[0]: row[1] for row in cursor.fetchall()}
+    finally:
+        conn.close()
+
+    answered_questions = [q for q in questions if q["id"] in transcripts]
+    if not answered_questions:
+        return [], 0
+
+    candidate_responses = {
+        q["body"]: transcripts[q["id"]] or "" for q in answered_questions
+    }
+
+    rate_limiter.wait()
+    budget = PromptBudget(scoring_mode=Config.SCORING_MODE)
+    scores = score_candidate_responses(
+        campaign, answered_questions, candidate_responses, budget=budget
+    )
+    record_prompt_metrics(submission_id, budget)
+
+    answer_scores = [
+        (s["score"], s["rationale"], submission_id, s["question_id"])
+        for s in scores
+        if s.get("question_id") in transcripts
+    ]
+    return answer_scores, sum(score for score, _, _, _ in answer_scores)
+
+
+def _flush(run_id, succeeded, failed):
+    """Write a batch of rescored submissions and failures in one transaction."""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.executemany(
+            """
+            UPDATE submission_answers
+            SET score = ?, score_rationale = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE submission_id = ? AND question_id = ?
+            """,
+            [row for answer_scores, _ in succeeded.values() for row in answer_scores],
+        )
+        cursor.executemany(
+            """
+            UPDATE submissions
+            SET total_points = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            [(total, submission_id) for submission_id, (_, total) in succeeded.items()],
+        )
+        cursor.executemany(
+            """
+            UPDATE rescoring_run_items
+            SET status = 'completed', total_points = ?, error = NULL,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE run_id = ? AND submission_id = ?
+            """,
+            [
+                (total, run_id, submission_id)
+                for submission_id, (_, total) in succeeded.items()
+            ],
+        )
+        cursor.executemany(
+            """
+            UPDATE rescoring_run_items
+            SET status = 'failed', error = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE run_id = ? AND submission_id = ?
+            """,
+            [(error, run_id, submission_id) for submission_id, error in failed.items()],
+        )
+        cursor.execute(
+            """
+            UPDATE rescoring_runs
+            SET completed = completed + ?, failed = failed + ?,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            (len(succeeded), len(failed), run_id),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    for submission_id in succeeded:
+        invalidate_report(submission_id)
+
+
+def _prepare_run(run_id, retry_failed):
+    """
+    Mark a run as running and return interrupted (and optionally failed) items to pending.
+
+    Returns:
+        The run's campaign ID, or None if the run does not exist
+    """
+    stale_before = time.time() - Config.SCORING_JOB_LEASE_SECONDS
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT campaign_id FROM rescoring_runs WHERE id = ?", (run_id,))
+        row = cursor.fetchone()
+        if not row:
+            return None
+
+        cursor.execute(
+            """
+            UPDATE rescoring_run_items SET status = 'pending'
+            WHERE run_id = ? AND status = 'running' AND claimed_at < ?
+            """,
+            (run_id, stale_before),
+        )
+        if retry_failed:
+            cursor.execute(
+                """
+                UPDATE rescoring_run_items SET status = 'pending', error = NULL
+                WHERE run_id = ? AND status = 'failed'
+                """,
+                (run_id,),
+            )
+            cursor.execute(
+                "UPDATE rescoring_runs SET failed = 0 WHERE id = ?", (run_id,)
+            )
+        cursor.execute(
+            """
+            UPDATE rescoring_runs
+            SET status = 'running', finished_at = NULL, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            (run_id,),
+        )
+        conn.commit()
+        return row[0]
+    finally:
+        conn.close()
+
+
+def execute_rescoring_run(
+    run_id, max_workers=None, requests_per_minute=None, retry_failed=False
+):
+    """
+    Rescore the pending submissions of a run with bounded concurrency and rate limiting.
+
+    Progress is checkpointed per batch, so calling this again on an interrupted run
+    resumes where it stopped.
+
+    Returns:
+        The run's progress as returned by get_rescoring_run
+    """
+    max_workers = max_workers or Config.RESCORING_MAX_WORKERS
+    rate_limiter = RateLimiter(
+        requests_per_minute or Config.RESCORING_REQUESTS_PER_MINUTE
+    )
+    batch_size = max(Config.RESCORING_BATCH_SIZE, max_workers)
+
+    campaign_id = _prepare_run(run_id, retry_failed)
+    if campaign_id is None:
+        raise ValueError(f"Rescoring run {run_id} not found")
+
+    conn = get_db_connection()
+    try:
+        campaign, questions = _load_campaign(conn.cursor(), campaign_id)
+    finally:
+        conn.close()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            submission_ids = _claim_pending_items(run_id, batch_size)
+            if not submission_ids:
+                break
+
+            futures = {
+                submission_id: executor.submit(
+                    _rescore_submission,
+                    campaign,
+                    questions,
+                    submission_id,
+                    rate_limiter,
+                )
+                for submission_id in submission_ids
+            }
+
+            succeeded = {}
+            failed = {}
+            for submission_id, future in futures.items():
+                try:
+                    succeeded[submission_id] = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to rescore submission {submission_id}: {e}")
+                    failed[submission_id] = str(e)
+
+            _flush(run_id, succeeded, failed)
+            logger.info(
+                f"Rescoring run {run_id}: {len(succeeded)} rescored, "
+                f"{len(failed)} failed in this batch"
+            )
+
+    conn = get_db_connection()
+    try:
+        conn.execute(
+            """
+            UPDATE rescoring_runs
+            SET status = CASE WHEN failed > 0 THEN 'completed_with_errors'
+                              ELSE 'completed' END,
+                finished_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            (run_id,),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    return get_rescoring_run(run_id)
+
+
+@job_handler("rescore_campaign")
+def run_rescoring_job(payload):
+    """Job queue entry point for a campaign rescoring run."""
+    return execute_rescoring_run(
+        payload["run_id"], retry_failed=payload.get("retry_failed", False)
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(
+        description="Rescore every completed submission of a campaign"
+    )
+    parser.add_argument("campaign_id", nargs="?", help="Campaign to rescore")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Resume an interrupted run")
+    parser.add_argument("--retry-failed", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rpm", type=int, default=None, help="Requests per minute")
+    args = parser.parse_args()
+
+    if args.resume:
+        run_id = args.resume
+    elif args.campaign_id:
+        run_id = create_rescoring_run(args.campaign_id)
+        if run_id is None:
+            parser.error(f"Campaign {args.campaign_id} not found")
+    else:
+        parser.error("Either campaign_id or --resume is required")
+
+    print(f"Rescoring run {run_id}")
+    print(
+        execute_rescoring_run(
+            run_id,
+            max_workers=args.workers,
+            requests_per_minute=args.rpm,
+            retry_failed=args.retry_failed,
+        )
+    )
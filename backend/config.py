@@ -17,9 +17,17 @@ class Config:
     DB_NAME = os.environ.get("DB_NAME", "gulpin")
     DB_PORT = int(os.environ.get("DB_PORT", 3306))
 
+    # Database backend: "sqlite" for the local interview_agent.db file, or "mariadb"
+    # for the MariaDB/MySQL server above (required to run more than one API node)
+    DB_BACKEND = os.environ.get("DB_BACKEND", "sqlite").lower()
+
     # S3 Bucket for storing media or backups, if applicable
-    S3_BUCKET_NAME = "gulpin-interviews"
-    S3_REGION = "us-east-1"
+    S3_BUCKET_NAME = os.environ.get("S3_BUCKET_NAME", "gulpin-interviews")
+    S3_REGION = os.environ.get("S3_REGION", "us-east-1")
+    # S3-compatible server to use instead of AWS (e.g. MinIO or LocalStack), and
+    # the address browsers reach it at if that differs (e.g. inside docker compose)
+    S3_ENDPOINT_URL = os.environ.get("S3_ENDPOINT_URL") or None
+    S3_PUBLIC_ENDPOINT_URL = os.environ.get("S3_PUBLIC_ENDPOINT_URL") or S3_ENDPOINT_URL
     AWS_ACCESS_KEY_ID = os.environ.get("AWS_ACCESS_KEY_ID")
     AWS_SECRET_ACCESS_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY")
     AWS_SESSION_TOKEN = os.environ.get("AWS_SESSION_TOKEN")
@@ -27,6 +35,161 @@ class Config:
     # OpenAI API Key
     OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 
+    # Shared OpenAI HTTP client: connection pool limits and timeouts (seconds)
+    OPENAI_MAX_CONNECTIONS = int(os.environ.get("OPENAI_MAX_CONNECTIONS", 20))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(
+        os.environ.get("OPENAI_MAX_KEEPALIVE_CONNECTIONS", 10)
+    )
+    OPENAI_KEEPALIVE_EXPIRY = float(os.environ.get("OPENAI_KEEPALIVE_EXPIRY", 60))
+    OPENAI_TIMEOUT = float(os.environ.get("OPENAI_TIMEOUT", 120))
+    OPENAI_CONNECT_TIMEOUT = float(os.environ.get("OPENAI_CONNECT_TIMEOUT", 5))
+
+    # Background scoring job queue
+    SCORING_WORKERS = int(os.environ.get("SCORING_WORKERS", 2))
+    SCORING_JOB_MAX_ATTEMPTS = int(os.environ.get("SCORING_JOB_MAX_ATTEMPTS", 3))
+    SCORING_JOB_RETRY_DELAY = float(os.environ.get("SCORING_JOB_RETRY_DELAY", 5))
+    SCORING_JOB_POLL_INTERVAL = float(os.environ.get("SCORING_JOB_POLL_INTERVAL", 2))
+    # Running jobs whose worker has been silent this long are re-queued
+    SCORING_JOB_LEASE_SECONDS = int(os.environ.get("SCORING_JOB_LEASE_SECONDS", 600))
+    # How often a worker renews the lease of the job it is running, and how often
+    # each process looks for stale jobs; keep it well below the lease
+    SCORING_JOB_HEARTBEAT_INTERVAL = float(
+        os.environ.get("SCORING_JOB_HEARTBEAT_INTERVAL", 30)
+    )
+
+    # Interview scoring: "combined" scores all questions in one request,
+    # "per_question" scores each question in its own concurrent request
+    SCORING_MODE = os.environ.get("SCORING_MODE", "combined")
+    SCORING_MAX_CONCURRENCY = int(os.environ.get("SCORING_MAX_CONCURRENCY", 4))
+    SCORING_QUESTION_ATTEMPTS = int(os.environ.get("SCORING_QUESTION_ATTEMPTS", 2))
+    # Token budgets for scoring prompts: responses are compacted or truncated to fit
+    SCORING_RESPONSE_TOKEN_BUDGET = int(
+        os.environ.get("SCORING_RESPONSE_TOKEN_BUDGET", 1500)
+    )
+    SCORING_PROMPT_TOKEN_BUDGET = int(
+        os.environ.get("SCORING_PROMPT_TOKEN_BUDGET", 12000)
+    )
+
+    # SQLite connection profile, applied to every connection
+    SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+    # Negative values are KiB, positive values are pages (SQLite convention)
+    SQLITE_CACHE_SIZE = int(os.environ.get("SQLITE_CACHE_SIZE", -64000))
+    SQLITE_TEMP_STORE = os.environ.get("SQLITE_TEMP_STORE", "MEMORY")
+    # WAL checkpointing: automatic checkpoint after this many pages, WAL file
+    # truncated back to this size, plus a periodic passive checkpoint
+    SQLITE_WAL_AUTOCHECKPOINT = int(os.environ.get("SQLITE_WAL_AUTOCHECKPOINT", 1000))
+    SQLITE_JOURNAL_SIZE_LIMIT = int(
+        os.environ.get("SQLITE_JOURNAL_SIZE_LIMIT", 64 * 1024 * 1024)
+    )
+    SQLITE_CHECKPOINT_INTERVAL = float(
+        os.environ.get("SQLITE_CHECKPOINT_INTERVAL", 300)
+    )
+
+    # Per-process pool behind get_db_connection: SQLITE_POOL_SIZE idle connections
+    # are kept open, up to SQLITE_POOL_MAX_OVERFLOW more are opened under load
+    SQLITE_POOL_SIZE = int(os.environ.get("SQLITE_POOL_SIZE", 10))
+    SQLITE_POOL_MAX_OVERFLOW = int(os.environ.get("SQLITE_POOL_MAX_OVERFLOW", 20))
+    SQLITE_POOL_TIMEOUT = float(os.environ.get("SQLITE_POOL_TIMEOUT", 30))
+    SQLITE_STATEMENT_CACHE_SIZE = int(
+        os.environ.get("SQLITE_STATEMENT_CACHE_SIZE", 256)
+    )
+
+    # Per-process pool of MariaDB connections, used instead of the SQLITE_POOL_*
+    # settings when DB_BACKEND is "mariadb"
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+    DB_POOL_MAX_OVERFLOW = int(os.environ.get("DB_POOL_MAX_OVERFLOW", 20))
+    DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+    DB_CONNECT_TIMEOUT = int(os.environ.get("DB_CONNECT_TIMEOUT", 10))
+    # Idle pooled connections are pinged before reuse after this many seconds
+    DB_POOL_PRE_PING_AFTER = float(os.environ.get("DB_POOL_PRE_PING_AFTER", 30))
+    # How long a node waits for another node to finish applying migrations
+    DB_MIGRATION_LOCK_TIMEOUT = int(os.environ.get("DB_MIGRATION_LOCK_TIMEOUT", 600))
+
+    # Keyset pagination of list endpoints (?limit=&cursor=)
+    PAGE_SIZE_DEFAULT = int(os.environ.get("PAGE_SIZE_DEFAULT", 50))
+    PAGE_SIZE_MAX = int(os.environ.get("PAGE_SIZE_MAX", 500))
+
+    # Batch rescoring of whole campaigns
+    RESCORING_MAX_WORKERS = int(os.environ.get("RESCORING_MAX_WORKERS", 4))
+    RESCORING_REQUESTS_PER_MINUTE = int(
+        os.environ.get("RESCORING_REQUESTS_PER_MINUTE", 60)
+    )
+    RESCORING_BATCH_SIZE = int(os.environ.get("RESCORING_BATCH_SIZE", 20))
+
+    # Client-side limits for OpenAI requests (per process)
+    LLM_REQUESTS_PER_MINUTE = int(os.environ.get("LLM_REQUESTS_PER_MINUTE", 500))
+    LLM_TOKENS_PER_MINUTE = int(os.environ.get("LLM_TOKENS_PER_MINUTE", 200000))
+    LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", 8))
+    LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", 5))
+    LLM_RETRY_BASE_DELAY = float(os.environ.get("LLM_RETRY_BASE_DELAY", 1))
+    LLM_RETRY_MAX_DELAY = float(os.environ.get("LLM_RETRY_MAX_DELAY", 30))
+    LLM_ESTIMATED_COMPLETION_TOKENS = int(
+        os.environ.get("LLM_ESTIMATED_COMPLETION_TOKENS", 1000)
+    )
+
+    # Chat completion response cache
+    LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH")  # defaults to backend/llm_cache.db
+    LLM_CACHE_TTL_SECONDS = int(os.environ.get("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+    LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_BYTES", 100 * 1024 * 1024))
+
+    # Direct-to-S3 multipart uploads of interview media. S3 requires parts of at
+    # least 5 MiB (except the last) and at most 10,000 parts per upload
+    MEDIA_UPLOAD_PART_SIZE = int(
+        os.environ.get("MEDIA_UPLOAD_PART_SIZE", 8 * 1024 * 1024)
+    )
+    MEDIA_UPLOAD_MAX_SIZE = int(
+        os.environ.get("MEDIA_UPLOAD_MAX_SIZE", 5 * 1024 * 1024 * 1024)
+    )
+    MEDIA_UPLOAD_URL_EXPIRY = int(os.environ.get("MEDIA_UPLOAD_URL_EXPIRY", 3600))
+
+    # Whisper transcription of answer recordings, in TRANSCRIPTION_WORKERS processes
+    # that each load the model once and use TRANSCRIPTION_THREADS CPU threads.
+    # "int8" quantizes the model for faster CPU inference, "fp32" keeps full precision
+    TRANSCRIPTION_MODEL = os.environ.get("TRANSCRIPTION_MODEL", "small")
+    TRANSCRIPTION_WORKERS = int(os.environ.get("TRANSCRIPTION_WORKERS", 1))
+    TRANSCRIPTION_THREADS = int(os.environ.get("TRANSCRIPTION_THREADS", 4))
+    TRANSCRIPTION_COMPUTE_TYPE = os.environ.get(
+        "TRANSCRIPTION_COMPUTE_TYPE", "int8"
+    ).lower()
+    TRANSCRIPTION_TIMEOUT = float(os.environ.get("TRANSCRIPTION_TIMEOUT", 1800))
+    # Spoken language of the answers (e.g. "en"); detected per chunk when unset
+    TRANSCRIPTION_LANGUAGE = os.environ.get("TRANSCRIPTION_LANGUAGE") or None
+    # Every process that runs transcribe_answer jobs loads its own models, so with
+    # several web workers (gunicorn) set this and run `python transcription_worker.py`
+    # as the one process that transcribes; web processes then leave those jobs to it
+    TRANSCRIPTION_DEDICATED_WORKER = (
+        os.environ.get("TRANSCRIPTION_DEDICATED_WORKER", "false").lower() == "true"
+    )
+    # Recordings are transcribed in chunks split at pauses: a chunk ends at the
+    # first pause of TRANSCRIPTION_VAD_MIN_SILENCE_MS after the minimum length, and
+    # audio below TRANSCRIPTION_VAD_THRESHOLD_DB (dBFS) counts as silence
+    TRANSCRIPTION_CHUNK_MIN_SECONDS = float(
+        os.environ.get("TRANSCRIPTION_CHUNK_MIN_SECONDS", 5)
+    )
+    TRANSCRIPTION_CHUNK_MAX_SECONDS = float(
+        os.environ.get("TRANSCRIPTION_CHUNK_MAX_SECONDS", 30)
+    )
+    TRANSCRIPTION_VAD_MIN_SILENCE_MS = int(
+        os.environ.get("TRANSCRIPTION_VAD_MIN_SILENCE_MS", 500)
+    )
+    TRANSCRIPTION_VAD_THRESHOLD_DB = float(
+        os.environ.get("TRANSCRIPTION_VAD_THRESHOLD_DB", -40)
+    )
+
+    # Submission PDF reports, rendered on a background thread pool and cached on
+    # disk by a hash of their content
+    REPORT_CACHE_DIR = os.environ.get("REPORT_CACHE_DIR")  # defaults to backend/report_cache
+    REPORT_RENDER_WORKERS = int(os.environ.get("REPORT_RENDER_WORKERS", 2))
+    # How long a request waits for a report before asking the client to retry
+    REPORT_RENDER_TIMEOUT = float(os.environ.get("REPORT_RENDER_TIMEOUT", 30))
+
+    # Rows read from the database at a time by streamed campaign exports
+    EXPORT_FETCH_SIZE = int(os.environ.get("EXPORT_FETCH_SIZE", 500))
+
     # LiveKit credentials
     LIVEKIT_URL = os.environ.get("LIVEKIT_URL")
     LIVEKIT_API_KEY = os.environ.get("LIVEKIT_API_KEY")
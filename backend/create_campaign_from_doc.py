@@ -1,9 +1,9 @@
 import os
-from openai import OpenAI
 from docx import Document
 import PyPDF2
 import re
 import json
+from llm_gateway import chat_completion, is_json
 
 def extract_text_from_docx(file_path):
     """Extract text from a .docx file"""
@@ -41,8 +41,6 @@ def extract_text_from_file(file_path):
         raise ValueError(f"Unsupported file extension: {extension}")
 
 def generate_campaign_context(text):
-    client = OpenAI()
-
     """Generate a campaign context from the job description"""
     prompt = f"""
     You are a helpful HR assistant tasked with creating an interview campaign context.
@@ -65,7 +63,7 @@ def generate_campaign_context(text):
     """
     
     try:
-        completion = client.chat.completions.create(
+        return chat_completion(
             model="gpt-4o-mini",
             messages=[
                 {
@@ -74,15 +72,11 @@ def generate_campaign_context(text):
                 }
             ]
         )
-
-        return completion.choices[0].message.content
     except Exception as e:
         print(f"Error generating campaign context: {e}")
         return None
 
 def generate_interview_questions(text, campaign_context):
-    client = OpenAI()
-
     """Generate interview questions based on the job description"""
 
     prompt = f"""
@@ -112,17 +106,18 @@ def generate_interview_questions(text, campaign_context):
     
     try:
 
-        completion = client.chat.completions.create(
+        content = chat_completion(
             model="gpt-4o-mini",
             messages=[
                 {
                     "role": "user",
                     "content": prompt
                 }
-            ]
+            ],
+            cache_if=is_json,
         )
         
-        json_output = json.loads(completion.choices[0].message.content)
+        json_output = json.loads(content)
         return json_output
     except Exception as e:
         print(f"Error generating interview questions: {e}")
@@ -1,15 +1,38 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.pool import QueuePool
 from config import Config
+from flask import g, has_app_context
+import base64
+import collections
+import json
 import sqlite3
 import os
 import datetime
+import functools
+import logging
+import threading
+import time
+import weakref
+from db_backends import (
+    apply_connection_profile,
+    connection_profile,
+    create_backend,
+    translate_sql,
+)
+
+logger = logging.getLogger(__name__)
 
-# Create SQLAlchemy engine with connection pooling for SQLite
+# Path of the SQLite database file, used when DB_BACKEND is "sqlite"
 db_path = os.path.join(os.path.dirname(__file__), "interview_agent.db")
+
+# The configured backend: connects, resets pooled connections and provides the
+# few operations (ANALYZE, cross-process locks) whose SQL differs per backend
+db_backend = create_backend(Config.DB_BACKEND, db_path)
+
+# Create SQLAlchemy engine with connection pooling
 engine = create_engine(
-    f"sqlite:///{db_path}",
+    db_backend.sqlalchemy_url(),
     poolclass=QueuePool,
     pool_size=5,
     max_overflow=10,
@@ -18,6 +41,29 @@ engine = create_engine(
     pool_pre_ping=True,
 )
 
+
+if db_backend.name == "sqlite":
+
+    @event.listens_for(engine, "connect")
+    def _apply_engine_connection_profile(dbapi_connection, connection_record):
+        apply_connection_profile(dbapi_connection)
+
+else:
+
+    @event.listens_for(engine, "connect")
+    def _apply_engine_session_setup(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(db_backend.session_setup_sql())
+        cursor.close()
+
+    @event.listens_for(engine, "before_cursor_execute", retval=True)
+    def _translate_engine_statement(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        # Statements are compiled by SQLAlchemy, so placeholders are already native
+        return translate_sql(statement, placeholders=False), parameters
+
+
 # Create session factory
 SessionFactory = sessionmaker(bind=engine)
 
@@ -30,9 +76,337 @@ def get_db_session():
     return Session()
 
 
+class PoolTimeoutError(sqlite3.OperationalError):
+    """Raised when no pooled connection becomes available within the pool timeout."""
+
+
+class PooledConnection:
+    """
+    A database connection checked out of a ConnectionPool.
+
+    Behaves like the underlying connection, except that close() returns it to the
+    pool instead of closing it. Using it after close() raises ProgrammingError,
+    as with a closed sqlite3 connection.
+    """
+
+    def __init__(self, pool, conn):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_conn", conn)
+        object.__setattr__(self, "_tracked_in", None)
+
+    def track_in(self, connections):
+        """Add this connection to a set it is removed from again when closed."""
+        object.__setattr__(self, "_tracked_in", connections)
+        connections.add(self)
+
+    def _connection(self):
+        conn = object.__getattribute__(self, "_conn")
+        if conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return conn
+
+    def __getattr__(self, name):
+        return getattr(self._connection(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._connection(), name, value)
+
+    def __enter__(self):
+        self._connection().__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._connection().__exit__(exc_type, exc_value, traceback)
+
+    @property
+    def closed(self):
+        return object.__getattribute__(self, "_conn") is None
+
+    def close(self):
+        """Return the connection to the pool. Safe to call more than once."""
+        conn = object.__getattribute__(self, "_conn")
+        if conn is not None:
+            object.__setattr__(self, "_conn", None)
+            tracked_in = object.__getattribute__(self, "_tracked_in")
+            if tracked_in is not None:
+                tracked_in.discard(self)
+            self._pool.release(conn)
+
+
+class ConnectionPool:
+    """
+    Thread- and greenlet-safe pool of database connections for one process.
+
+    Up to size idle connections are kept open, so their connection setup (the
+    SQLite profile and statement cache, or a MariaDB session) is reused across
+    requests. Connections to a server that sat idle are pinged before reuse. Under load up to
+    max_overflow extra connections are opened and closed again when returned.
+    Once every connection is checked out, acquire() waits up to timeout seconds.
+    Under gevent the threading primitives are monkey-patched, so waiting yields to
+    other greenlets.
+    """
+
+    def __init__(self, backend, size, max_overflow, timeout):
+        self.backend = backend
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        # LIFO so the most recently used (warmest) connection is handed out first
+        self._idle = collections.deque()
+        self._cond = threading.Condition()
+        self._open = 0
+        self._checked_out = 0
+        self._peak_checked_out = 0
+        self._created = 0
+        self._discarded = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+
+    def _checkout_idle(self, conn, idle_since):
+        """Ping a connection that has been idle long enough to have been dropped."""
+        pre_ping_after = self.backend.pre_ping_after
+        if pre_ping_after is None or time.monotonic() - idle_since < pre_ping_after:
+            return conn
+        try:
+            self.backend.ping(conn)
+            return conn
+        except sqlite3.Error as e:
+            logger.warning(f"Replacing stale pooled connection: {str(e)}")
+            with self._cond:
+                self._discarded += 1
+                self._created += 1
+            conn.close()
+            return self.backend.connect()
+
+    def acquire(self):
+        """Check out a connection, opening a new one if none is idle."""
+        deadline = time.monotonic() + self.timeout
+        idle = None
+        with self._cond:
+            while True:
+                if self._idle:
+                    idle = self._idle.pop()
+                    break
+                if self._open < self.size + self.max_overflow:
+                    self._open += 1
+                    self._created += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"No database connection available after {self.timeout}s "
+                        f"({self._checked_out} checked out)"
+                    )
+                self._waits += 1
+                self._cond.wait(remaining)
+
+            self._checked_out += 1
+            self._checkouts += 1
+            self._peak_checked_out = max(self._peak_checked_out, self._checked_out)
+
+        try:
+            if idle is not None:
+                conn = self._checkout_idle(*idle)
+            else:
+                conn = self.backend.connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._checked_out -= 1
+                self._cond.notify()
+            raise
+        return PooledConnection(self, conn)
+
+    def release(self, conn):
+        """Reset and return a connection to the pool, or close it if the pool is full."""
+        try:
+            # Match sqlite3 close(): uncommitted changes are discarded
+            self.backend.reset(conn)
+            reusable = True
+        except sqlite3.Error as e:
+            logger.warning(f"Discarding broken pooled connection: {str(e)}")
+            reusable = False
+
+        with self._cond:
+            self._checked_out -= 1
+            if reusable and len(self._idle) < self.size:
+                self._idle.append((conn, time.monotonic()))
+                conn = None
+            else:
+                self._open -= 1
+                self._discarded += 1
+            self._cond.notify()
+
+        if conn is not None:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def stats(self):
+        with self._cond:
+            return {
+                "backend": self.backend.name,
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "idle": len(self._idle),
+                "checked_out": self._checked_out,
+                "peak_checked_out": self._peak_checked_out,
+                "checkouts": self._checkouts,
+                "created": self._created,
+                "discarded": self._discarded,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+            }
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_connection_pool():
+    """Return this process's connection pool, creating it on first use or after a fork."""
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is not None and _pool_pid == pid:
+        return _pool
+
+    with _pool_lock:
+        if _pool is None or _pool_pid != pid:
+            _pool = ConnectionPool(db_backend, **db_backend.pool_settings())
+            _pool_pid = pid
+        return _pool
+
+
 def get_db_connection():
-    """Get a direct database connection using sqlite3."""
-    return sqlite3.connect(db_path)
+    """
+    Check out a pooled connection to the configured database backend.
+
+    The connection behaves like a sqlite3 connection on every backend, so queries
+    are written with "?" placeholders in SQLite's dialect. close() returns the connection to the pool. Connections checked out during a
+    Flask request are also returned when the app context is torn down, so a
+    missed close() does not leak them.
+    """
+    conn = get_connection_pool().acquire()
+    if has_app_context():
+        # Only connections not closed yet are tracked, so a long request (e.g. a
+        # streamed export) checking out one per batch does not accumulate them
+        conn.track_in(g.setdefault("_db_connections", set()))
+    return conn
+
+
+def release_request_connections(exception=None):
+    """Return any connections still checked out by the current app context."""
+    for conn in list(g.pop("_db_connections", ())):
+        conn.close()
+
+
+def init_app(app):
+    """Return pooled connections to the pool at the end of every request."""
+    app.teardown_appcontext(release_request_connections)
+
+
+# PRAGMA values as SQLite reports them back, for settings given by name
+_PRAGMA_VALUE_CODES = {
+    "synchronous": {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"},
+    "temp_store": {0: "DEFAULT", 1: "FILE", 2: "MEMORY"},
+}
+
+
+def verify_connection_profile():
+    """
+    Check that the connection profile took effect on a fresh connection.
+
+    Mismatches (e.g. WAL refused on a network filesystem, or mmap disabled at
+    compile time) are logged rather than raised.
+
+    Returns:
+        Dictionary mapping each PRAGMA to its (expected, actual) values, empty
+        unless the SQLite backend is in use
+    """
+    results = {}
+    if db_backend.name != "sqlite":
+        return results
+    conn = get_db_connection()
+    try:
+        for name, expected in connection_profile():
+            actual = conn.execute(f"PRAGMA {name}").fetchone()[0]
+            actual = _PRAGMA_VALUE_CODES.get(name, {}).get(actual, actual)
+            if isinstance(actual, str):
+                actual = actual.upper()
+            results[name] = (expected, actual)
+            if actual != expected:
+                logger.warning(
+                    f"SQLite PRAGMA {name} is {actual!r}, expected {expected!r}"
+                )
+    finally:
+        conn.close()
+    return results
+
+
+def checkpoint_wal(mode="PASSIVE"):
+    """
+    Run a WAL checkpoint.
+
+    PASSIVE copies as many frames as possible without waiting for readers or
+    writers. TRUNCATE additionally waits for readers and resets the WAL file.
+
+    Returns:
+        Tuple of (busy, wal_frames, checkpointed_frames) as reported by SQLite
+    """
+    if mode.upper() not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+        raise ValueError(f"Invalid checkpoint mode: {mode}")
+    conn = get_db_connection()
+    try:
+        return tuple(conn.execute(f"PRAGMA wal_checkpoint({mode.upper()})").fetchone())
+    finally:
+        conn.close()
+
+
+_checkpointer = None
+_checkpointer_lock = threading.Lock()
+
+
+def start_wal_checkpointer(interval=None):
+    """
+    Start a daemon thread that runs a passive WAL checkpoint every interval seconds.
+
+    This backs up wal_autocheckpoint, which only runs on commit, so the WAL is
+    also folded back into the database while the app is idle. Safe to call more
+    than once, and a no-op unless the SQLite backend is in use.
+    """
+    global _checkpointer
+    interval = interval or Config.SQLITE_CHECKPOINT_INTERVAL
+    if (
+        db_backend.name != "sqlite"
+        or Config.SQLITE_JOURNAL_MODE.upper() != "WAL"
+        or interval <= 0
+    ):
+        return None
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                busy, wal_frames, checkpointed = checkpoint_wal("PASSIVE")
+                if busy or checkpointed < wal_frames:
+                    logger.info(
+                        f"WAL checkpoint copied {checkpointed} of {wal_frames} frames"
+                    )
+            except Exception as e:
+                logger.warning(f"WAL checkpoint failed: {str(e)}")
+
+    with _checkpointer_lock:
+        if _checkpointer is None or not _checkpointer.is_alive():
+            _checkpointer = threading.Thread(
+                target=run, name="sqlite-wal-checkpointer", daemon=True
+            )
+            _checkpointer.start()
+    return _checkpointer
 
 
 def build_filter_query(filters):
@@ -54,6 +428,182 @@ def build_filter_query(filters):
     return "WHERE " + " AND ".join(conditions), params
 
 
+# Request arguments used for pagination rather than as column filters
+PAGINATION_PARAMS = ("limit", "cursor")
+
+
+def encode_cursor(created_at, row_id):
+    """Encode the (created_at, id) key of the last row on a page as an opaque cursor."""
+    payload = json.dumps([created_at, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is invalid."""
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return created_at, row_id
+
+
+def parse_page_args(args):
+    """
+    Read keyset pagination parameters from request arguments.
+
+    Pagination is opt-in: requests without limit or cursor keep getting the full
+    list, so existing clients are unaffected.
+
+    Returns:
+        Tuple of (limit, after_key), where after_key is the decoded cursor or None,
+        or None if the request is not paginated
+
+    Raises:
+        ValueError: If limit or cursor is invalid
+    """
+    if not any(param in args for param in PAGINATION_PARAMS):
+        return None
+
+    try:
+        limit = int(args.get("limit", Config.PAGE_SIZE_DEFAULT))
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    limit = min(limit, Config.PAGE_SIZE_MAX)
+
+    cursor = args.get("cursor")
+    return limit, decode_cursor(cursor) if cursor else None
+
+
+def keyset_query(select_sql, where_clause, params, page, alias=None):
+    """
+    Add keyset pagination over (created_at, id) to a SELECT statement.
+
+    Args:
+        select_sql: SELECT ... FROM ... [JOIN ...] without WHERE or ORDER BY
+        where_clause: Existing "WHERE ..." clause (e.g. from build_filter_query) or ""
+        params: Values for the placeholders in where_clause
+        page: (limit, after_key) as returned by parse_page_args
+        alias: Alias of the paginated table in select_sql
+
+    Returns:
+        Tuple of (sql, params). One row more than limit is fetched so build_page can
+        tell whether there is a next page.
+    """
+    limit, after_key = page
+    prefix = f"{alias}." if alias else ""
+    params = list(params)
+
+    conditions = [f"({where_clause[len('WHERE '):]})"] if where_clause else []
+    if after_key:
+        conditions.append(f"({prefix}created_at, {prefix}id) > (?, ?)")
+        params.extend(after_key)
+
+    sql = select_sql
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += f" ORDER BY {prefix}created_at, {prefix}id LIMIT ?"
+    params.append(limit + 1)
+    return sql, params
+
+
+def build_page(rows, page, cursor_key):
+    """
+    Split rows fetched with keyset_query into the page and the next cursor.
+
+    Args:
+        rows: Rows returned by the query
+        page: (limit, after_key) as returned by parse_page_args
+        cursor_key: Function returning the (created_at, id) of a row
+
+    Returns:
+        Tuple of (page_rows, next_cursor), where next_cursor is None on the last page
+    """
+    limit = page[0]
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*cursor_key(rows[-1]))
+
+
+def bulk_insert(cursor, table, columns, rows):
+    """
+    Insert many rows with a single executemany.
+
+    Args:
+        cursor: Cursor of the connection whose transaction the rows are written in
+        table: Table name
+        columns: Column names, in the order of the values in each row
+        rows: Iterable of value tuples
+
+    Returns:
+        Number of rows inserted
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+    cursor.executemany(
+        f"""
+        INSERT INTO {table} ({", ".join(columns)})
+        VALUES ({", ".join("?" for _ in columns)})
+        """,
+        rows,
+    )
+    return len(rows)
+
+
+def bulk_upsert(cursor, table, columns, rows, conflict_columns, update_columns=None):
+    """
+    Insert many rows with a single executemany, updating rows that already exist.
+
+    A row already exists if it matches an existing row on conflict_columns, which
+    must be the table's primary key or a UNIQUE constraint. Existing rows keep their
+    other columns (such as id) and get update_columns from the new row.
+
+    Args:
+        cursor: Cursor of the connection whose transaction the rows are written in
+        table: Table name
+        columns: Column names, in the order of the values in each row
+        rows: Iterable of value tuples
+        conflict_columns: Columns identifying an existing row
+        update_columns: Columns to overwrite on existing rows. Defaults to every
+            column except id and conflict_columns. If empty, existing rows are
+            left unchanged.
+
+    Returns:
+        Number of rows written
+    """
+    if update_columns is None:
+        update_columns = [
+            column
+            for column in columns
+            if column != "id" and column not in conflict_columns
+        ]
+
+    rows = list(rows)
+    if not rows:
+        return 0
+
+    if update_columns:
+        assignments = [f"{column} = excluded.{column}" for column in update_columns]
+        if "updated_at" in get_table_columns(table, cursor):
+            assignments.append("updated_at = CURRENT_TIMESTAMP")
+        on_conflict = "DO UPDATE SET " + ", ".join(assignments)
+    else:
+        on_conflict = "DO NOTHING"
+
+    cursor.executemany(
+        f"""
+        INSERT INTO {table} ({", ".join(columns)})
+        VALUES ({", ".join("?" for _ in columns)})
+        ON CONFLICT ({", ".join(conflict_columns)}) {on_conflict}
+        """,
+        rows,
+    )
+    return len(rows)
+
+
 def create_users_table():
     session = get_db_session()
     try:
@@ -293,11 +843,185 @@ def create_campaign_access_codes_table():
         session.close()
 
 
+def create_scoring_jobs_table():
+    session = get_db_session()
+    try:
+        session.execute(
+            text(
+                """
+            CREATE TABLE IF NOT EXISTS scoring_jobs (
+                id TEXT PRIMARY KEY,
+                job_type VARCHAR(64) NOT NULL,
+                submission_id TEXT,
+                status VARCHAR(20) NOT NULL DEFAULT 'queued',
+                payload TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                attempts INT NOT NULL DEFAULT 0,
+                max_attempts INT NOT NULL DEFAULT 3,
+                run_after REAL NOT NULL DEFAULT 0,
+                locked_by VARCHAR(64),
+                locked_at REAL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP,
+                FOREIGN KEY (submission_id) REFERENCES submissions(id) ON DELETE CASCADE
+            )
+        """
+            )
+        )
+        # Workers poll for the oldest runnable queued job
+        session.execute(
+            text(
+                """
+            CREATE INDEX IF NOT EXISTS idx_scoring_jobs_status_run_after 
+            ON scoring_jobs(status, run_after)
+        """
+            )
+        )
+        session.execute(
+            text(
+                """
+            CREATE INDEX IF NOT EXISTS idx_scoring_jobs_submission_id 
+            ON scoring_jobs(submission_id)
+        """
+            )
+        )
+        session.commit()
+    finally:
+        session.close()
+
+
+def create_rescoring_tables():
+    session = get_db_session()
+    try:
+        session.execute(
+            text(
+                """
+            CREATE TABLE IF NOT EXISTS rescoring_runs (
+                id TEXT PRIMARY KEY,
+                campaign_id TEXT NOT NULL,
+                status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                total INT NOT NULL DEFAULT 0,
+                completed INT NOT NULL DEFAULT 0,
+                failed INT NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                finished_at TIMESTAMP,
+                FOREIGN KEY (campaign_id) REFERENCES campaigns(id) ON DELETE CASCADE
+            )
+        """
+            )
+        )
+        # One row per submission in a run; the status column is the run's checkpoint
+        session.execute(
+            text(
+                """
+            CREATE TABLE IF NOT EXISTS rescoring_run_items (
+                run_id TEXT NOT NULL,
+                submission_id TEXT NOT NULL,
+                status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                total_points INT,
+                error TEXT,
+                claimed_at REAL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (run_id, submission_id),
+                FOREIGN KEY (run_id) REFERENCES rescoring_runs(id) ON DELETE CASCADE,
+                FOREIGN KEY (submission_id) REFERENCES submissions(id) ON DELETE CASCADE
+            )
+        """
+            )
+        )
+        session.commit()
+    finally:
+        session.close()
+
+
+def create_scoring_prompt_metrics_table():
+    session = get_db_session()
+    try:
+        session.execute(
+            text(
+                """
+            CREATE TABLE IF NOT EXISTS scoring_prompt_metrics (
+                id TEXT PRIMARY KEY,
+                submission_id TEXT NOT NULL,
+                scoring_mode VARCHAR(20),
+                requests INT NOT NULL DEFAULT 0,
+                prompt_tokens INT NOT NULL DEFAULT 0,
+                response_tokens_before INT NOT NULL DEFAULT 0,
+                response_tokens_after INT NOT NULL DEFAULT 0,
+                truncated_responses INT NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (submission_id) REFERENCES submissions(id) ON DELETE CASCADE
+            )
+        """
+            )
+        )
+        session.execute(
+            text(
+                """
+            CREATE INDEX IF NOT EXISTS idx_scoring_prompt_metrics_submission_id 
+            ON scoring_prompt_metrics(submission_id)
+        """
+            )
+        )
+        session.commit()
+    finally:
+        session.close()
+
+
+def create_media_upload_sessions_table():
+    session = get_db_session()
+    try:
+        session.execute(
+            text(
+                """
+            CREATE TABLE IF NOT EXISTS media_upload_sessions (
+                id TEXT PRIMARY KEY,
+                submission_id TEXT NOT NULL,
+                question_id TEXT NOT NULL,
+                s3_key VARCHAR(255) NOT NULL,
+                upload_id VARCHAR(1024) NOT NULL,
+                content_type VARCHAR(255),
+                size BIGINT NOT NULL,
+                part_size INT NOT NULL,
+                part_count INT NOT NULL,
+                status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                completed_at TIMESTAMP,
+                FOREIGN KEY (submission_id) REFERENCES submissions(id) ON DELETE CASCADE,
+                FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE
+            )
+        """
+            )
+        )
+        session.execute(
+            text(
+                """
+            CREATE INDEX IF NOT EXISTS idx_media_upload_sessions_submission_id 
+            ON media_upload_sessions(submission_id)
+        """
+            )
+        )
+        session.commit()
+    finally:
+        session.close()
+
+
 def migrate_campaigns_table_id_type():
-    """Convert the campaigns table ID columns from BIGINT to TEXT"""
+    """Convert the campaigns table ID columns from BIGINT to TEXT if they aren't already"""
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
+        cursor.execute("PRAGMA table_info(campaigns)")
+        existing_columns = {row[1]: row[2] for row in cursor.fetchall()}
+        # Only integer IDs need converting (MariaDB reports TEXT IDs as VARCHAR)
+        if not existing_columns or "INT" not in existing_columns["id"].upper():
+            return
+
         # Create a new campaigns table with TEXT IDs
         cursor.execute(
             """
@@ -310,6 +1034,13 @@ def migrate_campaigns_table_id_type():
                 campaign_context TEXT,
                 job_description TEXT,
                 created_by TEXT,
+                position VARCHAR(255),
+                location VARCHAR(255),
+                work_mode VARCHAR(255),
+                education_level VARCHAR(255),
+                experience VARCHAR(255),
+                salary VARCHAR(255),
+                contract VARCHAR(255),
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (created_by) REFERENCES users(id)
@@ -317,13 +1048,17 @@ def migrate_campaigns_table_id_type():
         """
         )
 
-        # Copy data from old table to new table, converting IDs to TEXT
+        # Copy every column the old table has, converting IDs to TEXT
+        cursor.execute("PRAGMA table_info(campaigns_new)")
+        columns = [row[1] for row in cursor.fetchall() if row[1] in existing_columns]
+        select_columns = [
+            f"CAST({column} AS TEXT)" if column in ("id", "created_by") else column
+            for column in columns
+        ]
         cursor.execute(
-            """
-            INSERT OR IGNORE INTO campaigns_new 
-            SELECT CAST(id AS TEXT), title, max_user_submissions, max_points, 
-                   is_public, campaign_context, job_description, 
-                   CAST(created_by AS TEXT), created_at, updated_at
+            f"""
+            INSERT OR IGNORE INTO campaigns_new ({", ".join(columns)})
+            SELECT {", ".join(select_columns)}
             FROM campaigns
         """
         )
@@ -339,6 +1074,7 @@ def migrate_campaigns_table_id_type():
     except Exception as e:
         print(f"Error migrating campaigns table: {str(e)}")
         conn.rollback()
+        raise
     finally:
         conn.close()
 
@@ -374,11 +1110,13 @@ def migrate_campaigns_add_details():
     except Exception as e:
         print(f"Error migrating campaigns table: {str(e)}")
         conn.rollback()
+        raise
     finally:
         conn.close()
 
 
 def create_tables():
+    """Create the core application tables. Applied as the first schema migration."""
     create_users_table()
     create_campaigns_table()
     create_questions_table()
@@ -387,9 +1125,6 @@ def create_tables():
     create_campaign_assignments_table()
     create_resume_analysis_table()
     create_campaign_access_codes_table()
-    migrate_campaigns_table_id_type()
-    migrate_submissions_table_add_resume_columns()
-    migrate_campaigns_add_details()
 
 
 def migrate_submissions_table_add_resume_columns():
@@ -428,6 +1163,81 @@ def ensure_string_id(id_value):
     return str(id_value)
 
 
+DEFAULT_STRING_ID_COLUMNS = (
+    "id",
+    "user_id",
+    "campaign_id",
+    "submission_id",
+    "question_id",
+    "created_by",
+)
+
+# Columns that should always be strings, in addition to the ID columns
+ALWAYS_STRING_COLUMNS = ("phone_number", "country_code")
+
+# Value types the row mappers return unchanged without any further checks
+_PASSTHROUGH_TYPES = frozenset([str, int, float, bool, bytes, type(None)])
+
+
+def _to_plain(value):
+    # Convert datetime to string if it's a datetime object
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+def _to_string(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return None if value is None else str(value)
+
+
+@functools.lru_cache(maxsize=512)
+def compile_row_mapper(columns, string_id_columns=None):
+    """
+    Build a function that maps a row tuple to a dictionary for one column shape.
+
+    The per-column conversions done by map_row_to_dict are decided once here and
+    generated as a single dict display. Plain values (str, int, None, ...) are
+    returned without any function call. Mappers are cached per
+    (columns, string_id_columns).
+
+    Args:
+        columns: Tuple of column names, in row order
+        string_id_columns: Tuple of columns converted to strings, or None for
+                           DEFAULT_STRING_ID_COLUMNS
+
+    Returns:
+        Function taking a row tuple and returning a dictionary
+    """
+    if string_id_columns is None:
+        string_id_columns = DEFAULT_STRING_ID_COLUMNS
+    string_columns = frozenset(string_id_columns + ALWAYS_STRING_COLUMNS)
+
+    entries = []
+    for index, column in enumerate(columns):
+        if column in string_columns:
+            expression = (
+                f"v if (v := row[{index}]).__class__ is str or v is None "
+                f"else _to_string(v)"
+            )
+        else:
+            expression = (
+                f"v if (v := row[{index}]).__class__ in _PASSTHROUGH_TYPES "
+                f"else _to_plain(v)"
+            )
+        entries.append(f"{column!r}: {expression}")
+
+    source = "def map_row(row):\n    return {" + ", ".join(entries) + "}\n"
+    namespace = {
+        "_to_plain": _to_plain,
+        "_to_string": _to_string,
+        "_PASSTHROUGH_TYPES": _PASSTHROUGH_TYPES,
+    }
+    exec(compile(source, f"<row mapper: {', '.join(columns)}>", "exec"), namespace)
+    return namespace["map_row"]
+
+
 def map_row_to_dict(row, columns, string_id_columns=None):
     """
     Map a database row to a dictionary, ensuring ID columns are strings and handling datetime values.
@@ -441,50 +1251,141 @@ def map_row_to_dict(row, columns, string_id_columns=None):
     Returns:
         Dictionary with column names as keys and values from the row
     """
-    if string_id_columns is None:
-        string_id_columns = [
-            "id",
-            "user_id",
-            "campaign_id",
-            "submission_id",
-            "question_id",
-            "created_by",
-        ]
-
-    # Columns that should always be strings
-    string_columns = string_id_columns + ["phone_number", "country_code"]
-
-    # Create a dictionary mapping column names to their values
-    result = {}
-
     # If row is None, return empty dict
     if row is None:
-        return result
+        return {}
+
+    if string_id_columns is not None:
+        string_id_columns = tuple(string_id_columns)
 
-    # Get the actual column names from the cursor description
     if hasattr(row, "keys"):
-        # If row is a dict-like object (e.g., sqlite3.Row)
-        for column in columns:
-            if column in row:
-                value = row[column]
-                # Convert datetime to string if it's a datetime object
-                if isinstance(value, (datetime.datetime, datetime.date)):
-                    value = value.isoformat()
-                # For string columns, ensure the value is a string if it's not None
-                elif column in string_columns and value is not None:
-                    value = str(value)
-                result[column] = value
-    else:
-        # If row is a tuple/list, we need to match columns by index
-        for i, column in enumerate(columns):
-            if i < len(row):
-                value = row[i]
-                # Convert datetime to string if it's a datetime object
-                if isinstance(value, (datetime.datetime, datetime.date)):
-                    value = value.isoformat()
-                # For string columns, ensure the value is a string if it's not None
-                elif column in string_columns and value is not None:
-                    value = str(value)
-                result[column] = value
-
-    return result
+        # If row is a dict-like object (e.g., sqlite3.Row), map the columns it has
+        keys = row.keys()
+        columns = tuple(column for column in columns if column in keys)
+        values = tuple(row[column] for column in columns)
+        return compile_row_mapper(columns, string_id_columns)(values)
+
+    # If row is a tuple/list, columns are matched by index
+    columns = tuple(columns)
+    if len(row) < len(columns):
+        columns = columns[: len(row)]
+    return compile_row_mapper(columns, string_id_columns)(row)
+
+
+def map_rows(rows, columns, string_id_columns=None):
+    """Map a list of rows from one query with map_row_to_dict, compiling the mapper once."""
+    if not rows:
+        return []
+    first = rows[0]
+    if hasattr(first, "keys") or len(first) < len(columns):
+        return [map_row_to_dict(row, columns, string_id_columns) for row in rows]
+
+    if string_id_columns is not None:
+        string_id_columns = tuple(string_id_columns)
+    mapper = compile_row_mapper(tuple(columns), string_id_columns)
+    return [mapper(row) for row in rows]
+
+
+# Mapper for the current result set of each cursor using mapped_row_factory
+_cursor_mappers = weakref.WeakKeyDictionary()
+
+
+def mapped_row_factory(cursor, row):
+    """sqlite3 row_factory returning rows as dictionaries keyed by column name."""
+    # cursor.description is the same object for every row of a result set, so the
+    # mapper is looked up once per query rather than once per row
+    description = cursor.description
+    cached = _cursor_mappers.get(cursor)
+    if cached is None or cached[0] is not description:
+        columns = tuple(column[0] for column in description)
+        cached = (description, compile_row_mapper(columns))
+        _cursor_mappers[cursor] = cached
+    return cached[1](row)
+
+
+# Column names per table, read with PRAGMA table_info once per process
+_table_columns = {}
+
+
+def get_table_columns(table, cursor=None):
+    """
+    Return a table's column names in schema order, cached for the process.
+
+    The cache is cleared by invalidate_schema_cache, which the migration runner
+    calls after changing the schema.
+    """
+    columns = _table_columns.get(table)
+    if columns is not None:
+        return columns
+
+    conn = None
+    if cursor is None:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+    try:
+        cursor.execute(f"PRAGMA table_info({table})")
+        columns = tuple(row[1] for row in cursor.fetchall())
+    finally:
+        if conn is not None:
+            conn.close()
+
+    if not columns:
+        raise ValueError(f"Table {table} does not exist")
+    _table_columns[table] = columns
+    return columns
+
+
+def invalidate_schema_cache():
+    """Forget cached table columns so they are read again on next use."""
+    _table_columns.clear()
+
+
+def get_campaign_with_questions(campaign_id):
+    """
+    Load a campaign and its questions, ordered by order_index, in one query.
+
+    Returns:
+        Campaign dictionary with a "questions" list, or None if the campaign does
+        not exist
+    """
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        for attempt in range(2):
+            campaign_columns = get_table_columns("campaigns", cursor)
+            question_columns = get_table_columns("questions", cursor)
+            select_columns = [f"c.{column}" for column in campaign_columns] + [
+                f"q.{column}" for column in question_columns
+            ]
+            try:
+                cursor.execute(
+                    f"""
+                    SELECT {", ".join(select_columns)}
+                    FROM campaigns c
+                    LEFT JOIN questions q ON q.campaign_id = c.id
+                    WHERE c.id = ?
+                    ORDER BY q.order_index
+                    """,
+                    (campaign_id,),
+                )
+                break
+            except sqlite3.OperationalError:
+                # The schema changed under the cached columns (e.g. migrated by
+                # another process), so read it again and retry once
+                if attempt:
+                    raise
+                invalidate_schema_cache()
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+
+    if not rows:
+        return None
+
+    split = len(campaign_columns)
+    campaign = map_row_to_dict(rows[0][:split], campaign_columns)
+    # A campaign without questions comes back as one row of NULL question columns
+    campaign["questions"] = map_rows(
+        [row[split:] for row in rows if row[split] is not None], question_columns
+    )
+    return campaign
@@ -0,0 +1,505 @@
+"""
+Database backends behind get_db_connection: SQLite and MariaDB/MySQL.
+
+Application code is written once, against sqlite3: "?" placeholders, SQLite's SQL
+dialect and sqlite3's exception classes. The SQLite backend passes everything
+through unchanged. The MariaDB backend wraps pymysql connections so they behave
+like sqlite3 connections and rewrites each statement into MariaDB's dialect
+before it is sent:
+
+- "?" placeholders become "%s" (and literal "%" is escaped)
+- INSERT OR IGNORE / INSERT OR REPLACE become INSERT IGNORE / REPLACE
+- ON CONFLICT (...) DO UPDATE SET ... excluded.x becomes
+  ON DUPLICATE KEY UPDATE ... VALUES(x), and DO NOTHING becomes INSERT IGNORE
+- PRAGMA table_info(t) is answered from information_schema with the same columns
+- datetime('now'), CAST(... AS TEXT) and AUTOINCREMENT get their MariaDB spelling
+- in CREATE TABLE, TEXT key and ID columns become VARCHAR(255), since MariaDB
+  cannot index TEXT without a prefix length
+
+UPDATE ... RETURNING has no MariaDB equivalent and must not be used.
+"""
+
+import contextlib
+import fcntl
+import functools
+import re
+import sqlite3
+
+from config import Config
+
+try:
+    import pymysql
+    import pymysql.converters
+    import pymysql.cursors
+    from pymysql.constants import FIELD_TYPE
+except ImportError:  # only required when DB_BACKEND is "mariadb"
+    pymysql = None
+
+
+def connection_profile():
+    """Return the configured SQLite PRAGMA settings, in the order they are applied."""
+    return [
+        ("busy_timeout", Config.SQLITE_BUSY_TIMEOUT_MS),
+        ("journal_mode", Config.SQLITE_JOURNAL_MODE.upper()),
+        ("synchronous", Config.SQLITE_SYNCHRONOUS.upper()),
+        ("cache_size", Config.SQLITE_CACHE_SIZE),
+        ("mmap_size", Config.SQLITE_MMAP_SIZE),
+        ("temp_store", Config.SQLITE_TEMP_STORE.upper()),
+        ("wal_autocheckpoint", Config.SQLITE_WAL_AUTOCHECKPOINT),
+        ("journal_size_limit", Config.SQLITE_JOURNAL_SIZE_LIMIT),
+    ]
+
+
+def apply_connection_profile(conn):
+    """Apply the configured PRAGMA settings to a sqlite3 connection."""
+    cursor = conn.cursor()
+    try:
+        for name, value in connection_profile():
+            cursor.execute(f"PRAGMA {name} = {value}")
+            # Some PRAGMAs (journal_mode) report their new value as a row
+            cursor.fetchall()
+    finally:
+        cursor.close()
+    return conn
+
+
+class SQLiteBackend:
+    """The local SQLite database file. Statements are used as written."""
+
+    name = "sqlite"
+    # Local connections cannot go stale while idle
+    pre_ping_after = None
+
+    def __init__(self, path):
+        self.path = path
+
+    def sqlalchemy_url(self):
+        return f"sqlite:///{self.path}"
+
+    def pool_settings(self):
+        return {
+            "size": Config.SQLITE_POOL_SIZE,
+            "max_overflow": Config.SQLITE_POOL_MAX_OVERFLOW,
+            "timeout": Config.SQLITE_POOL_TIMEOUT,
+        }
+
+    def connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=Config.SQLITE_BUSY_TIMEOUT_MS / 1000,
+            # Connections move between threads/greenlets as they are checked out
+            check_same_thread=False,
+            cached_statements=Config.SQLITE_STATEMENT_CACHE_SIZE,
+        )
+        return apply_connection_profile(conn)
+
+    def reset(self, conn):
+        """Discard uncommitted changes and per-checkout settings, as sqlite3 close() would."""
+        if conn.in_transaction:
+            conn.rollback()
+        conn.row_factory = None
+        conn.text_factory = str
+
+    def ping(self, conn):
+        pass
+
+    def streaming_cursor(self, conn):
+        """Cursor that reads rows from the database as they are fetched."""
+        # sqlite3 steps through the result lazily already
+        return conn.cursor()
+
+    def analyze(self, cursor, tables):
+        """Refresh the planner statistics used to choose indexes."""
+        cursor.execute("ANALYZE")
+
+    @contextlib.contextmanager
+    def lock(self, name, timeout=None):
+        """Exclusive lock held by one process on this host at a time."""
+        with open(f"{self.path}.{name}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# Literals are set aside while a statement is rewritten, so nothing inside quotes
+# is ever touched
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_LITERAL_MARKER = re.compile(r"\x00(\d+)\x00")
+
+_PRAGMA_TABLE_INFO = re.compile(r"^\s*PRAGMA\s+table_info\s*\(\s*(\w+)\s*\)\s*;?\s*$", re.I)
+_TABLE_INFO_SQL = """
+    SELECT ordinal_position - 1, column_name, UPPER(column_type),
+           is_nullable = 'NO', column_default, column_key = 'PRI'
+    FROM information_schema.columns
+    WHERE table_schema = DATABASE() AND table_name = '{table}'
+    ORDER BY ordinal_position
+"""
+
+_DATETIME_NOW = re.compile(r"\bdatetime\s*\(\s*'now'\s*\)", re.I)
+_INSERT_OR_IGNORE = re.compile(r"\bINSERT\s+OR\s+IGNORE\b", re.I)
+_INSERT_OR_REPLACE = re.compile(r"\bINSERT\s+OR\s+REPLACE\b", re.I)
+_ON_CONFLICT_DO_NOTHING = re.compile(
+    r"\s*\bON\s+CONFLICT\b\s*(?:\([^)]*\))?\s*DO\s+NOTHING\b", re.I
+)
+_ON_CONFLICT_DO_UPDATE = re.compile(
+    r"\bON\s+CONFLICT\b\s*(?:\([^)]*\))?\s*DO\s+UPDATE\s+SET\b", re.I
+)
+_EXCLUDED_COLUMN = re.compile(r"\bexcluded\.(\w+)", re.I)
+_INSERT = re.compile(r"\bINSERT\b(?!\s+IGNORE)", re.I)
+_CAST_AS_TEXT = re.compile(r"\bAS\s+TEXT\s*\)", re.I)
+_AUTOINCREMENT = re.compile(r"\bAUTOINCREMENT\b", re.I)
+
+_CREATE_TABLE = re.compile(r"^\s*CREATE\s+TABLE\b", re.I)
+_KEY_CLAUSE = re.compile(r"\b(?:PRIMARY\s+KEY|UNIQUE|FOREIGN\s+KEY)\s*\(([^)]*)\)", re.I)
+_TEXT_COLUMN = re.compile(r"^(\s*)(\w+)(\s+)TEXT\b(.*)$", re.I | re.M)
+
+
+def _key_text_columns_to_varchar(sql):
+    """MariaDB can only index TEXT with a prefix length, so key columns use VARCHAR."""
+    key_columns = {
+        column.strip().lower()
+        for columns in _KEY_CLAUSE.findall(sql)
+        for column in columns.split(",")
+    }
+
+    def replace(match):
+        indent, column, space, rest = match.groups()
+        is_key = (
+            column.lower() in key_columns
+            or column.lower() == "id"
+            or column.lower().endswith("_id")
+            or re.search(r"\b(?:PRIMARY\s+KEY|UNIQUE)\b", rest, re.I)
+        )
+        column_type = "VARCHAR(255)" if is_key else "TEXT"
+        return f"{indent}{column}{space}{column_type}{rest}"
+
+    return _TEXT_COLUMN.sub(replace, sql)
+
+
+@functools.lru_cache(maxsize=1024)
+def translate_sql(sql, placeholders=True):
+    """
+    Rewrite a statement written for SQLite into MariaDB's dialect.
+
+    With placeholders, "?" parameters become "%s" and literal "%" is escaped for
+    pymysql. Statements already compiled by SQLAlchemy pass placeholders=False.
+    """
+    table_info = _PRAGMA_TABLE_INFO.match(sql)
+    if table_info:
+        sql = _TABLE_INFO_SQL.format(table=table_info.group(1))
+        return sql.replace("%", "%%") if placeholders else sql
+
+    sql = _DATETIME_NOW.sub("CURRENT_TIMESTAMP", sql)
+
+    literals = []
+
+    def set_aside(match):
+        literals.append(match.group(0))
+        return f"\x00{len(literals) - 1}\x00"
+
+    sql = _STRING_LITERAL.sub(set_aside, sql)
+
+    sql = _INSERT_OR_IGNORE.sub("INSERT IGNORE", sql)
+    sql = _INSERT_OR_REPLACE.sub("REPLACE", sql)
+    if _ON_CONFLICT_DO_NOTHING.search(sql):
+        sql = _ON_CONFLICT_DO_NOTHING.sub("", sql)
+        sql = _INSERT.sub("INSERT IGNORE", sql, count=1)
+    if _ON_CONFLICT_DO_UPDATE.search(sql):
+        sql = _ON_CONFLICT_DO_UPDATE.sub("ON DUPLICATE KEY UPDATE", sql)
+        sql = _EXCLUDED_COLUMN.sub(r"VALUES(\1)", sql)
+    sql = _CAST_AS_TEXT.sub("AS CHAR)", sql)
+    sql = _AUTOINCREMENT.sub("AUTO_INCREMENT", sql)
+    if _CREATE_TABLE.match(sql):
+        sql = _key_text_columns_to_varchar(sql)
+
+    if placeholders:
+        sql = sql.replace("%", "%%").replace("?", "%s")
+
+    def restore(match):
+        literal = literals[int(match.group(1))]
+        return literal.replace("%", "%%") if placeholders else literal
+
+    return _LITERAL_MARKER.sub(restore, sql)
+
+
+# pymysql exceptions re-raised as their sqlite3 counterparts, so existing
+# "except sqlite3.Error" handling works on either backend. Syntax errors and
+# missing tables or columns are OperationalError in sqlite3.
+_ERROR_CLASSES = [
+    ("IntegrityError", sqlite3.IntegrityError),
+    ("ProgrammingError", sqlite3.OperationalError),
+    ("OperationalError", sqlite3.OperationalError),
+    ("DataError", sqlite3.DataError),
+    ("NotSupportedError", sqlite3.NotSupportedError),
+    ("InternalError", sqlite3.InternalError),
+    ("InterfaceError", sqlite3.InterfaceError),
+]
+
+
+@contextlib.contextmanager
+def _sqlite3_errors():
+    try:
+        yield
+    except pymysql.Error as e:
+        for name, sqlite_error in _ERROR_CLASSES:
+            if isinstance(e, getattr(pymysql.err, name)):
+                raise sqlite_error(str(e)) from e
+        raise sqlite3.DatabaseError(str(e)) from e
+
+
+class MariaDBCursor:
+    """A pymysql cursor with the sqlite3 cursor interface, including row_factory."""
+
+    def __init__(self, connection, cursor):
+        self.connection = connection
+        self._cursor = cursor
+        self.row_factory = connection.row_factory
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def arraysize(self):
+        return self._cursor.arraysize
+
+    @arraysize.setter
+    def arraysize(self, value):
+        self._cursor.arraysize = value
+
+    def execute(self, sql, parameters=()):
+        self.connection._in_transaction = True
+        with _sqlite3_errors():
+            self._cursor.execute(translate_sql(sql), tuple(parameters))
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self.connection._in_transaction = True
+        with _sqlite3_errors():
+            self._cursor.executemany(
+                translate_sql(sql), [tuple(p) for p in seq_of_parameters]
+            )
+        return self
+
+    def _convert(self, row):
+        if row is None or self.row_factory is None:
+            return row
+        return self.row_factory(self, row)
+
+    def fetchone(self):
+        with _sqlite3_errors():
+            return self._convert(self._cursor.fetchone())
+
+    def fetchmany(self, size=None):
+        with _sqlite3_errors():
+            rows = self._cursor.fetchmany(size or self._cursor.arraysize)
+        return [self._convert(row) for row in rows]
+
+    def fetchall(self):
+        with _sqlite3_errors():
+            rows = self._cursor.fetchall()
+        return [self._convert(row) for row in rows]
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def close(self):
+        self._cursor.close()
+
+
+class MariaDBConnection:
+    """A pymysql connection with the sqlite3 connection interface."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._in_transaction = False
+        self.row_factory = None
+        # Accepted for compatibility; pymysql always decodes text as str
+        self.text_factory = str
+
+    @property
+    def in_transaction(self):
+        return self._in_transaction
+
+    def cursor(self, server_side=False):
+        # Server-side cursors stream rows instead of buffering the whole result,
+        # and must be closed before the connection runs another query
+        return MariaDBCursor(
+            self, self._conn.cursor(pymysql.cursors.SSCursor if server_side else None)
+        )
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        with _sqlite3_errors():
+            self._conn.commit()
+        self._in_transaction = False
+
+    def rollback(self):
+        with _sqlite3_errors():
+            self._conn.rollback()
+        self._in_transaction = False
+
+    def ping(self):
+        with _sqlite3_errors():
+            self._conn.ping(reconnect=True)
+
+    def close(self):
+        try:
+            self._conn.close()
+        except pymysql.Error:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Same as sqlite3: commit on success, roll back on error, stay open
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+
+def _decode_number(value):
+    # SUM() and AVG() return DECIMAL; SQLite returns int or float
+    return float(value) if "." in value else int(value)
+
+
+class MariaDBBackend:
+    """
+    A MariaDB or MySQL server, reached over the network with pymysql.
+
+    Sessions use ANSI_QUOTES and PIPES_AS_CONCAT so double-quoted identifiers and
+    || behave as in SQLite, and UTC, as SQLite's CURRENT_TIMESTAMP is. Dates and
+    times are returned as strings, matching what SQLite stores.
+    """
+
+    name = "mariadb"
+
+    def __init__(self, host, port, user, password, database):
+        if pymysql is None:
+            raise RuntimeError("DB_BACKEND=mariadb requires the pymysql package")
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.database = database
+        self.pre_ping_after = Config.DB_POOL_PRE_PING_AFTER
+        self.conversions = dict(pymysql.converters.decoders)
+        for field_type in (
+            FIELD_TYPE.DATETIME,
+            FIELD_TYPE.TIMESTAMP,
+            FIELD_TYPE.DATE,
+            FIELD_TYPE.TIME,
+        ):
+            self.conversions.pop(field_type, None)
+        self.conversions[FIELD_TYPE.DECIMAL] = _decode_number
+        self.conversions[FIELD_TYPE.NEWDECIMAL] = _decode_number
+
+    def sqlalchemy_url(self):
+        return (
+            f"mysql+pymysql://{self.user}:{self.password}"
+            f"@{self.host}:{self.port}/{self.database}?charset=utf8mb4"
+        )
+
+    def session_setup_sql(self):
+        return (
+            "SET SESSION sql_mode = CONCAT(@@sql_mode, ',ANSI_QUOTES,PIPES_AS_CONCAT'), "
+            "time_zone = '+00:00'"
+        )
+
+    def pool_settings(self):
+        return {
+            "size": Config.DB_POOL_SIZE,
+            "max_overflow": Config.DB_POOL_MAX_OVERFLOW,
+            "timeout": Config.DB_POOL_TIMEOUT,
+        }
+
+    def connect(self):
+        with _sqlite3_errors():
+            conn = pymysql.connect(
+                host=self.host,
+                port=self.port,
+                user=self.user,
+                password=self.password,
+                database=self.database,
+                charset="utf8mb4",
+                connect_timeout=Config.DB_CONNECT_TIMEOUT,
+                autocommit=False,
+                conv=self.conversions,
+                init_command=self.session_setup_sql(),
+            )
+        return MariaDBConnection(conn)
+
+    def reset(self, conn):
+        """Discard uncommitted changes and per-checkout settings."""
+        if conn.in_transaction:
+            conn.rollback()
+        conn.row_factory = None
+
+    def ping(self, conn):
+        """Reconnect a connection the server has closed while it sat idle."""
+        conn.ping()
+
+    def streaming_cursor(self, conn):
+        """
+        Cursor that reads rows from the server as they are fetched.
+
+        Close it before running another query on the same connection.
+        """
+        return conn.cursor(server_side=True)
+
+    def analyze(self, cursor, tables):
+        """Refresh the planner statistics used to choose indexes."""
+        cursor.execute(f"ANALYZE TABLE {', '.join(sorted(tables))}")
+        cursor.fetchall()
+
+    @contextlib.contextmanager
+    def lock(self, name, timeout=None):
+        """Exclusive lock held by one process across every node using the database."""
+        timeout = Config.DB_MIGRATION_LOCK_TIMEOUT if timeout is None else timeout
+        lock_name = f"{self.database}.{name}"
+        conn = self.connect()
+        try:
+            acquired = conn.execute("SELECT GET_LOCK(?, ?)", (lock_name, timeout))
+            if acquired.fetchone()[0] != 1:
+                raise sqlite3.OperationalError(
+                    f"Timed out after {timeout}s waiting for database lock {lock_name}"
+                )
+            try:
+                yield
+            finally:
+                conn.execute("SELECT RELEASE_LOCK(?)", (lock_name,)).fetchall()
+        finally:
+            conn.close()
+
+
+def create_backend(name, sqlite_path):
+    """Return the backend selected by DB_BACKEND."""
+    if name == "sqlite":
+        return SQLiteBackend(sqlite_path)
+    if name in ("mariadb", "mysql"):
+        return MariaDBBackend(
+            Config.DB_HOST,
+            Config.DB_PORT,
+            Config.DB_USER,
+            Config.DB_PASSWORD,
+            Config.DB_NAME,
+        )
+    raise ValueError(f"Unknown DB_BACKEND {name!r}, expected 'sqlite' or 'mariadb'")
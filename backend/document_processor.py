@@ -1,18 +1,14 @@
-import os
 import re
 import PyPDF2
 import docx
 from typing import Dict, List, Any
 import json
-from openai import OpenAI
 from config import Config
+from llm_gateway import chat_completion, is_json
 from dotenv import load_dotenv
 import io
 
-# Initialize OpenAI client
 load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=api_key)
 
 # ===== MOVED PROMPTS FROM create_campaign_from_doc.py =====
 
@@ -159,7 +155,7 @@ def generate_campaign_context(text):
     """
     
     try:
-        completion = client.chat.completions.create(
+        return chat_completion(
             model="gpt-4o-mini",
             messages=[
                 {
@@ -168,8 +164,6 @@ def generate_campaign_context(text):
                 }
             ]
         )
-
-        return completion.choices[0].message.content
     except Exception as e:
         print(f"Error generating campaign context: {e}")
         return None
@@ -204,17 +198,18 @@ def generate_interview_questions(text, campaign_context):
     
     try:
 
-        completion = client.chat.completions.create(
+        content = chat_completion(
             model="gpt-4o-mini",
             messages=[
                 {
                     "role": "user",
                     "content": prompt
                 }
-            ]
+            ],
+            cache_if=is_json,
         )
         
-        json_output = json.loads(completion.choices[0].message.content)
+        json_output = json.loads(content)
         return json_output
     except Exception as e:
         print(f"Error generating interview questions: {e}")
@@ -235,7 +230,7 @@ def generate_campaign_description(text):
     
     try:
 
-        completion = client.chat.completions.create(
+        return chat_completion(
             model="gpt-4o-mini",
             messages=[
                 {
@@ -244,8 +239,6 @@ def generate_campaign_description(text):
                 }
             ]
         )
-        
-        return completion.choices[0].message.content
     except Exception as e:
         print(f"Error generating interview questions: {e}")
         return None
@@ -7,6 +7,9 @@ worker_connections = 1000
 timeout = 30
 keepalive = 2
 
+# Transcription runs in transcription_worker.py, not in every web worker
+raw_env = ["TRANSCRIPTION_DEDICATED_WORKER=true"]
+
 # Logging
 accesslog = "logs/gunicorn-access.log"
 errorlog = "logs/gunicorn-error.log"
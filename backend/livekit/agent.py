@@ -21,6 +21,12 @@ from livekit.plugins import openai
 from livekit.agents import stt, transcription
 from livekit.plugins.openai import STT
 from prompts import agent_prompt_template
+import sys
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import get_campaign_with_questions
 
 # Store active tasks to prevent garbage collection
 _active_tasks = set()
@@ -160,12 +166,14 @@ async def entrypoint(ctx: JobContext):
 
                             # Fetch additional data if needed
                             try:
-                                # Fetch questions
-                                questions_url = f"http://127.0.0.1:5001/api/questions?campaign_id={campaign_id}"
-                                questions_response = requests.get(questions_url)
-                                if questions_response.ok:
-                                    questions = questions_response.json()
-                                    question_titles = [q["title"] for q in questions]
+                                # Load questions
+                                campaign_data = await asyncio.to_thread(
+                                    get_campaign_with_questions, campaign_id
+                                )
+                                if campaign_data:
+                                    question_titles = [
+                                        q["title"] for q in campaign_data["questions"]
+                                    ]
                                     _accumulated_questions.extend(question_titles)
                                     logger.info(
                                         f"Fetched {len(question_titles)} questions"
@@ -241,45 +249,30 @@ async def entrypoint(ctx: JobContext):
                         )
 
                     if campaign_id:
-                        # Fetch campaign details
-                        campaign_url = (
-                            f"http://127.0.0.1:5001/api/campaigns/{campaign_id}"
+                        # Load campaign details and questions in one query
+                        campaign_data = await asyncio.to_thread(
+                            get_campaign_with_questions, campaign_id
                         )
-                        campaign_response = requests.get(campaign_url, timeout=5)
-                        if campaign_response.ok:
-                            campaign_data = campaign_response.json()
-                            if isinstance(campaign_data, dict):
-                                submission_data["job_description"] = campaign_data.get(
-                                    "job_description", ""
-                                )
-                                submission_data["campaign_context"] = campaign_data.get(
-                                    "campaign_context", ""
+                        if campaign_data:
+                            submission_data["job_description"] = campaign_data.get(
+                                "job_description", ""
+                            )
+                            submission_data["campaign_context"] = campaign_data.get(
+                                "campaign_context", ""
+                            )
+
+                            # Use the questions if not already loaded
+                            if not _accumulated_questions:
+                                question_titles = [
+                                    q.get("title", "")
+                                    for q in campaign_data["questions"]
+                                ]
+                                _accumulated_questions.extend(question_titles)
+                                logger.info(
+                                    f"Fetched {len(question_titles)} questions"
                                 )
-                            else:
-                                logger.warning(
-                                    f"Received non-dict campaign data: {type(campaign_data)}"
-                                )
-
-                        # Fetch questions if not already loaded
-                        if not _accumulated_questions:
-                            questions_url = f"http://127.0.0.1:5001/api/questions?campaign_id={campaign_id}"
-                            questions_response = requests.get(questions_url, timeout=5)
-                            if questions_response.ok:
-                                questions = questions_response.json()
-                                if isinstance(questions, list):
-                                    question_titles = [
-                                        q.get("title", "")
-                                        for q in questions
-                                        if isinstance(q, dict)
-                                    ]
-                                    _accumulated_questions.extend(question_titles)
-                                    logger.info(
-                                        f"Fetched {len(question_titles)} questions"
-                                    )
-                                else:
-                                    logger.warning(
-                                        f"Received non-list questions data: {type(questions)}"
-                                    )
+                        else:
+                            logger.warning(f"Campaign not found: {campaign_id}")
             except requests.RequestException as e:
                 logger.error(f"Request error fetching submission data: {e}")
             except Exception as e:
@@ -3,23 +3,20 @@ from livekit.agents import AutoSubscribe, JobContext, WorkerOptions, cli, llm
 from livekit.agents.multimodal import MultimodalAgent
 from livekit.plugins import openai
 from dotenv import load_dotenv
+import asyncio
 import sys
 import os
-import requests
 import json
 from typing import Dict, Any
 
 # Load environment variables
 load_dotenv()
 
-# Get API URL from environment variable with fallback
-API_BASE_URL = os.getenv("FLASK_API_BASE_URL", "http://127.0.0.1:5001")
-
 # Add the backend directory to the Python path
 backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, backend_dir)
 
-from database import get_db_connection, map_row_to_dict
+from database import get_campaign_with_questions
 from interview_api import AssistantFnc
 from prompts import INTERVIEW_PROMPT_TEMPLATE, INTERVIEW_PROMPT_TEMPLATE_EN
 import logging
@@ -57,32 +54,16 @@ async def entrypoint(ctx: JobContext):
 
     # Fetch campaign data from database
     try:
-        # conn = get_db_connection()
-        # cursor = conn.cursor()
-
-        # Get campaign details
-        campaign_url = f"{API_BASE_URL}/api/campaigns/{campaign_id}"
-        campaign_response = requests.get(campaign_url)
-
-        if not campaign_response.ok:
-            print(f"❌ Failed to fetch campaign: {campaign_response.status_code}")
-            raise ValueError(f"Failed to fetch campaign: {campaign_response.text}")
-
-        campaign_data = campaign_response.json()
+        # Load the campaign and its questions straight from the database in one
+        # query, instead of two HTTP round-trips through the API
+        campaign_data = await asyncio.to_thread(
+            get_campaign_with_questions, campaign_id
+        )
         print("🚀 ~ campaign_data:", campaign_data)
         if not campaign_data:
             print(f"❌ No campaign found for ID: {campaign_id}")
             raise ValueError(f"Campaign not found for ID: {campaign_id}")
 
-        # Get campaign questions
-        questions_url = f"{API_BASE_URL}/interview/campaigns/{campaign_id}/questions"
-        questions_response = requests.get(questions_url)
-        if questions_response.status_code != 200:
-            logger.error(f"Failed to fetch questions: {questions_response.text}")
-            return None
-
-        campaign_data["questions"] = questions_response.json()
-
         print(f"\n✅ Campaign data:")
         print(f"  Title: {campaign_data['title']}")
         print(f"  Description: {campaign_data['job_description']}")
@@ -0,0 +1,214 @@
+"""Persistent, content-addressed cache for chat completion responses."""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from config import Config
+from database import apply_connection_profile
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(model, messages, params):
+    """Hash the model, messages and request parameters into a stable cache key."""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "params": params},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed response cache with a TTL and size-based LRU eviction.
+
+    Entries older than ttl_seconds are treated as misses. When the stored responses
+    exceed max_bytes, the least recently used entries are evicted.
+    """
+
+    # Check the total cache size every this many writes rather than on every write
+    EVICTION_INTERVAL = 50
+
+    def __init__(self, path, ttl_seconds, max_bytes):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._initialized = False
+        # One connection per thread, opened and set up on the thread's first use
+        self._local = threading.local()
+
+    @contextmanager
+    def _connect(self):
+        """Yield this thread's connection, rolling back what a failed call left open."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._open()
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+
+    def _open(self):
+        conn = apply_connection_profile(sqlite3.connect(self.path, timeout=5))
+        if not self._initialized:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_response_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    model VARCHAR(64) NOT NULL,
+                    response TEXT NOT NULL,
+                    size_bytes INT NOT NULL,
+                    hit_count INT NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    last_accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_llm_response_cache_last_accessed_at
+                ON llm_response_cache(last_accessed_at)
+                """
+            )
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key):
+        """Return the cached response for a key, or None on a miss or expired entry."""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT response, created_at FROM llm_response_cache WHERE cache_key = ?",
+                (key,),
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                self._count(hit=False)
+                return None
+
+            conn.execute(
+                """
+                UPDATE llm_response_cache
+                SET hit_count = hit_count + 1, last_accessed_at = ?
+                WHERE cache_key = ?
+                """,
+                (now, key),
+            )
+            conn.commit()
+
+        self._count(hit=True)
+        return row[0]
+
+    def set(self, key, model, response):
+        """Store a response, evicting least recently used entries if the cache is full."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_response_cache
+                (cache_key, model, response, size_bytes, created_at, last_accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, model, response, len(response.encode("utf-8")), now, now),
+            )
+            conn.commit()
+
+            with self._lock:
+                self._writes += 1
+                should_evict = self._writes % self.EVICTION_INTERVAL == 1
+            if should_evict:
+                self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        cursor = conn.cursor()
+        cursor.execute(
+            "DELETE FROM llm_response_cache WHERE created_at < ?",
+            (now - self.ttl_seconds,),
+        )
+        expired = cursor.rowcount
+
+        total_bytes = cursor.execute(
+            "SELECT COALESCE(SUM(size_bytes), 0) FROM llm_response_cache"
+        ).fetchone()[0]
+
+        evicted = 0
+        if total_bytes > self.max_bytes:
+            # Walk entries from least to most recently used until enough space is freed
+            excess = total_bytes - self.max_bytes
+            keys = []
+            for cache_key, size_bytes in cursor.execute(
+                """
+                SELECT cache_key, size_bytes FROM llm_response_cache
+                ORDER BY last_accessed_at
+                """
+            ).fetchall():
+                if excess <= 0:
+                    break
+                keys.append((cache_key,))
+                excess -= size_bytes
+            cursor.executemany(
+                "DELETE FROM llm_response_cache WHERE cache_key = ?", keys
+            )
+            evicted = len(keys)
+
+        conn.commit()
+        if expired or evicted:
+            logger.info(
+                f"LLM cache removed {expired} expired and {evicted} LRU entries"
+            )
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM llm_response_cache")
+            conn.commit()
+
+    def stats(self):
+        """Return hit/miss counters for this process and the size of the shared cache."""
+        with self._connect() as conn:
+            entries, total_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM llm_response_cache"
+            ).fetchone()
+
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "enabled": Config.LLM_CACHE_ENABLED,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "total_bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+response_cache = LLMResponseCache(
+    Config.LLM_CACHE_PATH
+    or os.path.join(os.path.dirname(__file__), "llm_cache.db"),
+    Config.LLM_CACHE_TTL_SECONDS,
+    Config.LLM_CACHE_MAX_BYTES,
+)
+
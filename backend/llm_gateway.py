@@ -0,0 +1,181 @@
+"""
+Shared entry point for chat completion requests.
+
+Every model call goes through chat_completion, which serves repeated requests from
+the response cache and otherwise applies a per-process concurrency cap, token-bucket
+limits on requests and tokens per minute, and jittered exponential retries on rate
+limit and transient errors.
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+
+from config import Config
+from llm_cache import make_cache_key, response_cache
+from openai_client import get_openai_client
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio used to estimate prompt size before a request
+CHARS_PER_TOKEN = 4
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at rate_per_minute.
+
+    acquire() blocks until enough capacity is available. adjust() corrects the level
+    once the true cost of a request is known.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self, amount=1):
+        # A single request larger than the bucket would otherwise wait forever
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self.level >= amount:
+                    self.level -= amount
+                    return
+                wait = (amount - self.level) / self.rate
+            time.sleep(wait)
+
+    def adjust(self, amount):
+        """Take (positive) or return (negative) capacity without blocking."""
+        with self._lock:
+            self._refill()
+            self.level = min(self.capacity, self.level - amount)
+
+
+request_bucket = TokenBucket(Config.LLM_REQUESTS_PER_MINUTE)
+token_bucket = TokenBucket(Config.LLM_TOKENS_PER_MINUTE)
+concurrency = threading.BoundedSemaphore(Config.LLM_MAX_CONCURRENCY)
+
+
+def estimate_tokens(messages, params):
+    """Estimate the tokens a request will consume (prompt plus expected completion)."""
+    prompt_chars = len(json.dumps(messages, ensure_ascii=False))
+    completion_tokens = params.get("max_tokens") or Config.LLM_ESTIMATED_COMPLETION_TOKENS
+    return prompt_chars // CHARS_PER_TOKEN + completion_tokens
+
+
+def _retry_delay(attempt, error):
+    """
+    Exponential backoff with full jitter, honoring the server's Retry-After if sent,
+    up to LLM_RETRY_MAX_DELAY.
+    """
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), Config.LLM_RETRY_MAX_DELAY)
+        except ValueError:
+            pass
+    backoff = min(Config.LLM_RETRY_MAX_DELAY, Config.LLM_RETRY_BASE_DELAY * 2**attempt)
+    return random.uniform(0, backoff)
+
+
+def _retryable_errors():
+    """Errors worth retrying: rate limits, timeouts, dropped connections and 5xx responses."""
+    import openai
+
+    return (
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+    )
+
+
+def _create_with_retries(client, model, messages, params):
+    estimated_tokens = estimate_tokens(messages, params)
+    retryable_errors = _retryable_errors()
+    # The gateway owns retries, so the SDK's built-in retries are disabled
+    completions = client.with_options(max_retries=0).chat.completions
+
+    for attempt in range(Config.LLM_MAX_RETRIES + 1):
+        request_bucket.acquire()
+        token_bucket.acquire(estimated_tokens)
+        try:
+            with concurrency:
+                completion = completions.create(model=model, messages=messages, **params)
+        except retryable_errors as e:
+            if attempt == Config.LLM_MAX_RETRIES:
+                logger.error(f"Chat completion failed after {attempt + 1} attempts: {e}")
+                raise
+            delay = _retry_delay(attempt, e)
+            logger.warning(
+                f"Chat completion attempt {attempt + 1} failed ({type(e).__name__}), "
+                f"retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
+            continue
+
+        usage = getattr(completion, "usage", None)
+        if usage is not None and usage.total_tokens:
+            token_bucket.adjust(usage.total_tokens - estimated_tokens)
+        return completion
+
+
+def chat_completion(messages, model="gpt-4o-mini", cache_if=None, client=None, **params):
+    """
+    Create a chat completion through the shared limiter, retry policy and response cache.
+
+    Args:
+        messages: Chat messages for the request
+        model: Model name
+        cache_if: Optional predicate on the response content; responses for which it
+                  returns False (e.g. unparseable JSON) are not cached so a retry
+                  reaches the model again
+        client: OpenAI client to use instead of the shared pooled client
+        **params: Additional completion parameters, included in the cache key
+
+    Returns:
+        The content of the first completion choice
+    """
+    key = None
+    if Config.LLM_CACHE_ENABLED:
+        key = make_cache_key(model, messages, params)
+        try:
+            cached = response_cache.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {str(e)}")
+            cached = None
+        if cached is not None:
+            return cached
+
+    completion = _create_with_retries(
+        client or get_openai_client(), model, messages, params
+    )
+    content = completion.choices[0].message.content
+
+    if key and content is not None and (cache_if is None or cache_if(content)):
+        try:
+            response_cache.set(key, model, content)
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {str(e)}")
+    return content
+
+
+def is_json(content):
+    """cache_if predicate for prompts that ask for a JSON response."""
+    try:
+        json.loads(content)
+        return True
+    except (TypeError, ValueError):
+        return False
@@ -0,0 +1,424 @@
+"""Direct-to-S3 multipart uploads of interview media, recorded on submission answers."""
+
+import math
+import os
+import threading
+import uuid
+
+import boto3
+from botocore.config import Config as BotoConfig
+from botocore.exceptions import ClientError
+from werkzeug.utils import secure_filename
+
+from config import Config
+from database import bulk_upsert, get_db_connection, map_row_to_dict
+
+# S3 multipart limits: every part but the last must be at least 5 MiB
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+
+MEDIA_KEY_PREFIX = "interviews/"
+MEDIA_CONTENT_TYPES = ("video/", "audio/")
+
+UPLOAD_PENDING = "pending"
+UPLOAD_COMPLETED = "completed"
+UPLOAD_ABORTED = "aborted"
+
+SESSION_COLUMNS = [
+    "id",
+    "submission_id",
+    "question_id",
+    "s3_key",
+    "upload_id",
+    "content_type",
+    "size",
+    "part_size",
+    "part_count",
+    "status",
+    "created_at",
+    "updated_at",
+    "completed_at",
+]
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def create_s3_client(public=False):
+    """
+    Create an S3 client for Config.S3_ENDPOINT_URL, or for AWS when it is unset.
+
+    Presigned URLs carry the endpoint of the client that signed them, so URLs
+    handed to browsers must come from a public=True client.
+    """
+    endpoint_url = Config.S3_PUBLIC_ENDPOINT_URL if public else Config.S3_ENDPOINT_URL
+    return boto3.client(
+        "s3",
+        endpoint_url=endpoint_url,
+        aws_access_key_id=Config.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=Config.AWS_SECRET_ACCESS_KEY,
+        aws_session_token=Config.AWS_SESSION_TOKEN,
+        region_name=Config.S3_REGION,
+        config=BotoConfig(
+            signature_version="s3v4",
+            # S3-compatible servers address buckets by path, not by subdomain
+            s3={"addressing_style": "path" if endpoint_url else "auto"},
+        ),
+    )
+
+
+def get_s3_client(public=False):
+    """Return the shared S3 client of this process, creating it on first use."""
+    with _clients_lock:
+        if public not in _clients:
+            _clients[public] = create_s3_client(public)
+        return _clients[public]
+
+
+def plan_parts(size):
+    """
+    Split an upload of size bytes into parts.
+
+    Parts are Config.MEDIA_UPLOAD_PART_SIZE bytes, grown for very large files so
+    the upload stays within S3's part count limit.
+
+    Returns:
+        Tuple of (part_size, part_count)
+    """
+    part_size = max(
+        Config.MEDIA_UPLOAD_PART_SIZE, MIN_PART_SIZE, math.ceil(size / MAX_PARTS)
+    )
+    return part_size, max(1, math.ceil(size / part_size))
+
+
+def media_key(filename):
+    """Return a new unique S3 key for a media file, keeping its extension."""
+    extension = os.path.splitext(secure_filename(filename or ""))[1].lower()
+    return f"{MEDIA_KEY_PREFIX}{uuid.uuid4()}{extension}"
+
+
+def _load_session(cursor, session_id):
+    cursor.execute(
+        f"SELECT {', '.join(SESSION_COLUMNS)} FROM media_upload_sessions WHERE id = ?",
+        (session_id,),
+    )
+    row = cursor.fetchone()
+    return map_row_to_dict(row, SESSION_COLUMNS) if row else None
+
+
+def _get_session(session_id):
+    conn = get_db_connection()
+    try:
+        return _load_session(conn.cursor(), session_id)
+    finally:
+        conn.close()
+
+
+def _presign_parts(upload, part_numbers):
+    client = get_s3_client(public=True)
+    return [
+        {
+            "part_number": part_number,
+            "url": client.generate_presigned_url(
+                "upload_part",
+                Params={
+                    "Bucket": Config.S3_BUCKET_NAME,
+                    "Key": upload["s3_key"],
+                    "UploadId": upload["upload_id"],
+                    "PartNumber": part_number,
+                },
+                ExpiresIn=Config.MEDIA_UPLOAD_URL_EXPIRY,
+            ),
+        }
+        for part_number in part_numbers
+    ]
+
+
+def _public_session(upload, parts=None):
+    """The fields of an upload session returned to clients."""
+    result = {
+        "session_id": upload["id"],
+        "submission_id": upload["submission_id"],
+        "question_id": upload["question_id"],
+        "s3_key": upload["s3_key"],
+        "size": upload["size"],
+        "part_size": upload["part_size"],
+        "part_count": upload["part_count"],
+        "status": upload["status"],
+    }
+    if parts is not None:
+        result["parts"] = parts
+        result["expires_in"] = Config.MEDIA_UPLOAD_URL_EXPIRY
+    return result
+
+
+def get_upload_session(session_id):
+    """Return an upload session's status, or None if it does not exist."""
+    upload = _get_session(session_id)
+    return _public_session(upload) if upload else None
+
+
+def create_upload_session(submission_id, question_id, filename, content_type, size):
+    """
+    Start a multipart upload of an answer's recording straight to S3.
+
+    The client PUTs each byte range [(n - 1) * part_size, n * part_size) of the
+    file to the presigned URL of part n, then completes the session. The API
+    server never handles the media itself.
+
+    Returns:
+        The session with a presigned URL for every part, or None if the
+        submission does not exist or the question is not part of its campaign
+
+    Raises:
+        ValueError: If the size or content type is not acceptable
+    """
+    if not isinstance(size, int) or size <= 0:
+        raise ValueError("size must be a positive number of bytes")
+    if size > Config.MEDIA_UPLOAD_MAX_SIZE:
+        raise ValueError(
+            f"File is too large, the limit is {Config.MEDIA_UPLOAD_MAX_SIZE} bytes"
+        )
+    if not content_type or not content_type.startswith(MEDIA_CONTENT_TYPES):
+        raise ValueError("content_type must be a video or audio type")
+
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT s.id FROM submissions s
+            JOIN questions q ON q.campaign_id = s.campaign_id
+            WHERE s.id = ? AND q.id = ?
+            """,
+            (submission_id, question_id),
+        )
+        if not cursor.fetchone():
+            return None
+    finally:
+        conn.close()
+
+    part_size, part_count = plan_parts(size)
+    s3_key = media_key(filename)
+    # Started without holding a database connection
+    response = get_s3_client().create_multipart_upload(
+        Bucket=Config.S3_BUCKET_NAME, Key=s3_key, ContentType=content_type
+    )
+
+    upload = {
+        "id": str(uuid.uuid4()),
+        "submission_id": submission_id,
+        "question_id": question_id,
+        "s3_key": s3_key,
+        "upload_id": response["UploadId"],
+        "content_type": content_type,
+        "size": size,
+        "part_size": part_size,
+        "part_count": part_count,
+        "status": UPLOAD_PENDING,
+    }
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+            INSERT INTO media_upload_sessions ({", ".join(upload)})
+            VALUES ({", ".join("?" for _ in upload)})
+            """,
+            tuple(upload.values()),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    return _public_session(upload, _presign_parts(upload, range(1, part_count + 1)))
+
+
+def presign_upload_parts(session_id, part_numbers=None):
+    """
+    Presign fresh URLs for parts of a pending upload, e.g. to resume it after
+    the first URLs expired.
+
+    Returns:
+        The session with a presigned URL for each requested part (all parts by
+        default), or None if the session does not exist
+
+    Raises:
+        ValueError: If the session is no longer pending or a part number is invalid
+    """
+    upload = _get_session(session_id)
+    if not upload:
+        return None
+    if upload["status"] != UPLOAD_PENDING:
+        raise ValueError(f"Upload session is {upload['status']}")
+
+    if part_numbers is None:
+        part_numbers = range(1, upload["part_count"] + 1)
+    elif not all(
+        isinstance(n, int) and 1 <= n <= upload["part_count"] for n in part_numbers
+    ):
+        raise ValueError(f"Part numbers must be between 1 and {upload['part_count']}")
+    return _public_session(upload, _presign_parts(upload, part_numbers))
+
+
+def _uploaded_parts(upload):
+    """List the parts S3 has received for an upload."""
+    paginator = get_s3_client().get_paginator("list_parts")
+    parts = []
+    for page in paginator.paginate(
+        Bucket=Config.S3_BUCKET_NAME, Key=upload["s3_key"], UploadId=upload["upload_id"]
+    ):
+        parts.extend(
+            {"part_number": part["PartNumber"], "etag": part["ETag"]}
+            for part in page.get("Parts", [])
+        )
+    return parts
+
+
+def complete_upload_session(session_id, parts=None):
+    """
+    Assemble the uploaded parts into one object and record it as the answer's video.
+
+    The ETag of each part comes from the response to its PUT. Browsers can only
+    read it if the bucket's CORS rules expose the ETag header; without parts,
+    the server lists them from S3 instead.
+
+    The submission answer is created if it does not exist yet, with an empty
+    transcript, and the recording is queued for transcription.
+
+    Returns:
+        The completed session with the ID of its transcription job, or None if
+        the session does not exist
+
+    Raises:
+        ValueError: If the session was aborted or parts are missing
+    """
+    upload = _get_session(session_id)
+    if not upload:
+        return None
+    if upload["status"] == UPLOAD_COMPLETED:
+        # Completing twice is harmless, e.g. when a client retries after a timeout
+        return _public_session(upload)
+    if upload["status"] != UPLOAD_PENDING:
+        raise ValueError(f"Upload session is {upload['status']}")
+
+    if parts is None:
+        parts = _uploaded_parts(upload)
+    try:
+        etags = {int(part["part_number"]): part["etag"] for part in parts}
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Each part needs a part_number and an etag")
+    missing = [n for n in range(1, upload["part_count"] + 1) if not etags.get(n)]
+    if missing:
+        raise ValueError(f"Parts not uploaded: {', '.join(map(str, missing))}")
+
+    get_s3_client().complete_multipart_upload(
+        Bucket=Config.S3_BUCKET_NAME,
+        Key=upload["s3_key"],
+        UploadId=upload["upload_id"],
+        MultipartUpload={
+            "Parts": [
+                {"PartNumber": n, "ETag": etags[n]}
+                for n in range(1, upload["part_count"] + 1)
+            ]
+        },
+    )
+
+    upload["status"] = UPLOAD_COMPLETED
+    result = _public_session(upload)
+    result["transcription_job_id"] = record_answer_media(
+        upload["submission_id"],
+        upload["question_id"],
+        upload["s3_key"],
+        session_id=session_id,
+    )
+    return result
+
+
+def record_answer_media(submission_id, question_id, s3_key, session_id=None):
+    """
+    Record a recording stored in S3 as a submission answer's video and queue its
+    transcription. The transcript is filled in once transcribed.
+
+    Args:
+        session_id: Upload session the recording came from, marked completed in
+            the same transaction
+
+    Returns:
+        The ID of the transcription job
+    """
+    # transcription_service imports this module for its S3 client
+    from transcription_service import enqueue_transcription
+
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        bulk_upsert(
+            cursor,
+            "submission_answers",
+            ["id", "submission_id", "question_id", "video_path", "transcript"],
+            [(str(uuid.uuid4()), submission_id, question_id, s3_key, "")],
+            conflict_columns=["submission_id", "question_id"],
+            update_columns=["video_path"],
+        )
+        if session_id is not None:
+            cursor.execute(
+                """
+                UPDATE media_upload_sessions
+                SET status = ?, completed_at = CURRENT_TIMESTAMP,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+                """,
+                (UPLOAD_COMPLETED, session_id),
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+    return enqueue_transcription(submission_id, question_id, s3_key)
+
+
+def abort_upload_session(session_id):
+    """
+    Abort a pending upload, deleting the parts S3 has stored so far.
+
+    Returns:
+        The aborted session, or None if it does not exist
+
+    Raises:
+        ValueError: If the upload was already completed
+    """
+    upload = _get_session(session_id)
+    if not upload:
+        return None
+    if upload["status"] == UPLOAD_COMPLETED:
+        raise ValueError("Upload session is completed")
+
+    if upload["status"] == UPLOAD_PENDING:
+        try:
+            get_s3_client().abort_multipart_upload(
+                Bucket=Config.S3_BUCKET_NAME,
+                Key=upload["s3_key"],
+                UploadId=upload["upload_id"],
+            )
+        except ClientError as e:
+            # Already gone, e.g. removed by a bucket lifecycle rule
+            if e.response.get("Error", {}).get("Code") != "NoSuchUpload":
+                raise
+
+        conn = get_db_connection()
+        try:
+            conn.execute(
+                """
+                UPDATE media_upload_sessions
+                SET status = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+                """,
+                (UPLOAD_ABORTED, session_id),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    upload["status"] = UPLOAD_ABORTED
+    return _public_session(upload)
@@ -1,9 +1,129 @@
 """Database migrations package for ensuring database schema is up to date"""
 
+import logging
+
+import database
 from .alter_submissions_total_points import migrate as alter_submissions_total_points
+from .add_hot_path_indexes import migrate as add_hot_path_indexes
+from .add_keyset_pagination_indexes import migrate as add_keyset_pagination_indexes
+from .add_phone_fields_to_users import migrate as add_phone_fields_to_users
+from .add_search_index import migrate as add_search_index
+from .add_transcript_segments import migrate as add_transcript_segments
+
+logger = logging.getLogger(__name__)
+
+# Ordered schema migrations: (version, name, function). Append new migrations with
+# the next version number; never renumber or remove applied ones. Every migration
+# must be safe to re-run, since a crash can interrupt one before it is recorded.
+MIGRATIONS = [
+    (1, "create_core_tables", database.create_tables),
+    (2, "campaigns_text_ids", database.migrate_campaigns_table_id_type),
+    (
+        3,
+        "submissions_resume_columns",
+        database.migrate_submissions_table_add_resume_columns,
+    ),
+    (4, "campaigns_details_columns", database.migrate_campaigns_add_details),
+    (5, "users_phone_fields", add_phone_fields_to_users),
+    (6, "submissions_total_points_nullable", alter_submissions_total_points),
+    (7, "create_scoring_jobs_table", database.create_scoring_jobs_table),
+    (8, "create_rescoring_tables", database.create_rescoring_tables),
+    (
+        9,
+        "create_scoring_prompt_metrics_table",
+        database.create_scoring_prompt_metrics_table,
+    ),
+    (10, "add_hot_path_indexes", add_hot_path_indexes),
+    (11, "add_keyset_pagination_indexes", add_keyset_pagination_indexes),
+    (12, "add_search_index", add_search_index),
+    (
+        13,
+        "create_media_upload_sessions_table",
+        database.create_media_upload_sessions_table,
+    ),
+    (14, "add_transcript_segments", add_transcript_segments),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version():
+    """Return the highest applied migration version, or 0 for an unversioned database"""
+    conn = database.get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA table_info(schema_migrations)")
+        if not cursor.fetchall():
+            return 0
+        cursor.execute("SELECT MAX(version) FROM schema_migrations")
+        return cursor.fetchone()[0] or 0
+    finally:
+        conn.close()
+
+
+def _applied_versions():
+    conn = database.get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """
+        )
+        conn.commit()
+        cursor.execute("SELECT version FROM schema_migrations")
+        return {row[0] for row in cursor.fetchall()}
+    finally:
+        conn.close()
+
+
+def _record_version(version, name):
+    conn = database.get_db_connection()
+    try:
+        conn.execute(
+            "INSERT INTO schema_migrations (version, name) VALUES (?, ?)",
+            (version, name),
+        )
+        conn.commit()
+    finally:
+        conn.close()
 
 
 def run_migrations():
-    """Run all migrations in the correct order"""
-    # Add migrations in the order they should be run
-    alter_submissions_total_points()
+    """
+    Apply pending migrations in order.
+
+    When the schema is current this is a single version query. Otherwise the first
+    process to take the lock applies the pending migrations, and processes waiting
+    on the lock find nothing left to do.
+
+    Returns:
+        List of the names of the migrations applied by this call
+    """
+    if get_schema_version() >= LATEST_VERSION:
+        return []
+
+    applied = []
+    # A file lock on the host for SQLite, a server-side named lock for MariaDB, so
+    # only one process (on any node) applies migrations
+    with database.db_backend.lock("migrations"):
+        applied_versions = _applied_versions()
+        for version, name, migrate in MIGRATIONS:
+            if version in applied_versions:
+                continue
+            logger.info(f"Applying migration {version}: {name}")
+            migrate()
+            _record_version(version, name)
+            applied.append(name)
+
+    if applied:
+        database.invalidate_schema_cache()
+        logger.info(
+            f"Applied {len(applied)} migrations, schema is at version {LATEST_VERSION}"
+        )
+    return applied
+
@@ -0,0 +1,11 @@
+"""Apply pending schema migrations: python -m migrations (from the backend directory)"""
+
+import logging
+
+from migrations import get_schema_version, run_migrations
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(f"Schema version before: {get_schema_version()}")
+    run_migrations()
+    print(f"Schema version after: {get_schema_version()}")
@@ -0,0 +1,55 @@
+import logging
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import db_backend, get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# submission_answers(submission_id) and campaign_assignments(campaign_id) are
+# already covered by the leading column of their UNIQUE constraints
+INDEXES = [
+    # Question lists per campaign, in display order
+    ("idx_questions_campaign_id_order_index", "questions", "campaign_id, order_index"),
+    # Submission lists and completed-submission counts per campaign
+    (
+        "idx_submissions_campaign_id_is_complete",
+        "submissions",
+        "campaign_id, is_complete",
+    ),
+    # Submission lists and completed-submission counts per candidate
+    ("idx_submissions_user_id_is_complete", "submissions", "user_id, is_complete"),
+    # Campaigns assigned to a user
+    ("idx_campaign_assignments_user_id", "campaign_assignments", "user_id"),
+]
+
+
+def migrate():
+    """Create the secondary indexes used by the hot query paths"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+
+        for name, table, columns in INDEXES:
+            logger.info(f"Creating index {name} on {table}({columns})")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})")
+
+        # Refresh planner statistics so the new indexes are picked up
+        db_backend.analyze(cursor, {table for _, table, _ in INDEXES})
+
+        conn.commit()
+        logger.info("Successfully created hot path indexes")
+
+    except Exception as e:
+        logger.error(f"Error during migration: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    migrate()
@@ -0,0 +1,43 @@
+import logging
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# Keyset pagination of the list endpoints orders by (created_at, id)
+INDEXES = [
+    ("idx_users_created_at_id", "users", "created_at, id"),
+    ("idx_campaigns_created_at_id", "campaigns", "created_at, id"),
+    ("idx_submissions_created_at_id", "submissions", "created_at, id"),
+    ("idx_submission_answers_created_at_id", "submission_answers", "created_at, id"),
+]
+
+
+def migrate():
+    """Create the (created_at, id) indexes used by keyset pagination"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+
+        for name, table, columns in INDEXES:
+            logger.info(f"Creating index {name} on {table}({columns})")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})")
+
+        conn.commit()
+        logger.info("Successfully created keyset pagination indexes")
+
+    except Exception as e:
+        logger.error(f"Error during migration: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    migrate()
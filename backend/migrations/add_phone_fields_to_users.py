@@ -7,7 +7,6 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database import get_db_connection
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -47,4 +46,5 @@ def migrate():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     migrate()
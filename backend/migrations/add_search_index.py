@@ -0,0 +1,123 @@
+import logging
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import db_backend, get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# Indexed text: (index name, content table, column)
+SEARCH_INDEXES = [
+    ("submissions_fts", "submissions", "resume_text"),
+    ("submission_answers_fts", "submission_answers", "transcript"),
+]
+
+# English stemming on top of Unicode word splitting, ignoring accents
+FTS_TOKENIZER = "porter unicode61 remove_diacritics 2"
+
+
+def _sqlite_statements(index, table, column):
+    """
+    FTS5 external-content table over table.column, plus the triggers keeping it in sync.
+
+    The FTS table stores only the index, not a second copy of the text. Rows are
+    matched to the content table by rowid. Deleting from an external-content
+    index requires the old value, which the triggers pass from old.<column>.
+    """
+    return [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5(
+            {column},
+            content='{table}',
+            content_rowid='rowid',
+            tokenize='{FTS_TOKENIZER}'
+        )
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {index}_after_insert AFTER INSERT ON {table}
+        BEGIN
+            INSERT INTO {index} (rowid, {column}) VALUES (new.rowid, new.{column});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {index}_after_delete AFTER DELETE ON {table}
+        BEGIN
+            INSERT INTO {index} ({index}, rowid, {column})
+            VALUES ('delete', old.rowid, old.{column});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {index}_after_update
+        AFTER UPDATE OF {column} ON {table}
+        BEGIN
+            INSERT INTO {index} ({index}, rowid, {column})
+            VALUES ('delete', old.rowid, old.{column});
+            INSERT INTO {index} (rowid, {column}) VALUES (new.rowid, new.{column});
+        END
+        """,
+    ]
+
+
+def rebuild():
+    """
+    Rebuild the SQLite full-text indexes from their content tables.
+
+    Run after VACUUM: it may renumber the rowids the indexes refer to, since the
+    content tables have TEXT primary keys. MariaDB maintains its FULLTEXT indexes
+    itself, so this is a no-op there.
+    """
+    if db_backend.name != "sqlite":
+        return
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        for index, table, column in SEARCH_INDEXES:
+            logger.info(f"Rebuilding full-text index {index} from {table}.{column}")
+            cursor.execute(f"INSERT INTO {index} ({index}) VALUES ('rebuild')")
+        conn.commit()
+    except Exception as e:
+        logger.error(f"Error rebuilding full-text indexes: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def migrate():
+    """Create the full-text search indexes over resumes and answer transcripts"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+
+        for index, table, column in SEARCH_INDEXES:
+            logger.info(f"Creating full-text index {index} on {table}({column})")
+            if db_backend.name == "sqlite":
+                for statement in _sqlite_statements(index, table, column):
+                    cursor.execute(statement)
+            else:
+                cursor.execute(
+                    f"CREATE FULLTEXT INDEX IF NOT EXISTS {index} ON {table}({column})"
+                )
+
+        conn.commit()
+        logger.info("Successfully created full-text search indexes")
+
+    except Exception as e:
+        logger.error(f"Error during migration: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    # Index the rows that existed before the triggers did
+    rebuild()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if "--rebuild" in sys.argv:
+        rebuild()
+    else:
+        migrate()
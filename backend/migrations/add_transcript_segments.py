@@ -0,0 +1,43 @@
+import logging
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+
+def migrate():
+    """Add the transcript_segments column to submission_answers if it doesn't exist"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+
+        cursor.execute("PRAGMA table_info(submission_answers)")
+        columns = [column[1] for column in cursor.fetchall()]
+
+        # JSON list of {start, end, text} segments, timed in seconds from the
+        # start of the recording
+        if "transcript_segments" not in columns:
+            logger.info("Adding transcript_segments column to submission_answers")
+            cursor.execute(
+                "ALTER TABLE submission_answers "
+                "ADD COLUMN transcript_segments TEXT DEFAULT NULL"
+            )
+
+        conn.commit()
+        logger.info("Successfully added transcript segments to submission_answers")
+
+    except Exception as e:
+        logger.error(f"Error during migration: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    migrate()
@@ -1,39 +1,38 @@
-from .. import database
+import database
 import logging
 
 
 def migrate():
-    """Modify total_points column in submissions table to allow NULL values"""
+    """Make total_points NULL (not yet scored) for incomplete submissions stored as 0"""
     logger = logging.getLogger(__name__)
-    logger.info("Running migration to modify total_points column in submissions table")
+    logger.info("Running migration to reset total_points of incomplete submissions")
 
     conn = database.get_db_connection()
     try:
-        with conn.cursor() as cursor:
-            # Check if the table exists
-            cursor.execute(
-                """
-                SELECT COUNT(*) 
-                FROM information_schema.tables 
-                WHERE table_schema = DATABASE()
-                AND table_name = 'submissions'
+        cursor = conn.cursor()
+
+        # Check the column allows NULL. SQLite cannot change a column's
+        # constraints in place, and the submissions schema already declares
+        # total_points INT DEFAULT NULL.
+        cursor.execute("PRAGMA table_info(submissions)")
+        columns = {row[1]: row for row in cursor.fetchall()}
+        if "total_points" not in columns:
+            logger.info("Submissions table doesn't exist yet, skipping migration")
+            return
+        if columns["total_points"][3]:
+            raise RuntimeError("submissions.total_points is declared NOT NULL")
+
+        # Update existing submissions with total_points=0 to NULL
+        cursor.execute(
             """
-            )
-            if cursor.fetchone()[0] == 0:
-                logger.info("Submissions table doesn't exist yet, skipping migration")
-                return
-
-            # Modify the total_points column to allow NULL values
-            cursor.execute(
-                """
-                ALTER TABLE submissions
-                MODIFY COLUMN total_points INT DEFAULT NULL
-            """
-            )
-
-            logger.info(
-                "Successfully modified total_points column to allow NULL values"
-            )
+            UPDATE submissions
+            SET total_points = NULL
+            WHERE total_points = 0 AND is_complete = FALSE
+        """
+        )
+        logger.info(
+            f"Updated {cursor.rowcount} submissions with total_points=0 to NULL"
+        )
 
         conn.commit()
         logger.info("Migration completed successfully")
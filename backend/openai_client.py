@@ -0,0 +1,57 @@
+"""Lazily initialized, connection-pooled OpenAI client shared by the whole process."""
+
+import logging
+import os
+import threading
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+
+
+def _build_client():
+    # Imported here so processes that never call the model skip the import cost
+    import httpx
+    from openai import OpenAI
+
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=Config.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=Config.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=Config.OPENAI_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            Config.OPENAI_TIMEOUT, connect=Config.OPENAI_CONNECT_TIMEOUT
+        ),
+    )
+    return OpenAI(
+        api_key=Config.OPENAI_API_KEY,
+        http_client=http_client,
+        # Retries are handled by llm_gateway
+        max_retries=0,
+    )
+
+
+def get_openai_client():
+    """
+    Return the process-wide OpenAI client, creating it on first use.
+
+    The client keeps a pool of keep-alive connections to the API. A new client is
+    built after a fork (e.g. gunicorn workers with preload_app) so sockets are never
+    shared between processes.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _lock:
+        if _client is None or _client_pid != pid:
+            _client = _build_client()
+            _client_pid = pid
+            logger.info(f"Created pooled OpenAI client for process {pid}")
+        return _client
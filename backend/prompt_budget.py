@@ -0,0 +1,207 @@
+"""Token counting, transcript compaction and prompt-size metrics for scoring prompts."""
+
+import logging
+import re
+import threading
+import uuid
+
+from config import Config
+from database import get_db_connection
+
+try:
+    import tiktoken
+except ImportError:  # fall back to a character-based estimate
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Characters per token used when tiktoken is not installed
+CHARS_PER_TOKEN = 4
+
+# Never squeeze a single response below this many tokens
+MIN_RESPONSE_TOKENS = 200
+
+TRUNCATION_MARKER = " [...] "
+
+_encoding = None
+# Set once loading the encoding has been tried, so a failed download (e.g. with
+# no network) is not retried on every count
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """Return the tiktoken encoding, or None to estimate token counts instead."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                if tiktoken is not None:
+                    try:
+                        _encoding = tiktoken.get_encoding("o200k_base")
+                    except Exception as e:
+                        logger.warning(
+                            f"Falling back to estimated token counts: {str(e)}"
+                        )
+                _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text):
+    """Count the tokens in text with tiktoken, or estimate them if it is unavailable."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _truncate_middle(text, max_tokens):
+    """Keep the beginning and end of text, dropping the middle to fit max_tokens."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        head = max_tokens * 2 // 3
+        tail = max_tokens - head
+        return (
+            encoding.decode(tokens[:head])
+            + TRUNCATION_MARKER
+            + encoding.decode(tokens[-tail:])
+        )
+
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    head = max_chars * 2 // 3
+    tail = max_chars - head
+    return text[:head] + TRUNCATION_MARKER + text[-tail:]
+
+
+def compact_response(text, max_tokens):
+    """
+    Shrink a candidate response to at most max_tokens.
+
+    Whitespace is collapsed and consecutive repeated lines (common in speech-to-text
+    output) are dropped first. If the response is still over budget, the middle is
+    cut, keeping the opening and closing of the answer.
+
+    Returns:
+        Tuple of (compacted_text, was_truncated)
+    """
+    lines = []
+    for line in text.splitlines():
+        line = re.sub(r"\s+", " ", line).strip()
+        if line and (not lines or line != lines[-1]):
+            lines.append(line)
+    compacted = "\n".join(lines)
+
+    if count_tokens(compacted) <= max_tokens:
+        return compacted, False
+    return _truncate_middle(compacted, max_tokens), True
+
+
+class PromptBudget:
+    """
+    Applies per-response token budgets to scoring prompts and records their size.
+
+    One instance is used per scored submission. It is safe to share between the
+    threads of the per-question scorer.
+    """
+
+    def __init__(
+        self, response_token_budget=None, prompt_token_budget=None, scoring_mode=None
+    ):
+        self.response_token_budget = (
+            response_token_budget or Config.SCORING_RESPONSE_TOKEN_BUDGET
+        )
+        self.prompt_token_budget = (
+            prompt_token_budget or Config.SCORING_PROMPT_TOKEN_BUDGET
+        )
+        self.scoring_mode = scoring_mode
+        self.prompt_tokens = 0
+        self.requests = 0
+        self.response_tokens_before = 0
+        self.response_tokens_after = 0
+        self.truncated_responses = 0
+        self._lock = threading.Lock()
+
+    def compact_responses(self, candidate_responses, fixed_prompt_tokens=0):
+        """
+        Compact each response so the prompt stays within budget.
+
+        Each response gets the smaller of the per-response budget and an equal share
+        of what is left of the prompt budget after fixed_prompt_tokens.
+        """
+        if not candidate_responses:
+            return {}
+
+        share = (self.prompt_token_budget - fixed_prompt_tokens) // len(
+            candidate_responses
+        )
+        max_tokens = max(MIN_RESPONSE_TOKENS, min(self.response_token_budget, share))
+
+        compacted = {}
+        before = after = truncated = 0
+        for question, response in candidate_responses.items():
+            before += count_tokens(response)
+            compacted[question], was_truncated = compact_response(response, max_tokens)
+            after += count_tokens(compacted[question])
+            truncated += was_truncated
+
+        with self._lock:
+            self.response_tokens_before += before
+            self.response_tokens_after += after
+            self.truncated_responses += truncated
+        return compacted
+
+    def record_prompt(self, *prompts):
+        """Record the size of the prompts sent in one model request."""
+        tokens = sum(count_tokens(prompt) for prompt in prompts)
+        with self._lock:
+            self.prompt_tokens += tokens
+            self.requests += 1
+        return tokens
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "scoring_mode": self.scoring_mode,
+                "requests": self.requests,
+                "prompt_tokens": self.prompt_tokens,
+                "response_tokens_before": self.response_tokens_before,
+                "response_tokens_after": self.response_tokens_after,
+                "truncated_responses": self.truncated_responses,
+            }
+
+
+def record_prompt_metrics(submission_id, budget):
+    """Store the prompt-size metrics collected while scoring a submission."""
+    metrics = budget.metrics()
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            INSERT INTO scoring_prompt_metrics (
+                id, submission_id, scoring_mode, requests, prompt_tokens,
+                response_tokens_before, response_tokens_after, truncated_responses
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                str(uuid.uuid4()),
+                submission_id,
+                metrics["scoring_mode"],
+                metrics["requests"],
+                metrics["prompt_tokens"],
+                metrics["response_tokens_before"],
+                metrics["response_tokens_after"],
+                metrics["truncated_responses"],
+            ),
+        )
+        conn.commit()
+    except Exception as e:
+        # Metrics must never fail a scoring run
+        logger.warning(f"Failed to record prompt metrics for {submission_id}: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+    return metrics
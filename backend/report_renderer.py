@@ -0,0 +1,339 @@
+"""PDF reports of scored submissions, rendered in the background and cached by content."""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from fpdf import FPDF
+
+from config import Config
+from database import get_db_connection, mapped_row_factory
+
+logger = logging.getLogger(__name__)
+
+# Part of every content hash; bump it when the report layout changes so cached
+# reports in the old layout are no longer served
+REPORT_FORMAT_VERSION = 1
+
+
+def load_report_content(submission_id):
+    """
+    Load everything a submission's report shows.
+
+    Returns:
+        Dictionary with the submission and its campaign's questions in order,
+        each with the candidate's answer or None, or None if the submission
+        does not exist
+    """
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.row_factory = mapped_row_factory
+        cursor.execute(
+            """
+            SELECT submissions.id, submissions.campaign_id, submissions.created_at,
+                   submissions.total_points, users.email, users.name AS user_name,
+                   campaigns.title AS campaign_name, campaigns.campaign_context
+            FROM submissions
+            JOIN users ON submissions.user_id = users.id
+            JOIN campaigns ON submissions.campaign_id = campaigns.id
+            WHERE submissions.id = ?
+            """,
+            (submission_id,),
+        )
+        submission = cursor.fetchone()
+        if not submission:
+            return None
+
+        # Each question with its answer, if any, in one pass
+        cursor.execute(
+            """
+            SELECT q.id, q.title, q.body, q.scoring_prompt, q.max_points,
+                   sa.id AS answer_id, sa.transcript, sa.score, sa.score_rationale
+            FROM questions q
+            LEFT JOIN submission_answers sa
+                ON sa.question_id = q.id AND sa.submission_id = ?
+            WHERE q.campaign_id = ?
+            ORDER BY q.order_index, q.id
+            """,
+            (submission_id, submission["campaign_id"]),
+        )
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+
+    questions = []
+    for row in rows:
+        answer = None
+        if row.pop("answer_id") is not None:
+            answer = {
+                "transcript": row.pop("transcript"),
+                "score": row.pop("score"),
+                "score_rationale": row.pop("score_rationale"),
+            }
+        else:
+            for column in ("transcript", "score", "score_rationale"):
+                row.pop(column)
+        row["answer"] = answer
+        questions.append(row)
+
+    submission.pop("campaign_id")
+    return {"submission": submission, "questions": questions}
+
+
+def content_hash(content):
+    """Hash of a report's content; reports with the same hash are identical."""
+    payload = json.dumps(
+        [REPORT_FORMAT_VERSION, content], sort_keys=True, default=str
+    ).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class ReportPDF(FPDF):
+    def header(self):
+        # Set font for header
+        self.set_font("Arial", "B", 12)
+        # Title
+        self.cell(0, 10, f"Candidate Submission Report", 0, 1, "C")
+        # Line break
+        self.ln(4)
+
+    def footer(self):
+        # Position at 1.5 cm from bottom
+        self.set_y(-15)
+        # Set font for footer
+        self.set_font("Arial", "I", 8)
+        # Page number
+        self.cell(0, 10, f"Page {self.page_no()}", 0, 0, "C")
+
+
+def build_report_pdf(content):
+    """Lay out a submission report from the content loaded by load_report_content."""
+    submission = content["submission"]
+
+    pdf = ReportPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+
+    # Add submission details section
+    pdf.set_font("Arial", "B", 11)
+    pdf.cell(0, 10, "Submission Details", 0, 1, "L")
+    pdf.set_font("Arial", "", 10)
+    pdf.cell(40, 8, "Candidate:", 0, 0)
+    pdf.cell(0, 8, f"{submission['user_name']} ({submission['email']})", 0, 1)
+    pdf.cell(40, 8, "Campaign:", 0, 0)
+    pdf.cell(0, 8, f"{submission['campaign_name']}", 0, 1)
+    pdf.cell(40, 8, "Date:", 0, 0)
+    pdf.cell(0, 8, f"{submission['created_at']}", 0, 1)
+    pdf.cell(40, 8, "Total Score:", 0, 0)
+    pdf.cell(0, 8, f"{submission['total_points']} points", 0, 1)
+
+    # Add campaign context
+    pdf.ln(5)
+    pdf.set_font("Arial", "B", 11)
+    pdf.cell(0, 10, "Campaign Context:", 0, 1, "L")
+    pdf.set_font("Arial", "", 10)
+    pdf.multi_cell(0, 8, f"{submission['campaign_context']}")
+
+    # Add questions and answers
+    total_points = 0
+    max_total_points = 0
+
+    for i, question in enumerate(content["questions"]):
+        answer = question["answer"]
+        if not answer:
+            continue
+        total_points += answer["score"] or 0
+        max_total_points += question["max_points"] or 0
+
+        # Add question section
+        pdf.ln(10)
+        pdf.set_font("Arial", "B", 11)
+        pdf.cell(0, 10, f"Question {i+1}: {question['title']}", 0, 1, "L")
+
+        # Question body
+        pdf.set_font("Arial", "B", 10)
+        pdf.cell(0, 8, "Question:", 0, 1)
+        pdf.set_font("Arial", "", 10)
+        pdf.multi_cell(0, 8, f"{question['body']}")
+
+        # Scoring criteria
+        pdf.ln(5)
+        pdf.set_font("Arial", "B", 10)
+        pdf.cell(0, 8, "Scoring Criteria:", 0, 1)
+        pdf.set_font("Arial", "", 10)
+        pdf.multi_cell(0, 8, f"{question['scoring_prompt']}")
+
+        # Candidate's answer
+        pdf.ln(5)
+        pdf.set_font("Arial", "B", 10)
+        pdf.cell(0, 8, "Candidate's Response:", 0, 1)
+        pdf.set_font("Arial", "", 10)
+        pdf.multi_cell(0, 8, f"{answer['transcript']}")
+
+        # Score and rationale
+        pdf.ln(5)
+        pdf.set_font("Arial", "B", 10)
+        pdf.cell(40, 8, "Score:", 0, 0)
+        pdf.set_font("Arial", "", 10)
+        pdf.cell(0, 8, f"{answer['score']} / {question['max_points']} points", 0, 1)
+
+        pdf.set_font("Arial", "B", 10)
+        pdf.cell(0, 8, "Score Rationale:", 0, 1)
+        pdf.set_font("Arial", "", 10)
+        pdf.multi_cell(0, 8, f"{answer['score_rationale']}")
+
+        # Draw a separator line
+        pdf.ln(5)
+        pdf.line(10, pdf.get_y(), 200, pdf.get_y())
+
+    # Add summary at the end
+    pdf.ln(10)
+    pdf.set_font("Arial", "B", 11)
+    pdf.cell(0, 10, "Summary", 0, 1, "L")
+    pdf.set_font("Arial", "", 10)
+    pdf.cell(70, 8, "Total Score:", 0, 0)
+    pdf.cell(0, 8, f"{total_points} / {max_total_points} points", 0, 1)
+    pdf.cell(70, 8, "Percentage Score:", 0, 0)
+    percentage = (total_points / max_total_points * 100) if max_total_points > 0 else 0
+    pdf.cell(0, 8, f"{percentage:.1f}%", 0, 1)
+
+    return pdf
+
+
+class ReportRenderer:
+    """
+    Renders submission reports on a thread pool into a cache directory.
+
+    Each report is stored as <hash of the submission id>/<content hash>.pdf, so a
+    report is only served while the submission's content still hashes to it and
+    a change to any answer or score makes the next request render a new one.
+    Concurrent requests for the same report share one render.
+    """
+
+    def __init__(self, cache_dir, max_workers):
+        self.cache_dir = cache_dir
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="report-renderer"
+        )
+        self._rendering = {}
+        self._lock = threading.Lock()
+
+    def _submission_dir(self, submission_id):
+        key = hashlib.sha256(str(submission_id).encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.cache_dir, key)
+
+    def report_path(self, submission_id, content):
+        return os.path.join(
+            self._submission_dir(submission_id), f"{content_hash(content)}.pdf"
+        )
+
+    def render(self, submission_id, content):
+        """
+        Get the report for a submission's content, rendering it if it is not cached.
+
+        Returns:
+            Future resolving to the path of the PDF
+        """
+        path = self.report_path(submission_id, content)
+        with self._lock:
+            if os.path.exists(path):
+                future = Future()
+                future.set_result(path)
+                return future
+            future = self._rendering.get(path)
+            if future is not None:
+                return future
+            future = self._executor.submit(self._render, submission_id, content, path)
+            self._rendering[path] = future
+        future.add_done_callback(lambda f: self._forget(path, f))
+        return future
+
+    def _forget(self, path, future):
+        with self._lock:
+            if self._rendering.get(path) is future:
+                del self._rendering[path]
+
+    def _render(self, submission_id, content, path):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Written under a temporary name, so readers never see a partial file
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            build_report_pdf(content).output(temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        logger.info(f"Rendered report for submission {submission_id}")
+
+        # Reports of earlier content of this submission will not be served again
+        self._remove_reports(directory, keep=path)
+        return path
+
+    def _remove_reports(self, directory, keep=None):
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if entry.name.endswith(".pdf") and entry.path != keep:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    def invalidate(self, submission_id):
+        """Delete the cached reports of a submission."""
+        self._remove_reports(self._submission_dir(submission_id))
+
+
+renderer = ReportRenderer(
+    Config.REPORT_CACHE_DIR
+    or os.path.join(os.path.dirname(__file__), "report_cache"),
+    Config.REPORT_RENDER_WORKERS,
+)
+
+
+def open_report(submission_id, timeout=Config.REPORT_RENDER_TIMEOUT):
+    """
+    Open a submission's PDF report, rendering it in the background if needed.
+
+    Args:
+        submission_id: ID of the submission
+        timeout: Seconds to wait for the render, or None to wait until it is done
+
+    Returns:
+        Binary file object of the PDF, or None if the submission does not exist
+
+    Raises:
+        concurrent.futures.TimeoutError: If rendering takes longer than timeout;
+            the render carries on and a later call picks up its result
+    """
+    for _ in range(2):
+        content = load_report_content(submission_id)
+        if content is None:
+            return None
+        path = renderer.render(submission_id, content).result(timeout=timeout)
+        try:
+            return open(path, "rb")
+        except FileNotFoundError:
+            # Invalidated between rendering and opening; load the content again
+            continue
+    raise RuntimeError(f"Report for submission {submission_id} keeps changing")
+
+
+def invalidate_report(submission_id):
+    """
+    Drop the cached report of a submission after its answers or scores change.
+
+    Cached reports are keyed by content, so a stale one is never served; this
+    frees its disk space right away instead of on the next render.
+    """
+    try:
+        renderer.invalidate(submission_id)
+    except Exception as e:
+        logger.error(f"Error invalidating report for submission {submission_id}: {e}")
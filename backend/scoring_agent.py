@@ -1,10 +1,28 @@
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
 import json
 import logging
+from config import Config
+from llm_gateway import chat_completion
+from prompt_budget import PromptBudget, count_tokens
+from scoring_schemas import (
+    QUESTION_SCORE_RESPONSE_FORMAT,
+    RESUME_ANALYSIS_RESPONSE_FORMAT,
+    SCORES_RESPONSE_FORMAT,
+    resume_analysis_error,
+    score_entry_error,
+    validate_scores,
+)
 
-client = OpenAI()
 logger = logging.getLogger(__name__)
 
+SCORING_MODE_COMBINED = "combined"
+SCORING_MODE_PER_QUESTION = "per_question"
+
+# Minimum similarity between a campaign question and the agent's spoken question
+# for the per-question scorer to send only that response
+RESPONSE_MATCH_THRESHOLD = 0.5
+
 
 def format_questions(questions):
     prompt = "# QUESTIONS AND SCORING CRITERIA"
@@ -18,23 +36,23 @@ def format_questions(questions):
     return prompt
 
 
-def openai_response(system_prompt, user_prompt):
-    completion = client.chat.completions.create(
+def openai_response(system_prompt, user_prompt, cache_if=None, response_format=None):
+    params = {}
+    if response_format is not None:
+        params["response_format"] = response_format
+    return chat_completion(
         model="gpt-4o-mini",
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ],
+        cache_if=cache_if,
+        **params,
     )
-    return completion.choices[0].message.content
-
 
-def generate_submission_scoring(campaign, questions, transcript):
-    campaign_title = campaign["title"]
-    campaign_context = campaign["campaign_context"]
-    job_description = campaign["job_description"]
 
-    # Process transcript to extract candidate responses
+def extract_candidate_responses(transcript):
+    """Group the candidate's transcript lines under the agent question that preceded them."""
     candidate_responses = {}
     current_question = None
     current_response = []
@@ -64,7 +82,59 @@ def generate_submission_scoring(campaign, questions, transcript):
     if current_question and current_response:
         candidate_responses[current_question] = "\n".join(current_response)
 
-    system_prompt = f"""
+    return candidate_responses
+
+
+def generate_submission_scoring(
+    campaign, questions, transcript, mode=None, budget=None
+):
+    """
+    Score a candidate's interview transcript against the campaign questions.
+
+    Args:
+        campaign: Dictionary containing campaign details (title, context, job_description)
+        questions: List of question dictionaries (id, body, scoring_prompt, max_points)
+        transcript: List of transcript entries ({"type": ..., "text": ...})
+        mode: "combined" to score all questions in one request, or "per_question" to
+              score each question in its own request (default: Config.SCORING_MODE)
+        budget: PromptBudget that compacts responses and collects prompt-size metrics
+
+    Returns:
+        List of dictionaries with question, question_id, response, rationale and score
+    """
+    candidate_responses = extract_candidate_responses(transcript)
+    return score_candidate_responses(
+        campaign, questions, candidate_responses, mode, budget
+    )
+
+
+def score_candidate_responses(
+    campaign, questions, candidate_responses, mode=None, budget=None
+):
+    """Score responses already grouped by question ({question text: response})."""
+    mode = mode or Config.SCORING_MODE
+    if budget is None:
+        budget = PromptBudget(scoring_mode=mode)
+    if mode == SCORING_MODE_PER_QUESTION:
+        return generate_per_question_scoring(
+            campaign, questions, candidate_responses, budget
+        )
+    return generate_combined_scoring(campaign, questions, candidate_responses, budget)
+
+
+def generate_combined_scoring(campaign, questions, candidate_responses, budget):
+    """
+    Score every question in a single schema-constrained request.
+
+    Entries that are missing or fail validation are re-requested one question at a
+    time instead of discarding the whole response.
+    """
+    campaign_title = campaign["title"]
+    campaign_context = campaign["campaign_context"]
+    job_description = campaign["job_description"]
+
+    def build_system_prompt(responses):
+        return f"""
 THE OUTPUT MUST ALWAYS BE IN FRENCH.
     
 # CONTEXT
@@ -84,7 +154,7 @@ A candidate has submitted a video interview answering a series of questions.
 
 For each question, you will be given a scoring criteria, maximum number of points, and the candidate's response.
 
-You will create a JSON array containing a dictionary representing each of your answers. Within each dictionary, include the following keys in this order:
+You will create a JSON object whose "scores" array contains a dictionary representing each of your answers. Within each dictionary, include the following keys in this order:
 - question: Repeat the original question prompt.
 - question_id: The ID of the question. Match this to the question ID in the questions array.
 - response: Provide the candidate's response. Copy and paste the transcript segment that corresponds to the question.
@@ -100,28 +170,211 @@ For example: if a candidate requests a salary of $70k and the ideal is $50k, do
 Apply this principle across all answers.  Quantitative and qualitative should use the same scale.
 
 
-Provide only the JSON array in plaintext. Do not use any markdown functionality.
+Provide only the JSON object in plaintext. Do not use any markdown functionality.
 
 # CANDIDATE RESPONSES
-{json.dumps(candidate_responses, indent=2)}
+{json.dumps(responses, ensure_ascii=False)}
 
 THE OUTPUT MUST ALWAYS BE IN FRENCH.
 \n\n"""
 
-    user_prompt = format_questions(questions)
-    scores = openai_response(system_prompt, user_prompt)
+    # The questions are already in the system prompt, so the user prompt only asks
+    # for the scores instead of repeating the question block
+    user_prompt = "Score each of the candidate's responses."
 
-    # Ensure scores is a valid JSON string before parsing
-    if not isinstance(scores, str):
-        scores = str(scores)
+    responses = budget.compact_responses(
+        candidate_responses,
+        fixed_prompt_tokens=count_tokens(build_system_prompt({}))
+        + count_tokens(user_prompt),
+    )
+    system_prompt = build_system_prompt(responses)
+    budget.record_prompt(system_prompt, user_prompt)
+
+    def is_complete(raw):
+        return not parse_scores(raw, questions)[1]
+
+    # Only fully valid payloads are cached, so a retry reaches the model again
+    raw = openai_response(
+        system_prompt,
+        user_prompt,
+        cache_if=is_complete,
+        response_format=SCORES_RESPONSE_FORMAT,
+    )
+    valid_scores, invalid_question_ids = parse_scores(raw, questions)
+
+    if invalid_question_ids:
+        # Re-request only the missing or invalid entries instead of the whole payload
+        logger.warning(
+            f"Re-scoring {len(invalid_question_ids)} of {len(questions)} questions "
+            f"with missing or invalid entries: {invalid_question_ids}"
+        )
+        logger.warning(f"Raw response: {raw}")
+        repair_questions = [q for q in questions if q["id"] in invalid_question_ids]
+        repaired_scores = generate_per_question_scoring(
+            campaign, repair_questions, candidate_responses, budget
+        )
+        for score in repaired_scores:
+            valid_scores[str(score["question_id"])] = score
+
+    return [valid_scores[str(q["id"])] for q in questions]
+
+
+def parse_scores(raw, questions):
+    """
+    Parse a combined scoring response and validate each entry against its question.
 
+    Returns:
+        Tuple of (valid_entries_by_question_id, invalid_question_ids)
+    """
     try:
-        scores_json = json.loads(scores)
-        return scores_json
-    except json.JSONDecodeError as e:
+        payload = json.loads(raw)
+    except (TypeError, ValueError) as e:
         logger.error(f"Failed to parse scoring response: {e}")
-        logger.error(f"Raw response: {scores}")
-        raise ValueError("Invalid scoring response format")
+        return validate_scores([], questions)
+
+    entries = payload.get("scores") if isinstance(payload, dict) else payload
+    return validate_scores(entries, questions)
+
+
+def match_candidate_response(question, candidate_responses):
+    """
+    Find the transcript segment that answers a campaign question.
+
+    The agent paraphrases questions, so the spoken question most similar to the
+    question body is used. Returns None if nothing is similar enough.
+    """
+    body = question["body"].lower()
+    best_match = None
+    best_ratio = 0.0
+    for spoken_question, response in candidate_responses.items():
+        ratio = SequenceMatcher(None, body, spoken_question.lower()).ratio()
+        if ratio > best_ratio:
+            best_match, best_ratio = (spoken_question, response), ratio
+
+    if best_ratio < RESPONSE_MATCH_THRESHOLD:
+        return None
+    return best_match
+
+
+def parse_question_score(raw, question):
+    """Parse a single-question scoring response, raising ValueError if it is malformed."""
+    if not isinstance(raw, str):
+        raise ValueError("Empty scoring response")
+    score = json.loads(raw)
+    error = score_entry_error(score, question)
+    if error:
+        raise ValueError(error)
+    score["question"] = score.get("question") or question["body"]
+    score["question_id"] = question["id"]
+    return score
+
+
+def score_single_question(campaign, question, candidate_responses, budget=None):
+    """
+    Score one question in its own request.
+
+    Returns:
+        Dictionary with question, question_id, response, rationale and score
+    """
+    if budget is None:
+        budget = PromptBudget(scoring_mode=SCORING_MODE_PER_QUESTION)
+
+    match = match_candidate_response(question, candidate_responses)
+    responses = dict([match]) if match else candidate_responses
+
+    def build_system_prompt(responses):
+        return f"""
+THE OUTPUT MUST ALWAYS BE IN FRENCH.
+
+# CONTEXT
+
+You are an interview scoring agent.
+
+The company is running virtual interviews for a {campaign["title"]} position.
+
+Context: {campaign["campaign_context"]}
+Job Description: {campaign["job_description"]}
+
+# QUESTION, ID, SCORING CRITERIA
+{format_questions([question])}
+
+# TASK/OVERVIEW
+A candidate has submitted a video interview. Score their answer to the question above.
+
+Create a JSON object with the following keys in this order:
+- question: Repeat the original question prompt.
+- question_id: {question["id"]}
+- response: Copy and paste the transcript segment that answers this question.
+- rationale: Provide an in-depth analysis of the candidate's response and whether it satisfies the scoring criteria given the context described above.
+- score: Provide a numerical score between 0 and {question["max_points"]} based on your rationale.
+
+Use scaled scoring where partial alignment with the ideal answer earns proportionate credit, not binary pass/fail outcomes.
+
+Provide only the JSON object in plaintext. Do not use any markdown functionality.
+
+# CANDIDATE RESPONSES
+{json.dumps(responses, ensure_ascii=False)}
+
+THE OUTPUT MUST ALWAYS BE IN FRENCH.
+\n\n"""
+
+    user_prompt = f"Score the candidate's answer to question {question['id']}."
+
+    responses = budget.compact_responses(
+        responses,
+        fixed_prompt_tokens=count_tokens(build_system_prompt({}))
+        + count_tokens(user_prompt),
+    )
+    system_prompt = build_system_prompt(responses)
+
+    def is_valid_score(raw):
+        try:
+            parse_question_score(raw, question)
+            return True
+        except ValueError:
+            return False
+
+    last_error = None
+    for attempt in range(Config.SCORING_QUESTION_ATTEMPTS):
+        # Invalid responses are not cached, so a retry reaches the model again
+        budget.record_prompt(system_prompt, user_prompt)
+        raw = openai_response(
+            system_prompt,
+            user_prompt,
+            cache_if=is_valid_score,
+            response_format=QUESTION_SCORE_RESPONSE_FORMAT,
+        )
+        try:
+            return parse_question_score(raw, question)
+        except ValueError as e:
+            last_error = e
+            logger.warning(
+                f"Invalid score for question {question['id']} "
+                f"(attempt {attempt + 1}): {e}"
+            )
+
+    raise ValueError(f"Invalid scoring response for question {question['id']}: {last_error}")
+
+
+def generate_per_question_scoring(campaign, questions, candidate_responses, budget):
+    """
+    Score each question in its own request, running requests concurrently.
+
+    A malformed response only causes that question to be re-requested. Results are
+    returned in question order, in the same format as the combined scorer.
+    """
+    if not questions:
+        return []
+
+    max_workers = min(Config.SCORING_MAX_CONCURRENCY, len(questions))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                score_single_question, campaign, question, candidate_responses, budget
+            )
+            for question in questions
+        ]
+        return [future.result() for future in futures]
 
 
 scoring_prompt_optimization_system = """
@@ -145,7 +398,7 @@ THE OUTPUT MUST ALWAYS BE IN FRENCH.
 
 
 def optimize_with_ai(campaign_name, campaign_context, question, scoring_prompt):
-    completion = client.chat.completions.create(
+    return chat_completion(
         model="gpt-4o-mini",
         messages=[
             {
@@ -159,7 +412,6 @@ def optimize_with_ai(campaign_name, campaign_context, question, scoring_prompt):
             }
         ],
     )
-    return completion.choices[0].message.content
 
 
 def analyze_strengths_weaknesses(campaign, resume_text):
@@ -235,26 +487,82 @@ Analyze this resume against the job requirements and provide strengths, weakness
 THE OUTPUT MUST ALWAYS BE IN FRENCH.
 """
 
-        analysis = openai_response(system_prompt, user_prompt)
+        def is_valid_analysis(raw):
+            try:
+                return resume_analysis_error(json.loads(raw)) is None
+            except (TypeError, ValueError):
+                return False
+
+        analysis = openai_response(
+            system_prompt,
+            user_prompt,
+            cache_if=is_valid_analysis,
+            response_format=RESUME_ANALYSIS_RESPONSE_FORMAT,
+        )
         logger.info(f"Received analysis from OpenAI: {analysis}")
 
         try:
-            # Clean the response by removing markdown code block markers
-            cleaned_analysis = analysis.strip()
-            if cleaned_analysis.startswith("```json"):
-                cleaned_analysis = cleaned_analysis[7:]  # Remove ```json
-            if cleaned_analysis.endswith("```"):
-                cleaned_analysis = cleaned_analysis[:-3]  # Remove ```
-            cleaned_analysis = cleaned_analysis.strip()
-
-            analysis_json = json.loads(cleaned_analysis)
-            logger.info("Successfully parsed analysis JSON")
-            return analysis_json
-        except json.JSONDecodeError as e:
+            analysis_json = json.loads(analysis)
+        except (TypeError, json.JSONDecodeError) as e:
             logger.error(f"Failed to parse analysis JSON: {e}")
             logger.error(f"Raw analysis: {analysis}")
             raise ValueError("Invalid JSON response from analysis")
 
+        error = resume_analysis_error(analysis_json)
+        if error:
+            logger.error(f"Invalid analysis: {error}")
+            raise ValueError(error)
+
+        logger.info("Successfully parsed analysis JSON")
+        return analysis_json
+
     except Exception as e:
         logger.error(f"Error in analyze_strengths_weaknesses: {str(e)}")
         raise
+
+
+def score_interview_and_resume(
+    campaign, questions, transcript, resume_text=None, budget=None
+):
+    """
+    Run interview scoring and resume analysis concurrently and join the results.
+
+    The two model calls are independent, so the total latency is roughly that of the
+    slower call. Resume analysis is best-effort: if it fails, scoring still succeeds.
+
+    Args:
+        campaign: Dictionary containing campaign details (title, context, job_description)
+        questions: List of question dictionaries for the campaign
+        transcript: List of transcript entries ({"type": ..., "text": ...})
+        resume_text: Extracted resume text, or None to skip resume analysis
+        budget: PromptBudget that compacts responses and collects prompt-size metrics
+
+    Returns:
+        Tuple of (interview_scores, resume_analysis), where resume_analysis is None
+        if there was no resume or its analysis failed
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        scoring_future = executor.submit(
+            generate_submission_scoring,
+            campaign,
+            questions,
+            transcript,
+            budget=budget,
+        )
+        analysis_future = None
+        if resume_text:
+            analysis_future = executor.submit(
+                analyze_strengths_weaknesses, campaign, resume_text
+            )
+
+        resume_analysis = None
+        if analysis_future is not None:
+            try:
+                resume_analysis = analysis_future.result()
+            except Exception as e:
+                logger.error(f"Resume analysis failed, continuing without it: {str(e)}")
+
+        # Scoring errors propagate to the caller
+        interview_scores = scoring_future.result()
+
+    return interview_scores, resume_analysis
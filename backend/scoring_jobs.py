@@ -0,0 +1,480 @@
+"""Persistent, database-backed job queue with a local worker pool for scoring work."""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from config import Config
+from database import get_db_connection, map_row_to_dict
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+JOB_COLUMNS = [
+    "id",
+    "job_type",
+    "submission_id",
+    "status",
+    "payload",
+    "result",
+    "error",
+    "attempts",
+    "max_attempts",
+    "run_after",
+    "locked_by",
+    "locked_at",
+    "created_at",
+    "updated_at",
+    "started_at",
+    "finished_at",
+]
+
+# Columns exposed through the status endpoint
+PUBLIC_JOB_COLUMNS = [
+    "id",
+    "job_type",
+    "submission_id",
+    "status",
+    "result",
+    "error",
+    "attempts",
+    "created_at",
+    "started_at",
+    "finished_at",
+]
+
+_job_handlers = {}
+
+
+def job_handler(job_type):
+    """Register a function as the handler for a job type. The handler receives the job payload."""
+
+    def decorator(f):
+        _job_handlers[job_type] = f
+        return f
+
+    return decorator
+
+
+def enqueue_job(job_type, payload, submission_id=None, max_attempts=None):
+    """
+    Persist a new job and wake up the local worker pool.
+
+    Returns:
+        The ID of the queued job
+    """
+    job_id = str(uuid.uuid4())
+    if max_attempts is None:
+        max_attempts = Config.SCORING_JOB_MAX_ATTEMPTS
+
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            INSERT INTO scoring_jobs
+            (id, job_type, submission_id, status, payload, max_attempts, run_after)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                job_id,
+                job_type,
+                submission_id,
+                JOB_QUEUED,
+                json.dumps(payload),
+                max_attempts,
+                time.time(),
+            ),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    pool = start_worker_pool()
+    pool.notify()
+    logger.info(f"Enqueued {job_type} job {job_id}")
+    return job_id
+
+
+def get_job(job_id):
+    """Return the public view of a job, or None if it does not exist."""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT {', '.join(PUBLIC_JOB_COLUMNS)} FROM scoring_jobs WHERE id = ?",
+            (job_id,),
+        )
+        row = cursor.fetchone()
+    finally:
+        conn.close()
+
+    if not row:
+        return None
+
+    job = map_row_to_dict(row, PUBLIC_JOB_COLUMNS)
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+def claim_next_job(worker_id, job_types=None, exclude_job_types=()):
+    """
+    Atomically mark the oldest runnable queued job as running for this worker.
+
+    The claim only succeeds if the job is still queued, so when two workers pick
+    the same job one of them wins and the other looks for the next one.
+
+    Args:
+        worker_id: ID of the claiming worker, recorded in locked_by
+        job_types: Only claim jobs of these types (all types by default)
+        exclude_job_types: Never claim jobs of these types
+
+    Returns:
+        Dictionary with id, job_type, payload and attempts, or None if the queue is empty
+    """
+    now = time.time()
+    type_filter, type_params = "", []
+    if job_types is not None:
+        type_filter += f" AND job_type IN ({', '.join('?' for _ in job_types)})"
+        type_params += list(job_types)
+    if exclude_job_types:
+        type_filter += (
+            f" AND job_type NOT IN ({', '.join('?' for _ in exclude_job_types)})"
+        )
+        type_params += list(exclude_job_types)
+
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        while True:
+            cursor.execute(
+                f"""
+                SELECT id FROM scoring_jobs
+                WHERE status = ? AND run_after <= ?{type_filter}
+                ORDER BY created_at, run_after
+                LIMIT 1
+                """,
+                [JOB_QUEUED, now] + type_params,
+            )
+            row = cursor.fetchone()
+            if not row:
+                break
+
+            cursor.execute(
+                """
+                UPDATE scoring_jobs
+                SET status = ?, attempts = attempts + 1, locked_by = ?, locked_at = ?,
+                    started_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND status = ?
+                """,
+                (JOB_RUNNING, worker_id, now, row[0], JOB_QUEUED),
+            )
+            if cursor.rowcount:
+                cursor.execute(
+                    """
+                    SELECT id, job_type, payload, attempts, max_attempts
+                    FROM scoring_jobs WHERE id = ?
+                    """,
+                    (row[0],),
+                )
+                row = cursor.fetchone()
+                break
+            # Another worker claimed it first; commit so the next SELECT sees that
+            conn.commit()
+        conn.commit()
+    finally:
+        conn.close()
+
+    if not row:
+        return None
+
+    job = map_row_to_dict(row, ["id", "job_type", "payload", "attempts", "max_attempts"])
+    job["payload"] = json.loads(job["payload"])
+    return job
+
+
+def complete_job(job_id, result, worker_id):
+    """
+    Store a job's result and mark it as completed.
+
+    Returns:
+        False if the job is no longer running under this worker (its lease
+        expired and it was re-queued), in which case the result is dropped
+    """
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            UPDATE scoring_jobs
+            SET status = ?, result = ?, error = NULL, locked_by = NULL,
+                finished_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = ? AND locked_by = ?
+            """,
+            (JOB_COMPLETED, json.dumps(result), job_id, JOB_RUNNING, worker_id),
+        )
+        completed = cursor.rowcount > 0
+        conn.commit()
+    finally:
+        conn.close()
+
+    if not completed:
+        logger.warning(f"Dropped the result of job {job_id}, its lease was lost")
+    return completed
+
+
+def fail_job(job, error, worker_id, retry=True):
+    """
+    Record a job failure. The job is re-queued with exponential backoff until it
+    runs out of attempts, after which it is marked as failed.
+
+    Returns:
+        False if the job is no longer running under this worker, in which case
+        the failure is dropped
+    """
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        retrying = retry and job["attempts"] < job["max_attempts"]
+        if retrying:
+            delay = Config.SCORING_JOB_RETRY_DELAY * (2 ** (job["attempts"] - 1))
+            cursor.execute(
+                """
+                UPDATE scoring_jobs
+                SET status = ?, error = ?, run_after = ?, locked_by = NULL,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND status = ? AND locked_by = ?
+                """,
+                (
+                    JOB_QUEUED,
+                    error,
+                    time.time() + delay,
+                    job["id"],
+                    JOB_RUNNING,
+                    worker_id,
+                ),
+            )
+            message = f"Job {job['id']} failed, retrying in {delay}s: {error}"
+        else:
+            cursor.execute(
+                """
+                UPDATE scoring_jobs
+                SET status = ?, error = ?, locked_by = NULL,
+                    finished_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND status = ? AND locked_by = ?
+                """,
+                (JOB_FAILED, error, job["id"], JOB_RUNNING, worker_id),
+            )
+            message = f"Job {job['id']} failed permanently: {error}"
+        recorded = cursor.rowcount > 0
+        conn.commit()
+    finally:
+        conn.close()
+
+    if not recorded:
+        logger.warning(f"Dropped the failure of job {job['id']}, its lease was lost")
+    elif retrying:
+        logger.warning(message)
+    else:
+        logger.error(message)
+    return recorded
+
+
+def renew_job_lease(job_id, worker_id):
+    """
+    Extend the lease of a job this worker is running, so requeue_stale_jobs
+    leaves it alone however long the handler takes.
+
+    Returns:
+        False if the job is no longer running under this worker
+    """
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            UPDATE scoring_jobs
+            SET locked_at = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = ? AND locked_by = ?
+            """,
+            (time.time(), job_id, JOB_RUNNING, worker_id),
+        )
+        renewed = cursor.rowcount > 0
+        conn.commit()
+    finally:
+        conn.close()
+    return renewed
+
+
+def requeue_stale_jobs():
+    """
+    Return jobs whose worker lease expired (e.g. the worker process died) to the queue.
+
+    Workers renew the lease of a running job every SCORING_JOB_HEARTBEAT_INTERVAL,
+    so only jobs whose worker stopped renewing it are re-queued.
+
+    Returns:
+        Number of jobs re-queued
+    """
+    cutoff = time.time() - Config.SCORING_JOB_LEASE_SECONDS
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            UPDATE scoring_jobs
+            SET status = ?, locked_by = NULL, updated_at = CURRENT_TIMESTAMP
+            WHERE status = ? AND locked_at < ?
+            """,
+            (JOB_QUEUED, JOB_RUNNING, cutoff),
+        )
+        requeued = cursor.rowcount
+        conn.commit()
+    finally:
+        conn.close()
+
+    if requeued:
+        logger.warning(f"Re-queued {requeued} stale scoring jobs")
+    return requeued
+
+
+class ScoringWorkerPool:
+    """
+    A pool of worker threads that poll the scoring_jobs table and run job handlers.
+
+    job_types and exclude_job_types limit the jobs it claims, as in claim_next_job.
+    """
+
+    def __init__(self, num_workers, poll_interval, job_types=None, exclude_job_types=()):
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self.job_types = job_types
+        self.exclude_job_types = exclude_job_types
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._threads = []
+        self._requeue_lock = threading.Lock()
+        self._last_requeue = 0
+
+    def start(self):
+        self._requeue_stale_jobs()
+        for i in range(self.num_workers):
+            worker_id = f"{os.getpid()}-{i}"
+            thread = threading.Thread(
+                target=self._run,
+                args=(worker_id,),
+                name=f"scoring-worker-{worker_id}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Started {self.num_workers} scoring workers")
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+
+    def notify(self):
+        """Wake idle workers so a newly queued job is picked up immediately."""
+        self._wakeup.set()
+
+    def _requeue_stale_jobs(self, interval=0):
+        """Recover stale jobs, unless another worker of this pool did so within interval."""
+        with self._requeue_lock:
+            if time.monotonic() - self._last_requeue < interval:
+                return
+            self._last_requeue = time.monotonic()
+        try:
+            requeue_stale_jobs()
+        except Exception as e:
+            logger.error(f"Failed to re-queue stale jobs: {str(e)}")
+
+    def _run(self, worker_id):
+        while not self._stopped.is_set():
+            # A process whose worker died mid-job may never restart, so every
+            # process keeps looking for stale jobs, not only at startup
+            self._requeue_stale_jobs(Config.SCORING_JOB_HEARTBEAT_INTERVAL)
+            try:
+                job = claim_next_job(
+                    worker_id, self.job_types, self.exclude_job_types
+                )
+            except Exception as e:
+                logger.error(f"Worker {worker_id} failed to claim a job: {str(e)}")
+                job = None
+
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            self._execute(job, worker_id)
+
+    def _heartbeat(self, job_id, worker_id, done):
+        """Renew a running job's lease until done is set."""
+        while not done.wait(Config.SCORING_JOB_HEARTBEAT_INTERVAL):
+            try:
+                if not renew_job_lease(job_id, worker_id):
+                    logger.warning(f"Worker {worker_id} lost the lease of job {job_id}")
+                    return
+            except Exception as e:
+                logger.error(f"Failed to renew the lease of job {job_id}: {str(e)}")
+
+    def _execute(self, job, worker_id):
+        handler = _job_handlers.get(job["job_type"])
+        if handler is None:
+            fail_job(
+                job,
+                f"No handler registered for {job['job_type']}",
+                worker_id,
+                retry=False,
+            )
+            return
+
+        done = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat,
+            args=(job["id"], worker_id, done),
+            name=f"scoring-heartbeat-{worker_id}",
+            daemon=True,
+        )
+        heartbeat.start()
+        try:
+            logger.info(f"Running {job['job_type']} job {job['id']}")
+            result = handler(job["payload"])
+            complete_job(job["id"], result, worker_id)
+        except Exception as e:
+            logger.error(f"Error running job {job['id']}: {str(e)}")
+            fail_job(job, str(e), worker_id, retry=getattr(e, "retryable", True))
+        finally:
+            done.set()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def start_worker_pool():
+    """Start this process's worker pool if it is not already running."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ScoringWorkerPool(
+                Config.SCORING_WORKERS,
+                Config.SCORING_JOB_POLL_INTERVAL,
+                # Left to the process running transcription_worker.py, so only
+                # that process loads Whisper models
+                exclude_job_types=(
+                    ("transcribe_answer",)
+                    if Config.TRANSCRIPTION_DEDICATED_WORKER
+                    else ()
+                ),
+            )
+            _pool.start()
+        return _pool
@@ -0,0 +1,145 @@
+"""
+Structured-output schemas for scoring and resume analysis, with fast local validators.
+
+The schemas are sent as response_format so the model is constrained to produce
+matching JSON. The validators re-check the parsed payload against the campaign
+questions (IDs, score ranges) without any schema library.
+"""
+
+SCORE_ENTRY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "question": {"type": "string"},
+        "question_id": {"type": "string"},
+        "response": {"type": "string"},
+        "rationale": {"type": "string"},
+        "score": {"type": "number"},
+    },
+    "required": ["question", "question_id", "response", "rationale", "score"],
+    "additionalProperties": False,
+}
+
+SCORES_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "interview_scores",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "scores": {"type": "array", "items": SCORE_ENTRY_SCHEMA},
+            },
+            "required": ["scores"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+QUESTION_SCORE_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "question_score",
+        "strict": True,
+        "schema": SCORE_ENTRY_SCHEMA,
+    },
+}
+
+RESUME_ANALYSIS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "resume_analysis",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "strengths": {"type": "array", "items": {"type": "string"}},
+                "weaknesses": {"type": "array", "items": {"type": "string"}},
+                "overall_fit": {"type": "string"},
+                "fit_score": {"type": "number"},
+                "fit_reason": {"type": "string"},
+            },
+            "required": [
+                "strengths",
+                "weaknesses",
+                "overall_fit",
+                "fit_score",
+                "fit_reason",
+            ],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def score_entry_error(entry, question):
+    """
+    Check a single score entry against its question.
+
+    Returns:
+        A description of the first problem found, or None if the entry is valid
+    """
+    if not isinstance(entry, dict):
+        return "entry is not an object"
+    for field in ("response", "rationale"):
+        if not isinstance(entry.get(field), str):
+            return f"{field} is missing or not a string"
+    score = entry.get("score")
+    if not _is_number(score):
+        return "score is missing or not a number"
+    if not 0 <= score <= question["max_points"]:
+        return f"score {score} is outside 0-{question['max_points']}"
+    return None
+
+
+def validate_scores(entries, questions):
+    """
+    Split a list of score entries into valid entries and questions needing a re-request.
+
+    Entries are matched to questions by question_id. Unknown or duplicate IDs are
+    ignored.
+
+    Returns:
+        Tuple of (valid_entries_by_question_id, invalid_question_ids), where
+        invalid_question_ids lists questions with a missing or invalid entry in
+        question order
+    """
+    questions_by_id = {str(q["id"]): q for q in questions}
+    valid = {}
+    if isinstance(entries, list):
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            question_id = str(entry.get("question_id"))
+            question = questions_by_id.get(question_id)
+            if question is None or question_id in valid:
+                continue
+            if score_entry_error(entry, question) is None:
+                entry["question_id"] = question["id"]
+                valid[question_id] = entry
+
+    invalid = [q["id"] for q in questions if str(q["id"]) not in valid]
+    return valid, invalid
+
+
+def resume_analysis_error(analysis):
+    """
+    Check a resume analysis payload.
+
+    Returns:
+        A description of the first problem found, or None if the analysis is valid
+    """
+    if not isinstance(analysis, dict):
+        return "Resume analysis result is not a dictionary"
+    for field in ("strengths", "weaknesses"):
+        value = analysis.get(field)
+        if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+            return f"Missing or invalid field in resume analysis: {field}"
+    if not isinstance(analysis.get("overall_fit"), str):
+        return "Missing or invalid field in resume analysis: overall_fit"
+    if not _is_number(analysis.get("fit_score")):
+        return "Missing or invalid field in resume analysis: fit_score"
+    return None
@@ -0,0 +1,396 @@
+import json
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config import Config
+
+from database import bulk_upsert, get_db_connection, map_row_to_dict
+from prompt_budget import PromptBudget, record_prompt_metrics
+from report_renderer import invalidate_report
+from scoring_agent import (
+    SCORING_MODE_PER_QUESTION,
+    analyze_strengths_weaknesses,
+    extract_candidate_responses,
+    score_interview_and_resume,
+    score_single_question,
+)
+from scoring_jobs import job_handler
+from scoring_schemas import resume_analysis_error
+
+logger = logging.getLogger(__name__)
+
+SUBMISSION_COLUMNS = [
+    "id",
+    "campaign_id",
+    "user_id",
+    "created_at",
+    "updated_at",
+    "is_complete",
+    "total_points",
+    "resume_text",
+    "title",
+    "campaign_context",
+    "job_description",
+]
+
+
+class SubmissionNotFoundError(Exception):
+    """Raised when a submission to be scored does not exist."""
+
+    # A missing submission will not appear on retry
+    retryable = False
+
+
+def load_scoring_context(cursor, submission_id):
+    """
+    Load the submission, its campaign and the campaign questions needed for scoring.
+
+    Returns:
+        Tuple of (submission, campaign, questions), or None if the submission does not exist
+    """
+    cursor.execute(
+        """
+        SELECT
+            s.id, s.campaign_id, s.user_id, s.created_at, s.updated_at,
+            s.is_complete, s.total_points, s.resume_text,
+            c.title, c.campaign_context, c.job_description
+        FROM submissions s
+        JOIN campaigns c ON s.campaign_id = c.id
+        WHERE s.id = ?
+        """,
+        (submission_id,),
+    )
+
+    submission_row = cursor.fetchone()
+    if not submission_row:
+        return None
+
+    submission = map_row_to_dict(submission_row, SUBMISSION_COLUMNS)
+
+    campaign = {
+        "title": submission["title"],
+        "campaign_context": submission["campaign_context"],
+        "job_description": submission["job_description"],
+    }
+
+    cursor.execute(
+        """
+        SELECT id, body, scoring_prompt, max_points
+        FROM questions
+        WHERE campaign_id = ?
+        """,
+        (submission["campaign_id"],),
+    )
+    questions = [
+        map_row_to_dict(row, ["id", "body", "scoring_prompt", "max_points"])
+        for row in cursor.fetchall()
+    ]
+
+    return submission, campaign, questions
+
+
+def validate_resume_analysis(resume_analysis):
+    """Raise ValueError if a resume analysis result is missing required fields."""
+    error = resume_analysis_error(resume_analysis)
+    if error:
+        raise ValueError(error)
+
+
+def store_resume_analysis(cursor, submission_id, resume_analysis):
+    """Insert a resume analysis row for a submission."""
+    cursor.execute(
+        """
+        INSERT INTO resume_analysis (
+            id, submission_id, strengths, weaknesses,
+            overall_fit, percent_match, percent_match_reason
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            str(uuid.uuid4()),
+            submission_id,
+            json.dumps(resume_analysis.get("strengths", [])),
+            json.dumps(resume_analysis.get("weaknesses", [])),
+            resume_analysis.get("overall_fit", ""),
+            resume_analysis.get("fit_score", 0),
+            resume_analysis.get("fit_reason", ""),
+        ),
+    )
+
+
+def save_answer_scores(cursor, submission_id, scores):
+    """Insert or update the submission answers for scored questions in one batch."""
+    bulk_upsert(
+        cursor,
+        "submission_answers",
+        [
+            "id",
+            "submission_id",
+            "question_id",
+            "transcript",
+            "score",
+            "score_rationale",
+        ],
+        [
+            (
+                str(uuid.uuid4()),
+                submission_id,
+                score["question_id"],
+                score["response"],
+                score["score"],
+                score["rationale"],
+            )
+            for score in scores
+        ],
+        conflict_columns=["submission_id", "question_id"],
+    )
+    invalidate_report(submission_id)
+
+
+def build_scoring_result(submission_id, questions, interview_scores, resume_analysis):
+    """
+    Combine interview scores and resume analysis into the submit_interview response payload.
+
+    Args:
+        submission_id: ID of the scored submission
+        questions: List of question dictionaries for the campaign
+        interview_scores: List of per-question score dictionaries
+        resume_analysis: Resume analysis dictionary, or None if unavailable
+
+    Returns:
+        Dictionary in the format returned by /api/submit_interview
+    """
+    total_score = sum(score["score"] for score in interview_scores)
+    max_possible_score = sum(q["max_points"] for q in questions)
+
+    # Extract strengths and weaknesses from interview answers
+    interview_strengths = []
+    interview_weaknesses = []
+    for score in interview_scores:
+        rationale = score.get("rationale", "")
+        if "strength" in rationale.lower():
+            interview_strengths.append(rationale)
+        if "weakness" in rationale.lower():
+            interview_weaknesses.append(rationale)
+
+    formatted_resume_analysis = None
+    if resume_analysis and isinstance(resume_analysis, dict):
+        # Overall match score is the average of the interview score (normalized to 100)
+        # and the resume fit score
+        interview_score_normalized = (
+            (total_score / max_possible_score) * 100 if max_possible_score else 0
+        )
+        resume_fit_score = resume_analysis.get("fit_score", 0)
+        overall_match_score = (interview_score_normalized + resume_fit_score) / 2
+
+        formatted_resume_analysis = {
+            "strengths": resume_analysis.get("strengths", []) + interview_strengths,
+            "weaknesses": resume_analysis.get("weaknesses", []) + interview_weaknesses,
+            "overall_fit": resume_analysis.get("overall_fit", ""),
+            "percent_match": overall_match_score,
+            "percent_match_reason": resume_analysis.get("fit_reason", ""),
+        }
+
+    return {
+        "success": True,
+        "message": "Interview scored successfully",
+        "submission_id": submission_id,
+        "total_score": total_score,
+        "max_possible_score": max_possible_score,
+        "interview_scores": interview_scores,
+        "resume_analysis": formatted_resume_analysis,
+    }
+
+
+def score_submission(submission_id, transcript):
+    """
+    Score an interview transcript, analyze the candidate's resume and persist the results.
+
+    Args:
+        submission_id: ID of the submission being scored
+        transcript: List of transcript entries ({"type": ..., "text": ...})
+
+    Returns:
+        Dictionary in the format returned by /api/submit_interview
+
+    Raises:
+        SubmissionNotFoundError: If the submission does not exist
+    """
+    conn = get_db_connection()
+    try:
+        context = load_scoring_context(conn.cursor(), submission_id)
+    finally:
+        conn.close()
+
+    if context is None:
+        raise SubmissionNotFoundError(f"Submission {submission_id} not found")
+    submission, campaign, questions = context
+
+    # The model calls run without holding a database connection
+    budget = PromptBudget(scoring_mode=Config.SCORING_MODE)
+    interview_scores, resume_analysis = score_interview_and_resume(
+        campaign, questions, transcript, submission.get("resume_text"), budget
+    )
+    record_prompt_metrics(submission_id, budget)
+
+    if resume_analysis is not None:
+        try:
+            logger.info(f"Resume analysis completed: {resume_analysis}")
+            validate_resume_analysis(resume_analysis)
+        except Exception as e:
+            logger.error(f"Failed to process resume analysis: {str(e)}")
+            logger.error(f"Resume text length: {len(submission['resume_text'])}")
+            # Continue with interview scoring even if resume analysis fails
+            resume_analysis = None
+    elif not submission.get("resume_text"):
+        logger.info(f"No resume text available for submission {submission_id}")
+
+    result = build_scoring_result(
+        submission_id, questions, interview_scores, resume_analysis
+    )
+
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+
+        if resume_analysis is not None:
+            store_resume_analysis(cursor, submission_id, resume_analysis)
+
+        save_answer_scores(cursor, submission_id, interview_scores)
+
+        # Mark submission as complete and update total score
+        _mark_submission_scored(cursor, submission_id, result["total_score"])
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    logger.info(f"Stored scores for submission {submission_id}")
+    return result
+
+
+def stream_submission_scoring(submission_id, transcript):
+    """
+    Score a submission question by question, yielding each result as soon as it is ready.
+
+    Each question is scored in its own request and the resume analysis runs alongside
+    them. Every score is written to submission_answers as it arrives, so a client that
+    disconnects early keeps the rows scored so far.
+
+    Yields:
+        Tuples of (event, data): "score" for each question, "resume_analysis" once the
+        analysis finishes, then "complete" with the submit_interview result, or
+        "error" if any question could not be scored
+
+    Raises:
+        SubmissionNotFoundError: If the submission does not exist
+    """
+    conn = get_db_connection()
+    try:
+        context = load_scoring_context(conn.cursor(), submission_id)
+    finally:
+        conn.close()
+
+    if context is None:
+        raise SubmissionNotFoundError(f"Submission {submission_id} not found")
+    submission, campaign, questions = context
+
+    candidate_responses = extract_candidate_responses(transcript)
+    budget = PromptBudget(scoring_mode=SCORING_MODE_PER_QUESTION)
+    executor = ThreadPoolExecutor(max_workers=Config.SCORING_MAX_CONCURRENCY + 1)
+    try:
+        futures = {
+            executor.submit(
+                score_single_question, campaign, question, candidate_responses, budget
+            ): question
+            for question in questions
+        }
+        if submission.get("resume_text"):
+            futures[
+                executor.submit(
+                    analyze_strengths_weaknesses, campaign, submission["resume_text"]
+                )
+            ] = None
+
+        scores_by_question = {}
+        failed_question_ids = []
+        resume_analysis = None
+
+        for future in as_completed(futures):
+            question = futures[future]
+
+            if question is None:
+                try:
+                    resume_analysis = future.result()
+                    validate_resume_analysis(resume_analysis)
+                    _write(store_resume_analysis, submission_id, resume_analysis)
+                except Exception as e:
+                    logger.error(f"Failed to process resume analysis: {str(e)}")
+                    # Continue with interview scoring even if resume analysis fails
+                    resume_analysis = None
+                yield "resume_analysis", resume_analysis
+                continue
+
+            try:
+                score = future.result()
+            except Exception as e:
+                logger.error(f"Failed to score question {question['id']}: {str(e)}")
+                failed_question_ids.append(question["id"])
+                yield "question_error", {"question_id": question["id"], "error": str(e)}
+                continue
+
+            _write(save_answer_scores, submission_id, [score])
+            scores_by_question[question["id"]] = score
+            yield "score", score
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    record_prompt_metrics(submission_id, budget)
+
+    if failed_question_ids:
+        yield "error", {
+            "submission_id": submission_id,
+            "error": "Some questions could not be scored",
+            "failed_question_ids": failed_question_ids,
+        }
+        return
+
+    interview_scores = [scores_by_question[q["id"]] for q in questions]
+    result = build_scoring_result(
+        submission_id, questions, interview_scores, resume_analysis
+    )
+    _write(_mark_submission_scored, submission_id, result["total_score"])
+    yield "complete", result
+
+
+def _mark_submission_scored(cursor, submission_id, total_score):
+    cursor.execute(
+        """
+        UPDATE submissions
+        SET is_complete = 1, total_points = ?
+        WHERE id = ?
+        """,
+        (total_score, submission_id),
+    )
+
+
+def _write(write_fn, *args):
+    """Run a write helper in its own short transaction."""
+    conn = get_db_connection()
+    try:
+        write_fn(conn.cursor(), *args)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+@job_handler("score_submission")
+def run_score_submission_job(payload):
+    """Job queue entry point for scoring a submitted interview."""
+    return score_submission(payload["submission_id"], payload["transcript"])
@@ -0,0 +1,270 @@
+"""Full-text search over candidate resumes and interview answer transcripts."""
+
+import base64
+import html
+import json
+import re
+
+from config import Config
+from database import db_backend, get_db_connection, map_rows
+
+SEARCH_SOURCES = ("resume", "answer")
+
+# Snippet highlight markers, replaced by <mark> tags after the text is escaped
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+SNIPPET_ELLIPSIS = "…"
+SNIPPET_TOKENS = 16
+
+RESULT_COLUMNS = [
+    "source",
+    "submission_id",
+    "question_id",
+    "snippet",
+    "score",
+    "campaign_id",
+    "user_id",
+    "candidate_name",
+    "user_email",
+    "question_title",
+]
+
+_QUERY_TERM = re.compile(r'"([^"]*)"|(\w+)(\*?)')
+_WORD = re.compile(r"\w+")
+
+
+def parse_search_query(query):
+    """
+    Split a search box query into terms.
+
+    Words are matched individually (all of them must occur), "double quoted"
+    words as a phrase, and a trailing * matches a word prefix. Anything else is
+    ignored, so user input can never be a syntax error.
+
+    Returns:
+        List of (words, is_prefix) tuples, one per term
+    """
+    terms = []
+    for phrase, word, star in _QUERY_TERM.findall(query or ""):
+        words = _WORD.findall(phrase) if phrase else [word]
+        if words:
+            terms.append((words, bool(star)))
+    return terms
+
+
+def _fts5_query(terms):
+    return " ".join(
+        '"' + " ".join(words) + '"' + ("*" if prefix else "") for words, prefix in terms
+    )
+
+
+def _boolean_mode_query(terms):
+    return " ".join(
+        "+" + ('"' + " ".join(words) + '"' if len(words) > 1 else words[0])
+        + ("*" if prefix else "")
+        for words, prefix in terms
+    )
+
+
+def encode_offset(offset):
+    """Encode a result offset as an opaque page cursor."""
+    return base64.urlsafe_b64encode(json.dumps(offset).encode("utf-8")).decode("ascii")
+
+
+def decode_offset(cursor):
+    """Decode a cursor produced by encode_offset. Raises ValueError if it is invalid."""
+    try:
+        offset = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(offset, int) or offset < 0:
+        raise ValueError("Invalid cursor")
+    return offset
+
+
+def _render_snippet(snippet):
+    """Escape a snippet for HTML and turn the highlight markers into <mark> tags."""
+    return (
+        html.escape(snippet or "")
+        .replace(_MARK_START, "<mark>")
+        .replace(_MARK_END, "</mark>")
+    )
+
+
+def _highlight(text, terms):
+    """
+    Build a snippet around the first match in text, for backends without snippet().
+
+    Returns:
+        Up to SNIPPET_TOKENS words around the first matching word, with every
+        word of the query wrapped in highlight markers
+    """
+    patterns = [
+        re.escape(word) + (r"\w*" if prefix and i == len(words) - 1 else r"\b")
+        for words, prefix in terms
+        for i, word in enumerate(words)
+    ]
+    term_pattern = re.compile(r"\b(?:" + "|".join(patterns) + ")", re.I)
+
+    words = (text or "").split()
+    first = next((i for i, w in enumerate(words) if term_pattern.search(w)), 0)
+    start = max(0, first - SNIPPET_TOKENS // 4)
+    window = words[start : start + SNIPPET_TOKENS]
+    snippet = " ".join(
+        term_pattern.sub(lambda m: _MARK_START + m.group(0) + _MARK_END, w)
+        for w in window
+    )
+    if start > 0:
+        snippet = SNIPPET_ELLIPSIS + snippet
+    if start + SNIPPET_TOKENS < len(words):
+        snippet += SNIPPET_ELLIPSIS
+    return snippet
+
+
+def _sqlite_hits(terms, sources, campaign_id, fetch):
+    """
+    FTS5 branch per source, each ranked by bm25 and cut to the first fetch hits.
+
+    Cutting each branch before the union keeps the work proportional to the page
+    depth rather than to the number of matching rows.
+    """
+    match = _fts5_query(terms)
+    snippet_args = [_MARK_START, _MARK_END, SNIPPET_ELLIPSIS, SNIPPET_TOKENS]
+    campaign_filter = " AND s.campaign_id = ?" if campaign_id else ""
+    campaign_params = [campaign_id] if campaign_id else []
+
+    branches, params = [], []
+    if "resume" in sources:
+        branches.append(
+            f"""
+            SELECT * FROM (
+                SELECT 'resume' AS source, s.id AS submission_id, NULL AS question_id,
+                       snippet(submissions_fts, 0, ?, ?, ?, ?) AS snippet,
+                       -bm25(submissions_fts) AS score
+                FROM submissions_fts
+                JOIN submissions s ON s.rowid = submissions_fts.rowid
+                WHERE submissions_fts MATCH ?{campaign_filter}
+                ORDER BY bm25(submissions_fts)
+                LIMIT ?
+            )
+            """
+        )
+        params += snippet_args + [match] + campaign_params + [fetch]
+    if "answer" in sources:
+        branches.append(
+            f"""
+            SELECT * FROM (
+                SELECT 'answer' AS source, sa.submission_id, sa.question_id,
+                       snippet(submission_answers_fts, 0, ?, ?, ?, ?) AS snippet,
+                       -bm25(submission_answers_fts) AS score
+                FROM submission_answers_fts
+                JOIN submission_answers sa ON sa.rowid = submission_answers_fts.rowid
+                JOIN submissions s ON s.id = sa.submission_id
+                WHERE submission_answers_fts MATCH ?{campaign_filter}
+                ORDER BY bm25(submission_answers_fts)
+                LIMIT ?
+            )
+            """
+        )
+        params += snippet_args + [match] + campaign_params + [fetch]
+    return " UNION ALL ".join(branches), params
+
+
+def _mariadb_hits(terms, sources, campaign_id, fetch):
+    """FULLTEXT branch per source in boolean mode; snippets are built afterwards."""
+    match = _boolean_mode_query(terms)
+    campaign_filter = " AND s.campaign_id = ?" if campaign_id else ""
+    campaign_params = [campaign_id] if campaign_id else []
+
+    branches, params = [], []
+    if "resume" in sources:
+        branches.append(
+            f"""
+            SELECT * FROM (
+                SELECT 'resume' AS source, s.id AS submission_id, NULL AS question_id,
+                       s.resume_text AS snippet,
+                       MATCH(s.resume_text) AGAINST (? IN BOOLEAN MODE) AS score
+                FROM submissions s
+                WHERE MATCH(s.resume_text) AGAINST (? IN BOOLEAN MODE){campaign_filter}
+                ORDER BY score DESC
+                LIMIT ?
+            ) resume_hits
+            """
+        )
+        params += [match, match] + campaign_params + [fetch]
+    if "answer" in sources:
+        branches.append(
+            f"""
+            SELECT * FROM (
+                SELECT 'answer' AS source, sa.submission_id, sa.question_id,
+                       sa.transcript AS snippet,
+                       MATCH(sa.transcript) AGAINST (? IN BOOLEAN MODE) AS score
+                FROM submission_answers sa
+                JOIN submissions s ON s.id = sa.submission_id
+                WHERE MATCH(sa.transcript) AGAINST (? IN BOOLEAN MODE){campaign_filter}
+                ORDER BY score DESC
+                LIMIT ?
+            ) answer_hits
+            """
+        )
+        params += [match, match] + campaign_params + [fetch]
+    return " UNION ALL ".join(branches), params
+
+
+def search_submissions(
+    query, campaign_id=None, sources=SEARCH_SOURCES, limit=None, offset=0
+):
+    """
+    Search resumes and answer transcripts, best matches first.
+
+    Each hit is one resume or one answer, with the candidate, the question (for
+    answers) and an HTML snippet with the matching words in <mark> tags.
+    Scores are comparable within one search only; higher is better.
+
+    Returns:
+        Tuple of (hits, next_offset), where next_offset is None on the last page
+
+    Raises:
+        ValueError: If the query has no searchable terms
+    """
+    terms = parse_search_query(query)
+    if not terms:
+        raise ValueError("Search query must contain at least one word")
+    limit = min(limit or Config.PAGE_SIZE_DEFAULT, Config.PAGE_SIZE_MAX)
+    # One extra hit tells whether there is a next page
+    fetch = offset + limit + 1
+
+    if db_backend.name == "sqlite":
+        hits_sql, params = _sqlite_hits(terms, sources, campaign_id, fetch)
+    else:
+        hits_sql, params = _mariadb_hits(terms, sources, campaign_id, fetch)
+
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+            SELECT hit.source, hit.submission_id, hit.question_id, hit.snippet,
+                   hit.score, s.campaign_id, s.user_id, u.name AS candidate_name,
+                   u.email AS user_email, q.title AS question_title
+            FROM ({hits_sql}) hit
+            JOIN submissions s ON s.id = hit.submission_id
+            LEFT JOIN users u ON u.id = s.user_id
+            LEFT JOIN questions q ON q.id = hit.question_id
+            ORDER BY hit.score DESC, hit.submission_id, hit.question_id
+            LIMIT ? OFFSET ?
+            """,
+            params + [limit + 1, offset],
+        )
+        hits = map_rows(cursor.fetchall(), RESULT_COLUMNS)
+    finally:
+        conn.close()
+
+    for hit in hits:
+        if db_backend.name != "sqlite":
+            hit["snippet"] = _highlight(hit["snippet"], terms)
+        hit["snippet"] = _render_snippet(hit["snippet"])
+
+    if len(hits) <= limit:
+        return hits, None
+    return hits[:limit], offset + limit
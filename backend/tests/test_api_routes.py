@@ -0,0 +1,95 @@
+import pytest
+
+
+@pytest.fixture
+def seeded(db):
+    conn = db.get_db_connection()
+    conn.execute(
+        "INSERT INTO campaigns (id, title, campaign_context) VALUES ('c1', 'Camp', '')"
+    )
+    conn.execute(
+        "INSERT INTO users (id, email, name, created_at) VALUES "
+        "('u1', 'ann@example.com', 'Ann', '2024-01-01'), "
+        "('u2', 'bob@example.com', 'Bob', '2024-01-02')"
+    )
+    conn.execute(
+        "INSERT INTO submissions (id, campaign_id, user_id, is_complete, created_at) "
+        "VALUES ('s1', 'c1', 'u1', 1, '2024-01-01'), ('s2', 'c1', 'u2', 0, '2024-01-02')"
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_list_users(client, seeded):
+    response = client.get("/api/users")
+    assert response.status_code == 200
+    assert sorted(user["id"] for user in response.get_json()) == ["u1", "u2"]
+
+
+def test_list_users_filtered(client, seeded):
+    response = client.get("/api/users?email=bob@example.com")
+    assert response.status_code == 200
+    assert [user["id"] for user in response.get_json()] == ["u2"]
+
+
+def test_list_users_paginated(client, seeded):
+    response = client.get("/api/users?limit=1&name=Ann")
+    assert response.status_code == 200
+    page = response.get_json()
+    assert [user["id"] for user in page["items"]] == ["u1"]
+    assert page["next_cursor"] is None
+
+
+def test_list_submissions(client, seeded):
+    response = client.get("/api/submissions")
+    assert response.status_code == 200
+    assert sorted(s["id"] for s in response.get_json()) == ["s1", "s2"]
+
+
+def test_list_submissions_filtered(client, seeded):
+    response = client.get("/api/submissions?is_complete=1&email=ann@example.com")
+    assert response.status_code == 200
+    submissions = response.get_json()
+    assert [s["id"] for s in submissions] == ["s1"]
+    assert submissions[0]["candidate_name"] == "Ann"
+
+
+def test_list_submissions_paginated(client, seeded):
+    response = client.get("/api/submissions?limit=1&campaign_id=c1")
+    assert response.status_code == 200
+    page = response.get_json()
+    assert [s["id"] for s in page["items"]] == ["s1"]
+
+    response = client.get(
+        f"/api/submissions?limit=1&campaign_id=c1&cursor={page['next_cursor']}"
+    )
+    assert [s["id"] for s in response.get_json()["items"]] == ["s2"]
+
+
+@pytest.fixture
+def jobs(db):
+    conn = db.get_db_connection()
+    conn.execute(
+        "INSERT INTO scoring_jobs (id, job_type, status, payload, max_attempts, "
+        "run_after, result) VALUES "
+        "('j1', 'score_submission', 'completed', '{}', 3, 0, '{\"total_score\": 7}'), "
+        "('j2', 'rescore_campaign', 'completed', '{}', 1, 0, '{\"failed\": 2}')"
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_candidate_can_poll_scoring_job(client, jobs):
+    response = client.get("/api/scoring_jobs/j1")
+    assert response.status_code == 200
+    assert response.get_json()["result"] == {"total_score": 7}
+
+
+def test_rescoring_job_is_admin_only(client, jobs):
+    assert client.get("/api/scoring_jobs/j2").status_code == 404
+
+    with client.session_transaction() as session:
+        session["is_admin"] = True
+    response = client.get("/api/scoring_jobs/j2")
+    assert response.status_code == 200
+    assert response.get_json()["result"] == {"failed": 2}
@@ -0,0 +1,18 @@
+from flask import Flask, g
+
+
+def test_request_tracks_only_open_connections(db):
+    app = Flask(__name__)
+    db.init_app(app)
+
+    with app.app_context():
+        for _ in range(50):
+            db.get_db_connection().close()
+        assert len(g._db_connections) == 0
+
+        leaked = db.get_db_connection()
+        assert g._db_connections == {leaked}
+
+    # Returned to the pool when the app context is torn down
+    assert leaked.closed
+    assert db.get_connection_pool().stats()["checked_out"] == 0
@@ -0,0 +1,25 @@
+import threading
+
+from llm_cache import LLMResponseCache
+
+
+def test_cache_reuses_one_connection_per_thread(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.db"), 60, 1024 * 1024)
+    cache.set("key", "model", "response")
+    assert cache.get("key") == "response"
+    assert cache.stats()["entries"] == 1
+
+    connections = []
+
+    def connect():
+        with cache._connect() as conn:
+            connections.append(conn)
+
+    connect()
+    connect()
+    other = threading.Thread(target=connect)
+    other.start()
+    other.join()
+
+    assert connections[0] is connections[1]
+    assert connections[2] is not connections[0]
@@ -0,0 +1,22 @@
+from types import SimpleNamespace
+
+import llm_gateway
+from config import Config
+
+
+def _rate_limited(retry_after):
+    return SimpleNamespace(
+        response=SimpleNamespace(headers={"retry-after": retry_after})
+    )
+
+
+def test_retry_after_is_capped(monkeypatch):
+    monkeypatch.setattr(Config, "LLM_RETRY_MAX_DELAY", 30)
+    assert llm_gateway._retry_delay(0, _rate_limited("2")) == 2
+    assert llm_gateway._retry_delay(0, _rate_limited("3600")) == 30
+
+
+def test_is_json():
+    assert llm_gateway.is_json('{"questions": []}')
+    assert not llm_gateway.is_json("Here are the questions: ...")
+    assert not llm_gateway.is_json(None)
@@ -0,0 +1,34 @@
+import pytest
+
+import media_uploads
+import scoring_jobs
+
+
+class _IdlePool:
+    def notify(self):
+        pass
+
+
+@pytest.fixture
+def uploads(db, monkeypatch):
+    monkeypatch.setattr(scoring_jobs, "start_worker_pool", lambda: _IdlePool())
+    return media_uploads
+
+
+def test_recorded_media_is_saved_and_queued_for_transcription(db, uploads):
+    job_id = uploads.record_answer_media("s-1", "q-1", "interviews/a.webm")
+    job_id_again = uploads.record_answer_media("s-1", "q-1", "interviews/b.webm")
+
+    conn = db.get_db_connection()
+    try:
+        answers = conn.execute(
+            "SELECT video_path FROM submission_answers WHERE submission_id = ?",
+            ("s-1",),
+        ).fetchall()
+    finally:
+        conn.close()
+    assert [answer[0] for answer in answers] == ["interviews/b.webm"]
+
+    job = scoring_jobs.get_job(job_id_again)
+    assert job_id != job_id_again
+    assert job["job_type"] == "transcribe_answer"
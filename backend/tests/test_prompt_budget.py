@@ -0,0 +1,21 @@
+import prompt_budget
+
+
+class _UnreachableTiktoken:
+    calls = 0
+
+    @classmethod
+    def get_encoding(cls, name):
+        cls.calls += 1
+        raise OSError("network is unreachable")
+
+
+def test_failed_encoding_load_is_not_retried(monkeypatch):
+    monkeypatch.setattr(prompt_budget, "tiktoken", _UnreachableTiktoken)
+    monkeypatch.setattr(prompt_budget, "_encoding", None)
+    monkeypatch.setattr(prompt_budget, "_encoding_loaded", False)
+
+    assert prompt_budget.count_tokens("a" * 40) == 11
+    assert prompt_budget.count_tokens("b" * 80) == 21
+    assert prompt_budget.compact_response("word " * 1000, 300)
+    assert _UnreachableTiktoken.calls == 1
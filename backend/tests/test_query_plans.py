@@ -0,0 +1,162 @@
+"""
+Check that the hot query paths are answered from an index.
+
+The SQL is captured from the routes and helpers that issue it, with its
+parameters bound, so a query that drifts off its index fails here.
+"""
+
+import re
+
+import pytest
+
+import campaign_export
+import report_renderer
+
+# (description, call, table that must be searched through an index)
+HOT_PATHS = [
+    (
+        "questions of a campaign",
+        lambda client: client.get("/api/campaigns/c1"),
+        "questions",
+    ),
+    (
+        "questions filtered by campaign",
+        lambda client: client.get("/api/questions?campaign_id=c1"),
+        "questions",
+    ),
+    (
+        "submissions of a campaign",
+        lambda client: client.get("/api/submissions?campaign_id=c1&is_complete=1"),
+        "submissions",
+    ),
+    (
+        "submissions of a candidate",
+        lambda client: client.get("/api/submissions?user_id=u1"),
+        "submissions",
+    ),
+    (
+        "answers of a submission",
+        lambda client: client.get("/api/submissions/s1"),
+        "submission_answers",
+    ),
+    (
+        "answers filtered by submission",
+        lambda client: client.get("/api/submission_answers?submission_id=s1"),
+        "submission_answers",
+    ),
+    (
+        "users assigned to a campaign",
+        lambda client: client.get("/api/campaigns/c1/assignments"),
+        "campaign_assignments",
+    ),
+    (
+        "report content of a submission",
+        lambda client: report_renderer.load_report_content("s1"),
+        "submission_answers",
+    ),
+    (
+        "campaign export rows",
+        lambda client: list(
+            campaign_export.iter_csv("c1", campaign_export.get_export_campaign("c1")[1])
+        ),
+        "submissions",
+    ),
+]
+
+
+@pytest.fixture
+def traced_client(client, db, monkeypatch):
+    """Test client recording every SELECT run on a pooled connection, as
+    (sql with parameters bound) strings."""
+    conn = db.get_db_connection()
+    conn.execute(
+        "INSERT INTO campaigns (id, title, campaign_context) VALUES ('c1', 'Camp', '')"
+    )
+    conn.execute(
+        "INSERT INTO users (id, email, name) VALUES ('u1', 'ann@example.com', 'Ann')"
+    )
+    conn.execute(
+        "INSERT INTO questions (id, campaign_id, title, body, scoring_prompt, "
+        "max_points, order_index) VALUES ('q1', 'c1', 'Q', 'B', 'P', 10, 0)"
+    )
+    conn.execute(
+        "INSERT INTO submissions (id, campaign_id, user_id, is_complete) "
+        "VALUES ('s1', 'c1', 'u1', 1)"
+    )
+    conn.execute(
+        "INSERT INTO submission_answers (id, submission_id, question_id, transcript) "
+        "VALUES ('a1', 's1', 'q1', 'hello')"
+    )
+    conn.execute(
+        "INSERT INTO campaign_assignments (campaign_id, user_id) VALUES ('c1', 'u1')"
+    )
+    conn.commit()
+    conn.close()
+
+    statements = []
+    connect = db.db_backend.connect
+
+    def traced_connect():
+        raw = connect()
+        raw.set_trace_callback(statements.append)
+        return raw
+
+    monkeypatch.setattr(db.db_backend, "connect", traced_connect)
+    # Connections opened from now on are traced
+    monkeypatch.setattr(db, "_pool", None)
+    return client, statements
+
+
+_SQL_KEYWORDS = {
+    "where", "join", "left", "inner", "cross", "on", "order", "group", "limit",
+    "using", "natural",
+}
+
+
+def _table_names(sql, table):
+    """The table and its aliases in sql; query plans refer to tables by alias."""
+    names = {table}
+    for alias in re.findall(
+        rf"\b(?:FROM|JOIN)\s+{table}\s+(?:AS\s+)?(\w+)", sql, re.I
+    ):
+        if alias.lower() not in _SQL_KEYWORDS:
+            names.add(alias)
+    return sorted(names)
+
+
+def _plan(db, sql):
+    conn = db.get_db_connection()
+    try:
+        return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize(
+    "description, call, table", HOT_PATHS, ids=[path[0] for path in HOT_PATHS]
+)
+def test_hot_path_uses_index(traced_client, db, description, call, table):
+    client, statements = traced_client
+    response = call(client)
+    if hasattr(response, "status_code"):
+        assert response.status_code == 200, response.get_json()
+
+    table_pattern = re.compile(rf"\b{table}\b", re.I)
+    queries = [
+        sql
+        for sql in statements
+        if sql.lstrip().upper().startswith("SELECT") and table_pattern.search(sql)
+    ]
+    assert queries, f"No query on {table} was issued for {description}"
+
+    for sql in queries:
+        names = _table_names(sql, table)
+        plan = _plan(db, sql)
+        # Older SQLite versions report "SCAN TABLE <name>"
+        misses = [
+            detail
+            for detail in plan
+            if re.match(rf"(SCAN|SEARCH) (TABLE )?({'|'.join(names)})\b", detail)
+            and (detail.startswith("SCAN") or "AUTOMATIC" in detail)
+        ]
+        assert not misses, f"{description} does not use an index:\n{sql}\n{plan}"
@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+
+import scoring_jobs
+from config import Config
+
+
+class _IdlePool:
+    def notify(self):
+        pass
+
+
+@pytest.fixture
+def jobs(db, monkeypatch):
+    # Jobs are run by hand instead of by this process's worker pool
+    monkeypatch.setattr(scoring_jobs, "start_worker_pool", lambda: _IdlePool())
+    monkeypatch.setattr(Config, "SCORING_JOB_LEASE_SECONDS", 1)
+    monkeypatch.setattr(Config, "SCORING_JOB_HEARTBEAT_INTERVAL", 0.2)
+    return scoring_jobs
+
+
+def _status(db, job_id):
+    conn = db.get_db_connection()
+    try:
+        return conn.execute(
+            "SELECT status FROM scoring_jobs WHERE id = ?", (job_id,)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_long_running_job_keeps_its_lease(db, jobs, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setitem(
+        jobs._job_handlers, "slow", lambda payload: release.wait(5) and {"ok": True}
+    )
+    job_id = jobs.enqueue_job("slow", {})
+    job = jobs.claim_next_job("worker-1")
+    pool = jobs.ScoringWorkerPool(1, 0.1)
+    runner = threading.Thread(target=pool._execute, args=(job, "worker-1"))
+    runner.start()
+
+    time.sleep(2 * Config.SCORING_JOB_LEASE_SECONDS)
+    assert jobs.requeue_stale_jobs() == 0
+    assert _status(db, job_id) == jobs.JOB_RUNNING
+
+    release.set()
+    runner.join(5)
+    assert _status(db, job_id) == jobs.JOB_COMPLETED
+
+
+def test_job_without_heartbeat_is_requeued(db, jobs):
+    job_id = jobs.enqueue_job("slow", {})
+    jobs.claim_next_job("worker-1")
+
+    time.sleep(Config.SCORING_JOB_LEASE_SECONDS + 0.5)
+    assert jobs.requeue_stale_jobs() == 1
+    assert _status(db, job_id) == jobs.JOB_QUEUED
+    assert not jobs.renew_job_lease(job_id, "worker-1")
+
+
+def test_worker_that_lost_its_lease_cannot_finish_the_job(db, jobs):
+    job_id = jobs.enqueue_job("slow", {})
+    stale = jobs.claim_next_job("worker-1")
+    time.sleep(Config.SCORING_JOB_LEASE_SECONDS + 0.5)
+    jobs.requeue_stale_jobs()
+    assert jobs.claim_next_job("worker-2")["id"] == job_id
+
+    assert not jobs.complete_job(job_id, {"ok": True}, "worker-1")
+    assert not jobs.fail_job(stale, "boom", "worker-1")
+    assert _status(db, job_id) == jobs.JOB_RUNNING
+
+    assert jobs.complete_job(job_id, {"ok": True}, "worker-2")
+    assert _status(db, job_id) == jobs.JOB_COMPLETED
+
+
+def test_web_workers_leave_transcription_to_the_dedicated_worker(db, jobs):
+    transcription_id = jobs.enqueue_job("transcribe_answer", {})
+    scoring_id = jobs.enqueue_job("score_submission", {})
+
+    web = jobs.claim_next_job("web-1", exclude_job_types=("transcribe_answer",))
+    assert web["id"] == scoring_id
+    assert jobs.claim_next_job("web-1", exclude_job_types=("transcribe_answer",)) is None
+
+    dedicated = jobs.claim_next_job("transcriber-1", job_types=("transcribe_answer",))
+    assert dedicated["id"] == transcription_id
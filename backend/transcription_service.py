@@ -0,0 +1,360 @@
+"""Whisper transcription of interview recordings in a pool of worker processes."""
+
+import json
+import logging
+import multiprocessing
+import subprocess
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from config import Config
+from database import get_db_connection
+from media_uploads import get_s3_client
+from report_renderer import invalidate_report
+from scoring_jobs import enqueue_job, job_handler
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPE = "transcribe_answer"
+
+COMPUTE_TYPES = ("int8", "fp32")
+
+# Whisper works on 16 kHz mono audio; voice activity is measured per 30 ms frame
+SAMPLE_RATE = 16000
+FRAME_SAMPLES = SAMPLE_RATE * 30 // 1000
+# Decoded audio is read from ffmpeg one second at a time
+READ_FRAMES = SAMPLE_RATE // FRAME_SAMPLES
+
+# The Whisper model of a worker process, loaded once by _init_worker
+_model = None
+
+
+def _init_worker(model_name, threads, compute_type):
+    """Load the Whisper model when a worker process starts."""
+    global _model
+    # Imported here so only worker processes pay for loading torch
+    import torch
+    import whisper
+
+    torch.set_num_threads(threads)
+    model = whisper.load_model(model_name, device="cpu")
+    if compute_type == "int8":
+        # Linear layers dominate CPU inference time; int8 weights roughly halve it
+        model = torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    _model = model
+    logger.info(f"Loaded Whisper model {model_name} ({compute_type}, {threads} threads)")
+
+
+def _transcribe_chunk(audio, offset, language):
+    """Transcribe one chunk of audio into segments timed from the start of the recording."""
+    result = _model.transcribe(audio, fp16=False, language=language)
+    return [
+        {
+            "start": round(offset + segment["start"], 2),
+            "end": round(offset + segment["end"], 2),
+            "text": segment["text"].strip(),
+        }
+        for segment in result["segments"]
+        if segment["text"].strip()
+    ]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_transcription_pool():
+    """Return this process's transcription worker pool, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            compute_type = Config.TRANSCRIPTION_COMPUTE_TYPE
+            if compute_type not in COMPUTE_TYPES:
+                raise ValueError(
+                    f"TRANSCRIPTION_COMPUTE_TYPE must be one of {', '.join(COMPUTE_TYPES)}"
+                )
+            _pool = ProcessPoolExecutor(
+                max_workers=Config.TRANSCRIPTION_WORKERS,
+                # Forking would copy this process's threads and open connections
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(
+                    Config.TRANSCRIPTION_MODEL,
+                    Config.TRANSCRIPTION_THREADS,
+                    compute_type,
+                ),
+            )
+        return _pool
+
+
+def _discard_pool(pool):
+    """Replace a pool whose worker died (e.g. killed for running out of memory)."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def iter_audio_frames(source):
+    """
+    Decode a recording with ffmpeg into 16 kHz mono frames, as it is read.
+
+    Only about a second of audio is held at a time, however long the recording.
+
+    Args:
+        source: Path or URL of the recording; anything ffmpeg can read
+
+    Yields:
+        float32 arrays of FRAME_SAMPLES samples in [-1, 1]; the last may be shorter
+    """
+    errors = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        [
+            "ffmpeg",
+            "-nostdin",
+            "-loglevel",
+            "error",
+            "-i",
+            source,
+            "-f",
+            "s16le",
+            "-ac",
+            "1",
+            "-ar",
+            str(SAMPLE_RATE),
+            "-",
+        ],
+        stdout=subprocess.PIPE,
+        # A file rather than a pipe, which ffmpeg could fill and block on
+        stderr=errors,
+    )
+    try:
+        while True:
+            data = process.stdout.read(READ_FRAMES * FRAME_SAMPLES * 2)
+            if not data:
+                break
+            samples = np.frombuffer(data[: len(data) // 2 * 2], np.int16)
+            samples = samples.astype(np.float32) / 32768.0
+            for start in range(0, len(samples), FRAME_SAMPLES):
+                yield samples[start : start + FRAME_SAMPLES]
+
+        if process.wait() != 0:
+            errors.seek(0)
+            error = errors.read().decode("utf-8", "replace").strip()
+            raise RuntimeError(f"ffmpeg failed to decode the recording: {error}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        errors.close()
+
+
+def iter_speech_chunks(frames):
+    """
+    Group audio frames into chunks split at pauses in speech.
+
+    A frame is speech if its energy is above TRANSCRIPTION_VAD_THRESHOLD_DB. A
+    chunk ends at the first pause of TRANSCRIPTION_VAD_MIN_SILENCE_MS once it
+    is TRANSCRIPTION_CHUNK_MIN_SECONDS long, or at its longest pause when it
+    reaches TRANSCRIPTION_CHUNK_MAX_SECONDS (Whisper's 30 second window).
+    Chunks without speech are dropped, which also keeps Whisper from inventing
+    text for silence.
+
+    Yields:
+        Tuples of (offset in seconds, float32 array of samples)
+    """
+    frames_per_second = SAMPLE_RATE / FRAME_SAMPLES
+    min_frames = int(Config.TRANSCRIPTION_CHUNK_MIN_SECONDS * frames_per_second)
+    max_frames = int(Config.TRANSCRIPTION_CHUNK_MAX_SECONDS * frames_per_second)
+    silence_frames = max(
+        1, int(Config.TRANSCRIPTION_VAD_MIN_SILENCE_MS / 1000 * frames_per_second)
+    )
+    threshold = 10 ** (Config.TRANSCRIPTION_VAD_THRESHOLD_DB / 20)
+
+    chunk, voiced = [], []
+    offset = 0  # samples before the current chunk
+    silent_run = 0
+    best_cut, best_run = None, 0
+
+    def emit(cut):
+        audio = np.concatenate(chunk[:cut])
+        has_speech = any(voiced[:cut])
+        return (offset / SAMPLE_RATE, audio) if has_speech else None
+
+    for frame in frames:
+        is_speech = float(np.sqrt(np.mean(frame**2))) >= threshold
+        chunk.append(frame)
+        voiced.append(is_speech)
+        silent_run = 0 if is_speech else silent_run + 1
+        if silent_run > best_run and len(chunk) >= min_frames:
+            best_cut, best_run = len(chunk), silent_run
+
+        if silent_run >= silence_frames and len(chunk) >= min_frames:
+            cut = len(chunk)
+        elif len(chunk) >= max_frames:
+            cut = best_cut or len(chunk)
+        else:
+            continue
+
+        result = emit(cut)
+        if result:
+            yield result
+        offset += sum(len(f) for f in chunk[:cut])
+        chunk, voiced = chunk[cut:], voiced[cut:]
+
+        # Rescan the frames carried over into the next chunk
+        silent_run = 0
+        best_cut, best_run = None, 0
+        for length, is_speech in enumerate(voiced, 1):
+            silent_run = 0 if is_speech else silent_run + 1
+            if silent_run > best_run and length >= min_frames:
+                best_cut, best_run = length, silent_run
+
+    if chunk:
+        result = emit(len(chunk))
+        if result:
+            yield result
+
+
+def transcribe_stream(source, on_progress=None):
+    """
+    Transcribe a recording chunk by chunk while it is still being decoded.
+
+    Chunks are transcribed in parallel across the worker pool. Segments are
+    reported in order as soon as every chunk before them is done, so the
+    start of a long answer is available well before its end.
+
+    Args:
+        source: Path or URL of the recording; anything ffmpeg can read
+        on_progress: Called with the list of segments so far after each chunk
+
+    Returns:
+        List of {start, end, text} segments, timed in seconds from the start
+    """
+    pool = get_transcription_pool()
+    # Bounded so decoding never runs far ahead of transcription
+    max_pending = 2 * Config.TRANSCRIPTION_WORKERS
+    pending = deque()
+    segments = []
+
+    def collect(future):
+        segments.extend(future.result(timeout=Config.TRANSCRIPTION_TIMEOUT))
+        if on_progress:
+            on_progress(segments)
+
+    try:
+        for offset, audio in iter_speech_chunks(iter_audio_frames(source)):
+            pending.append(
+                pool.submit(
+                    _transcribe_chunk, audio, offset, Config.TRANSCRIPTION_LANGUAGE
+                )
+            )
+            while pending and (len(pending) > max_pending or pending[0].done()):
+                collect(pending.popleft())
+        while pending:
+            collect(pending.popleft())
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+    finally:
+        for future in pending:
+            future.cancel()
+    return segments
+
+
+def stitch_segments(segments):
+    """Join transcript segments into the answer's transcript text."""
+    return " ".join(segment["text"] for segment in segments)
+
+
+def save_transcript(submission_id, question_id, s3_key, segments):
+    """
+    Store the transcript of an answer's recording, with its timed segments.
+
+    Nothing is written if the answer has been re-recorded since, so a late
+    transcription never overwrites the transcript of a newer recording.
+
+    Returns:
+        True if the answer was updated
+    """
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            UPDATE submission_answers
+            SET transcript = ?, transcript_segments = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE submission_id = ? AND question_id = ? AND video_path = ?
+            """,
+            (
+                stitch_segments(segments),
+                json.dumps(segments),
+                submission_id,
+                question_id,
+                s3_key,
+            ),
+        )
+        conn.commit()
+        saved = cursor.rowcount > 0
+    finally:
+        conn.close()
+
+    if saved:
+        invalidate_report(submission_id)
+    return saved
+
+
+def enqueue_transcription(submission_id, question_id, s3_key):
+    """
+    Queue the transcription of an answer's recording stored in S3.
+
+    Returns:
+        The ID of the queued job
+    """
+    return enqueue_job(
+        JOB_TYPE,
+        {"submission_id": submission_id, "question_id": question_id, "s3_key": s3_key},
+        submission_id=submission_id,
+    )
+
+
+@job_handler(JOB_TYPE)
+def transcribe_answer(payload):
+    """
+    Transcribe an answer's recording, updating the answer's transcript as each
+    chunk is done.
+    """
+    # ffmpeg streams the recording from S3, so it is never copied to local disk
+    url = get_s3_client().generate_presigned_url(
+        "get_object",
+        Params={"Bucket": Config.S3_BUCKET_NAME, "Key": payload["s3_key"]},
+        ExpiresIn=int(Config.TRANSCRIPTION_TIMEOUT),
+    )
+
+    def save(segments):
+        return save_transcript(
+            payload["submission_id"],
+            payload["question_id"],
+            payload["s3_key"],
+            segments,
+        )
+
+    segments = transcribe_stream(url, on_progress=save)
+    # Also written when no chunk had speech, so the answer is marked as transcribed
+    saved = save(segments)
+    if not saved:
+        logger.info(
+            f"Answer to question {payload['question_id']} of submission "
+            f"{payload['submission_id']} no longer uses {payload['s3_key']}"
+        )
+    transcript = stitch_segments(segments)
+    return {"saved": saved, "segments": len(segments), "characters": len(transcript)}
@@ -0,0 +1,44 @@
+"""
+Run transcribe_answer jobs in this process only.
+
+Each process claiming those jobs starts its own pool of Whisper processes, so
+when the web app runs in several gunicorn workers, set
+TRANSCRIPTION_DEDICATED_WORKER=true for them and run this script once:
+
+    python transcription_worker.py
+"""
+
+import logging
+import signal
+import threading
+
+from config import Config
+from scoring_jobs import ScoringWorkerPool
+import transcription_service
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    # One thread per Whisper process keeps them all busy
+    pool = ScoringWorkerPool(
+        Config.TRANSCRIPTION_WORKERS,
+        Config.SCORING_JOB_POLL_INTERVAL,
+        job_types=(transcription_service.JOB_TYPE,),
+    )
+    stopped = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stopped.set())
+
+    pool.start()
+    logger.info(
+        f"Transcription worker started with {Config.TRANSCRIPTION_WORKERS} workers"
+    )
+    stopped.wait()
+    logger.info("Transcription worker stopping")
+    pool.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -35,6 +35,33 @@ interface SubmissionStatus {
   has_completed_submission: boolean;
 }
 
+interface ScoringJob {
+  id: string;
+  status: 'queued' | 'running' | 'completed' | 'failed';
+  result: { total_score?: number; max_possible_score?: number } | null;
+  error: string | null;
+}
+
+// Scoring runs in the background; poll its job for up to about two minutes
+const SCORING_POLL_INTERVAL_MS = 2000;
+const SCORING_POLL_ATTEMPTS = 60;
+
+// Resolves to null if the job is not done in time; the interview is submitted either way
+const waitForScoringJob = async (statusUrl: string): Promise<ScoringJob | null> => {
+  for (let attempt = 0; attempt < SCORING_POLL_ATTEMPTS; attempt++) {
+    try {
+      const { data } = await axios.get<ScoringJob>(`${API_URL}${statusUrl}`);
+      if (data.status === 'completed' || data.status === 'failed') {
+        return data;
+      }
+    } catch (err) {
+      console.log('Error polling scoring job:', err);
+    }
+    await new Promise((resolve) => setTimeout(resolve, SCORING_POLL_INTERVAL_MS));
+  }
+  return null;
+};
+
 interface LiveKitInterviewComponentProps {
   campaignId: string;
   onInterviewComplete: (submissionId: string) => void;
@@ -282,12 +309,22 @@ const LiveKitInterviewComponent = ({ campaignId, onInterviewComplete, token, roo
         console.log('📝 Submit interview response:', response.data);
 
         if (response.data.success) {
-          console.log('✅ Interview submitted successfully', {
+          console.log('✅ Interview submitted for scoring', {
             submissionId,
-            totalScore: response.data.total_score,
-            maxPossibleScore: response.data.max_possible_score
+            jobId: response.data.job_id
           });
 
+          const scoringJob = await waitForScoringJob(response.data.status_url);
+          if (scoringJob?.status === 'completed') {
+            console.log('✅ Interview scored', {
+              submissionId,
+              totalScore: scoringJob.result?.total_score,
+              maxPossibleScore: scoringJob.result?.max_possible_score
+            });
+          } else {
+            console.log('⚠️ Interview scoring not finished:', scoringJob?.error ?? 'still running');
+          }
+
           // Verify the submission was marked as complete
           const verifyResponse = await axios.get(`${API_URL}/api/submissions/${submissionId}`);
           console.log('🔍 Verifying submission status:', verifyResponse.data);